@@ -0,0 +1,162 @@
+import os
+import re
+import gzip
+import glob
+import time
+import queue
+import atexit
+import shutil
+import threading
+
+ACCESS_LOG_HEADER = "# Access Log\n# Format: TIMESTAMP,ID,ACTION,STATUS\n"
+SEGMENT_PATTERN = re.compile(r'\.(\d{8}-\d{6})(?:-(\d+))?\.gz$')
+
+
+def segment_order(segment):
+    """Sort key for a rotated segment LOG_FILE.YYYYmmdd-HHMMSS[-N].gz: (timestamp, N)"""
+    match = SEGMENT_PATTERN.search(segment)
+    if match is None:
+        return '', 0
+    # A "-N" segment was rotated later in the same second than the one without a suffix
+    return match.group(1), int(match.group(2) or 0)
+
+
+class AsyncAccessLogger:
+    """Buffered access log writer running on a background thread
+
+    log() only puts the line on a bounded queue, so logging never blocks the
+    UI thread; when the queue is full the line is dropped and counted. The
+    writer thread appends lines in batches and flushes at most every
+    flush_interval seconds. It rotates the file by size or age and gzips the
+    rotated segments, keeping the newest backup_count of them.
+    """
+    def __init__(self, log_file="access_log.txt", max_queue=10000, batch_size=200, flush_interval=1.0,
+                 max_bytes=5 * 1024 * 1024, rotate_interval=None, backup_count=10, header=ACCESS_LOG_HEADER):
+        """Open the log file and start the writer thread"""
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.header = header
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.queued_count = 0
+        self.dropped_count = 0
+        self.written_count = 0
+        self._count_lock = threading.Lock()
+        self._file = None
+        self._segment_started_at = None
+        self._closed = False
+
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="AsyncAccessLogger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, line):
+        """Queue one log line (without trailing newline); never blocks"""
+        # Called from the Tk thread and background threads alike
+        with self._count_lock:
+            try:
+                self.queue.put_nowait(line)
+                self.queued_count += 1
+            except queue.Full:
+                self.dropped_count += 1
+
+    def _open(self):
+        """Open the current segment for appending"""
+        is_new = not os.path.exists(self.log_file) or os.path.getsize(self.log_file) == 0
+        self._file = open(self.log_file, 'a')
+        if is_new and self.header:
+            self._file.write(self.header)
+        self._segment_started_at = time.time() if is_new else os.path.getmtime(self.log_file)
+
+    def _run(self):
+        """Writer loop: collect a batch, write it, flush, rotate if needed"""
+        while True:
+            try:
+                line = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._closed:
+                    break
+                continue
+
+            if line is None:
+                break
+
+            batch = [line]
+            while len(batch) < self.batch_size:
+                try:
+                    line = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    self._write_batch(batch)
+                    return
+                batch.append(line)
+
+            self._write_batch(batch)
+            # Let more lines accumulate before the next write
+            time.sleep(self.flush_interval)
+
+    def _write_batch(self, batch):
+        """Append a batch of lines and flush them to the OS"""
+        try:
+            self._file.write('\n'.join(batch) + '\n')
+            self._file.flush()
+            self.written_count += len(batch)
+            if self._should_rotate():
+                self._rotate()
+        except Exception as e:
+            print(f"Error logging access: {e}")
+
+    def _should_rotate(self):
+        """Rotate when the segment exceeds max_bytes or is older than rotate_interval"""
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            return True
+        if self.rotate_interval and time.time() - self._segment_started_at >= self.rotate_interval:
+            return True
+        return False
+
+    def _rotate(self):
+        """Close the current segment, gzip it and start a new one"""
+        self._file.close()
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        rotated_file = f"{self.log_file}.{stamp}"
+        same_second = [segment_order(segment)[1] for segment in glob.glob(f"{rotated_file}*.gz")]
+        if same_second:
+            # Number it after every segment of this second, even if retention removed some of them
+            rotated_file = f"{rotated_file}-{max(same_second) + 1}"
+        os.replace(self.log_file, rotated_file)
+        self._open()
+
+        with open(rotated_file, 'rb') as src, gzip.open(rotated_file + ".gz", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated_file)
+        print(f"Access log rotated to {rotated_file}.gz")
+
+        # Keep only the newest backup_count segments
+        segments = sorted(glob.glob(f"{self.log_file}.*.gz"), key=segment_order)
+        for old_segment in segments[:-self.backup_count] if self.backup_count else []:
+            os.remove(old_segment)
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued line has been written"""
+        deadline = time.time() + timeout
+        while self.written_count < self.queued_count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        """Write the remaining lines and close the log file"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.queue.put(None, timeout=1.0)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=5.0)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
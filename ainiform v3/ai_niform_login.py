@@ -4,10 +4,11 @@ from PIL import Image, ImageTk
 import datetime
 import time
 import os
-import cv2
-import numpy as np
-from ultralytics import YOLO
-from database_manager import DatabaseManager
+from database_manager import create_database_manager
+from display_bus import DisplayBusServer
+# OpenCV, NumPy, PyQt5 and the detection modules are imported when first needed,
+# so the login screen comes up before they are loaded (see startup_loader.py)
+from startup_loader import get_vision_loader
 import json
 import os.path
 from datetime import datetime, timedelta
@@ -15,339 +16,136 @@ import subprocess
 import sys
 import threading
 
-# PyQt5 imports for main screen window
-try:
-    from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame
-    from PyQt5.QtCore import QTimer, Qt
-    from PyQt5.QtGui import QPixmap, QFont
-    PYQT5_AVAILABLE = True
-except ImportError:
-    PYQT5_AVAILABLE = False
-    print("PyQt5 not available - main screen will launch as separate process")
+# Guard console text for each compliance verdict
+COMPLIANCE_MESSAGES = {
+    "clean": "Uniform complete.",
+    "manual_verification": "Uniform needs manual verification.",
+    "no_object": "No one detected at the camera."
+}
 
-class STIMainScreenWindow(QMainWindow):
-    """PyQt5 Main Screen Window integrated into the tkinter application"""
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("AI-niform - Main Screen")
-        self.setGeometry(100, 100, 1920, 1080)
-        self.setFixedSize(1920, 1080)
-        
-        # Set up the main widget
-        main_widget = QWidget()
-        self.setCentralWidget(main_widget)
-        
-        # Create main layout
-        layout = QVBoxLayout(main_widget)
-        layout.setSpacing(0)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.setup_ui(layout)
-        self.setup_timer()
-        
-        # Set window style
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: white;
-            }
-        """)
-        
-        # Enable key events
-        self.setFocusPolicy(Qt.StrongFocus)
-    
-    def setup_ui(self, layout):
-        """Setup the main screen UI"""
-        # Top Banner
-        top_banner = QFrame()
-        top_banner.setFixedHeight(120)
-        top_banner.setStyleSheet("background-color: #DAA520;")
-        
-        welcome_label = QLabel("Welcome to STI College Balagtas!")
-        welcome_label.setAlignment(Qt.AlignCenter)
-        welcome_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 36px;
-                font-weight: bold;
-                background-color: transparent;
-            }
-        """)
-        
-        top_layout = QVBoxLayout(top_banner)
-        top_layout.addWidget(welcome_label)
-        layout.addWidget(top_banner)
-        
-        # Main Content Area
-        main_content = QFrame()
-        main_layout = QHBoxLayout(main_content)
-        main_layout.setSpacing(0)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Left Panel (Logo)
-        left_panel = QFrame()
-        left_panel.setStyleSheet("background-color: white;")
-        left_layout = QVBoxLayout(left_panel)
-        left_layout.setAlignment(Qt.AlignCenter)
-        
-        # Load and display STI Logo
-        logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
-            logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            logo_label.setPixmap(scaled_pixmap)
-            logo_label.setAlignment(Qt.AlignCenter)
-            left_layout.addWidget(logo_label)
-        else:
-            fallback_label = QLabel("STI Balagtas Logo")
-            fallback_label.setAlignment(Qt.AlignCenter)
-            fallback_label.setStyleSheet("""
-                QLabel {
-                    font-size: 24px;
-                    font-weight: bold;
-                    color: #0066CC;
-                    background-color: #FFD700;
-                    padding: 20px;
-                    border-radius: 3px;
-                }
-            """)
-            left_layout.addWidget(fallback_label)
-        
-        main_layout.addWidget(left_panel, 40)
-        
-        # Right Panel (Card Reader)
-        right_panel = QFrame()
-        right_panel.setStyleSheet("background-color: #4A90E2;")
-        right_layout = QVBoxLayout(right_panel)
-        right_layout.setAlignment(Qt.AlignCenter)
-        
-        # Card Reader Interface
-        self.instruction_label = QLabel("Please tap your ID\nto the Card Reader")
-        self.instruction_label.setAlignment(Qt.AlignCenter)
-        self.instruction_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 24px;
-                font-weight: bold;
-                background-color: transparent;
-            }
-        """)
-        right_layout.addWidget(self.instruction_label)
-        
-        # Status label
-        self.status_label = QLabel("Ready for scanning...")
-        self.status_label.setAlignment(Qt.AlignCenter)
-        self.status_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 18px;
-                background-color: transparent;
-            }
-        """)
-        right_layout.addWidget(self.status_label)
-        
-        main_layout.addWidget(right_panel, 60)
-        layout.addWidget(main_content)
-        
-        # Bottom bar
-        bottom_bar = QFrame()
-        bottom_bar.setFixedHeight(100)
-        bottom_layout = QHBoxLayout(bottom_bar)
-        
-        # Date and time
-        current_date = datetime.now().strftime("%B %d, %Y")
-        current_time = datetime.now().strftime("%I:%M:%S %p")
-        
-        date_label = QLabel(current_date)
-        date_label.setAlignment(Qt.AlignCenter)
-        date_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 18px;
-                font-weight: bold;
-                background-color: #87CEEB;
-            }
-        """)
-        
-        time_label = QLabel(current_time)
-        time_label.setAlignment(Qt.AlignCenter)
-        time_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 18px;
-                font-weight: bold;
-                background-color: #021C37;
-            }
-        """)
-        
-        bottom_layout.addWidget(date_label)
-        bottom_layout.addWidget(time_label)
-        layout.addWidget(bottom_bar)
-    
-    def setup_timer(self):
-        """Setup timer for updating time"""
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)
-    
-    def update_time(self):
-        """Update the time display"""
-        current_time = datetime.now().strftime("%I:%M:%S %p")
-        # Update time label if it exists
-        for child in self.findChildren(QLabel):
-            if ":" in child.text() and len(child.text()) < 15:
-                child.setText(current_time)
-                break
-    
-    def keyPressEvent(self, event):
-        """Handle key press events"""
-        if event.key() == Qt.Key_Escape:
-            self.close()
-        else:
-            super().keyPressEvent(event)
-    
-    def closeEvent(self, event):
-        """Handle window close event"""
-        # Notify the parent application that this window is closing
-        if hasattr(self, 'parent_app'):
-            self.parent_app.on_main_screen_closed()
-        event.accept()
+def display_person(person):
+    """The person fields the main screen needs, for a display bus message"""
+    return {'id': person.get('id'), 'role': person.get('role'), 'name': person.get('name')}
+
+def release_shared_cameras():
+    """Stop the shared capture threads, if the camera module was ever loaded"""
+    camera_capture = sys.modules.get('camera_capture')
+    if camera_capture is not None:
+        camera_capture.shutdown_shared_cameras()
 
 class YOLOCameraDetection:
-    def __init__(self, model_path='best.pt', camera_id=0, confidence_threshold=0.5):
+    def __init__(self, model_path='best.pt', camera_id=0, confidence_threshold=0.5, model_service=None):
         """Initialize YOLO Camera Detection"""
         self.model_path = model_path
         self.camera_id = camera_id
         self.confidence_threshold = confidence_threshold
+        self.model_service = model_service
         self.cap = None
         self.model = None
+        self.detector = None
         self.is_running = False
         
     def load_model(self):
-        """Load YOLO model"""
+        """Get the YOLO model from the shared model service"""
         try:
-            print(f"Loading YOLO model from {self.model_path}...")
-            if os.path.exists(self.model_path):
-                self.model = YOLO(self.model_path)
-                print("Model loaded successfully!")
-                return True
-            else:
-                print(f"Model file {self.model_path} not found. Using placeholder detection.")
-                self.model = None
+            from model_service import get_model_service
+            from region_detector import create_region_detector
+            from cascade_detector import create_cascade_detector
+            
+            if self.model_service is None:
+                self.model_service = get_model_service(self.model_path)
+            
+            # The service loads best.pt once per process; this only waits if startup loading is still running
+            self.model = self.model_service.get_model()
+            if self.model is None:
+                print(f"Model file {self.model_path} not available. Using placeholder detection.")
                 return False
+            
+            # Restrict detection to the turnstile zone and skip full-resolution passes on idle frames;
+            # in cascade mode, later frames only re-check the uniform parts not confirmed yet
+            self.detector = create_cascade_detector(create_region_detector(self.model), self.model)
+            return True
         except Exception as e:
             print(f"Error loading model: {e}")
             self.model = None
             return False
     
     def initialize_camera(self):
-        """Initialize camera capture"""
+        """Attach to the shared camera capture thread"""
         try:
-            self.cap = cv2.VideoCapture(self.camera_id)
-            if not self.cap.isOpened():
+            from camera_capture import get_shared_camera
+            
+            # The capture thread owns the device for the life of the app; only the first call opens it
+            self.cap = get_shared_camera(self.camera_id)
+            if not self.cap.start(timeout=5.0):
                 print(f"Error: Could not open camera {self.camera_id}")
+                self.cap = None
                 return False
-            
-            # Set camera properties
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-            
-            print(f"Camera {self.camera_id} initialized successfully!")
             return True
         except Exception as e:
             print(f"Error initializing camera: {e}")
             return False
     
-    def detect_objects(self, frame):
-        """Perform object detection on frame"""
+    def detect(self, frame, frame_id=0):
+        """Perform object detection on frame and return a shared DetectionResult"""
+        from detection_result import DetectionResult
         try:
             if self.model is None:
-                return []
+                return DetectionResult(frame_id)
             
-            # Run YOLO detection
-            results = self.model(frame, conf=self.confidence_threshold, verbose=False)
-            
-            # Process results
-            detections = []
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Get box coordinates
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                        
-                        # Get confidence and class
-                        confidence = float(box.conf[0])
-                        class_id = int(box.cls[0])
-                        class_name = self.model.names[class_id]
-                        
-                        detections.append({
-                            'bbox': (x1, y1, x2, y2),
-                            'confidence': confidence,
-                            'class_id': class_id,
-                            'class_name': class_name
-                        })
+            # Run YOLO detection (columnar boxes/confidences/class IDs, one host transfer per frame)
+            boxes, confidences, class_ids = self.detector.predict_arrays(frame, conf=self.confidence_threshold)
+            result = DetectionResult(frame_id, boxes, confidences, class_ids, self.model.names,
+                                     timings=dict(self.detector.timings),
+                                     final=getattr(self.detector, 'is_complete', False))
             
             # Print debugging information
-            self.print_detection_debug(detections)
+            self.print_detection_debug(result)
             
-            return detections
+            return result
         except Exception as e:
             print(f"Error during detection: {e}")
-            return []
+            return DetectionResult(frame_id)
     
-    def print_detection_debug(self, detections):
-        """Print debugging information for YOLO detections"""
+    def detect_objects(self, frame):
+        """Perform object detection on frame and return the list of detections"""
+        return self.detect(frame).detections
+    
+    def print_detection_debug(self, result):
+        """Print debugging information for a DetectionResult"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"\n[{timestamp}] " + "="*50)
         print("YOLO DETECTION RESULTS")
         print("="*50)
         
-        if not detections:
-            print("ict longsleeve = 0")
-            print("ict logo = 0")
-            print("black shoes = 0")
-            print("ict pants = 0")
-            print("\nRESULT = MANUAL VERIFICATION")
-            return
-        
-        # Count detections by class
-        class_counts = {}
-        for detection in detections:
-            class_name = detection['class_name'].lower()
-            class_counts[class_name] = class_counts.get(class_name, 0) + 1
-        
-        # Print counts for each expected class
-        ict_longsleeve = class_counts.get('ict longsleeve', 0)
-        ict_logo = class_counts.get('ict logo', 0)
-        black_shoes = class_counts.get('black shoes', 0)
-        ict_pants = class_counts.get('ict pants', 0)
-        
-        print(f"ict longsleeve = {ict_longsleeve}")
-        print(f"ict logo = {ict_logo}")
-        print(f"black shoes = {black_shoes}")
-        print(f"ict pants = {ict_pants}")
+        # Print counts for each expected class (counted once when the result was built)
+        print(f"ict longsleeve = {result.count('ict longsleeve')}")
+        print(f"ict logo = {result.count('ict logo')}")
+        print(f"black shoes = {result.count('black shoes')}")
+        print(f"ict pants = {result.count('ict pants')}")
         
         # Determine result based on detection counts
-        total_detections = sum(class_counts.values())
-        
-        if total_detections == 0:
-            print("\nRESULT = MANUAL VERIFICATION")
-        elif ict_longsleeve >= 1 and ict_logo >= 1 and black_shoes >= 1 and ict_pants >= 1:
+        if result.is_complete_uniform():
             print("\nRESULT = ENTRY ACCESS")
         else:
             print("\nRESULT = MANUAL VERIFICATION")
         
+        if 'presence_ms' in result.timings:
+            print(f"presence check = {result.timings['presence_ms']:.1f} ms")
+        if result.timings:
+            print(f"inference = {result.timings['inference_ms']:.1f} ms, "
+                  f"post-processing = {result.timings['postprocess_ms']:.1f} ms")
+        
         print("="*50)
     
-    def draw_detections(self, frame, detections):
-        """Draw detection boxes and labels on frame"""
-        for detection in detections:
-            x1, y1, x2, y2 = detection['bbox']
-            confidence = detection['confidence']
-            class_name = detection['class_name']
+    def draw_detections(self, frame, result):
+        """Draw the boxes and labels of a DetectionResult on frame"""
+        import cv2
+        
+        # Read the columns once as plain lists instead of building a dict per box
+        for (x1, y1, x2, y2), confidence, class_id in zip(result.boxes.tolist(), result.confidences.tolist(),
+                                                          result.class_ids.tolist()):
+            class_name = result.class_name(class_id)
             
             # Draw bounding box
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
@@ -371,24 +169,23 @@ class YOLOCameraDetection:
         if self.cap is None:
             return None
         
+        # Private copy of the newest ring buffer frame, since boxes are drawn onto it
         ret, frame = self.cap.read()
         if not ret:
             return None
         
         # Perform object detection
-        detections = self.detect_objects(frame)
+        result = self.detect(frame)
         
         # Draw detections
-        frame = self.draw_detections(frame, detections)
+        frame = self.draw_detections(frame, result)
         
         return frame
     
     def cleanup(self):
-        """Clean up resources"""
+        """Detach from the shared camera (the device stays open for the next scan)"""
         self.is_running = False
-        if self.cap is not None:
-            self.cap.release()
-        print("Camera cleanup completed")
+        self.cap = None
 
 class StudentTeacherSplashScreen:
     def __init__(self, main_frame, person_data, duration=7, app_instance=None):
@@ -397,6 +194,11 @@ class StudentTeacherSplashScreen:
         self.person_data = person_data
         self.duration = duration
         self.camera_detector = None
+        self.detection_worker = None
+        from detection_result import EMPTY_RESULT
+        from preview_renderer import PreviewRenderer
+        self.latest_result = EMPTY_RESULT
+        self.preview = PreviewRenderer()
         self.is_running = False
         self.splash_frame = None
         self.original_widgets = []
@@ -626,17 +428,25 @@ class StudentTeacherSplashScreen:
     def initialize_camera(self):
         """Initialize camera and YOLO model"""
         try:
-            self.camera_detector = YOLOCameraDetection()
+            from detection_worker import DetectionWorker
+            from presence_gate import PresenceGate
+            
+            model_service = getattr(self.app_instance, 'model_service', None)
+            self.camera_detector = YOLOCameraDetection(model_service=model_service)
             if not self.camera_detector.load_model():
                 print("Warning: Could not load YOLO model")
             if not self.camera_detector.initialize_camera():
                 print("Warning: Could not initialize camera")
+            else:
+                self.detection_worker = DetectionWorker(self.camera_detector, gate=PresenceGate())
         except Exception as e:
             print(f"Error initializing camera: {e}")
     
     def start_camera_feed(self):
-        """Start the camera feed update loop"""
+        """Start the detection worker and the camera feed update loop"""
         self.is_running = True
+        if self.detection_worker:
+            self.detection_worker.start()
         self.update_camera_feed()
     
     def update_camera_feed(self):
@@ -646,23 +456,17 @@ class StudentTeacherSplashScreen:
         
         try:
             if self.camera_detector and self.camera_detector.cap:
-                frame = self.camera_detector.get_frame_with_detection()
-                if frame is not None:
-                    # Convert frame to PIL Image
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frame_pil = Image.fromarray(frame_rgb)
-                    
-                    # Resize to fit the camera frame
-                    frame_pil = frame_pil.resize((640, 480), Image.Resampling.LANCZOS)
+                # Pick up the newest result from the detection worker (never blocks)
+                result = self.detection_worker.get_latest_result() if self.detection_worker else None
+                if result is not None:
+                    self.latest_result = result
                     
-                    # Convert to PhotoImage
-                    self.camera_photo = ImageTk.PhotoImage(frame_pil)
-                    
-                    # Update camera label
-                    self.camera_label.configure(image=self.camera_photo, text="")
-                    
-                    # Update compliance status based on detections
-                    self.update_compliance_status()
+                    # Update compliance status from the same result that is drawn below
+                    self.update_compliance_status(self.latest_result)
+                
+                # Show the newest RGB frame with the most recent detections (one copy, reused PhotoImage)
+                self.preview.render(self.camera_detector.cap, self.camera_label,
+                                    self.latest_result, self.camera_detector)
             
         except Exception as e:
             print(f"Error updating camera feed: {e}")
@@ -671,39 +475,35 @@ class StudentTeacherSplashScreen:
         if self.is_running:
             self.main_frame.after(33, self.update_camera_feed)  # ~30 FPS
     
-    def update_compliance_status(self):
-        """Update uniform compliance status based on camera detection"""
+    def update_compliance_status(self, result):
+        """Update uniform compliance status from the detection worker's latest DetectionResult"""
         try:
             if self.camera_detector and self.camera_detector.cap:
-                frame = self.camera_detector.get_frame_with_detection()
-                if frame is not None:
-                    if self.camera_detector.model is None:
-                        # No YOLO model available - show placeholder
-                        self.compliance_label.config(text="⚠ Uniform Detection: Model Not Available", fg='orange')
-                        self.detection_label.config(text="Please ensure best.pt model file is present")
+                if self.camera_detector.model is None:
+                    # No YOLO model available - show placeholder
+                    self.compliance_label.config(text="⚠ Uniform Detection: Model Not Available", fg='orange')
+                    self.detection_label.config(text="Please ensure best.pt model file is present")
+                elif result:
+                    # Check that every required uniform part was detected
+                    if result.is_complete_uniform():
+                        self.compliance_label.config(text="✓ Uniform Compliance: PASS", fg='green')
                     else:
-                        detections = self.camera_detector.detect_objects(frame)
-                        
-                        if detections:
-                            # Check for uniform-related detections
-                            uniform_detected = any('uniform' in det['class_name'].lower() for det in detections)
-                            if uniform_detected:
-                                self.compliance_label.config(text="✓ Uniform Compliance: PASS", fg='green')
-                            else:
-                                self.compliance_label.config(text="✗ Uniform Compliance: FAIL", fg='red')
-                            
-                            # Show detection details
-                            detection_text = f"Detected: {', '.join([det['class_name'] for det in detections])}"
-                            self.detection_label.config(text=detection_text)
-                        else:
-                            self.compliance_label.config(text="✓ Uniform Detection Active", fg='blue')
-                            self.detection_label.config(text="No uniforms detected - checking compliance...")
+                        self.compliance_label.config(text="✗ Uniform Compliance: FAIL", fg='red')
+                    
+                    # Show detection details
+                    detection_text = f"Detected: {', '.join(result.class_names())}"
+                    self.detection_label.config(text=detection_text)
+                else:
+                    self.compliance_label.config(text="✓ Uniform Detection Active", fg='blue')
+                    self.detection_label.config(text="No uniforms detected - checking compliance...")
         except Exception as e:
             print(f"Error updating compliance status: {e}")
     
     def close_splash(self):
         """Close the splash screen and restore original interface"""
         self.is_running = False
+        if self.detection_worker:
+            self.detection_worker.stop()
         if self.camera_detector:
             self.camera_detector.cleanup()
         
@@ -717,8 +517,10 @@ class StudentTeacherSplashScreen:
             pass
 
 class AINiformLogin:
-    def __init__(self, root):
+    def __init__(self, root, main_screen_host=None):
         self.root = root
+        # AppHost running the main screen in this process, or None to launch it as a subprocess
+        self.main_screen_host = main_screen_host
         self.root.title("AI-niform")
         self.root.geometry("1366x768")
         self.root.configure(bg='white')
@@ -742,12 +544,33 @@ class AINiformLogin:
         self.current_special_pass_id = None
         self.current_check_type = None
         
-        # Initialize database manager
-        self.db_manager = DatabaseManager()
+        # Initialize database manager (text files or SQLite, see create_database_manager)
+        self.db_manager = create_database_manager()
         
         # Clean up expired Special Passes on startup
         self.db_manager.cleanup_expired_special_passes()
         
+        # Scan results and compliance verdicts go to the main screen over the display bus
+        self.display_bus = DisplayBusServer()
+        self.display_bus.start()
+        
+        # Without an AppHost, keep a warm standby main screen process ready for the first guard login
+        self.main_screen_supervisor = None
+        if main_screen_host is None and os.environ.get("AINIFORM_SUPERVISOR", "1") == "1":
+            from main_screen_supervisor import MainScreenSupervisor
+            self.main_screen_supervisor = MainScreenSupervisor()
+            self.main_screen_supervisor.start()
+        
+        # A main screen in another process shows the camera from shared memory;
+        # a hosted one (or none) reads the capture thread directly
+        self.share_camera_frames = self.main_screen_supervisor is not None
+        
+        # Import OpenCV, NumPy and the detection modules in the background so the login
+        # screen appears right away; the model and camera start once they are loaded
+        self.model_service = None
+        self.vision_loader = get_vision_loader()
+        self.vision_loader.start(on_ready=self.start_vision_services)
+        
         # Create main frame
         self.main_frame = tk.Frame(root, bg='white')
         self.main_frame.pack(expand=True, fill='both')
@@ -761,6 +584,37 @@ class AINiformLogin:
         self.running = True
         self.update_time()
     
+    def publish_to_display(self, message_type, **fields):
+        """Send a message to the main screen (ignored if no display is connected)"""
+        try:
+            self.display_bus.publish(message_type, **fields)
+        except Exception as e:
+            print(f"Error publishing to display: {e}")
+    
+    def start_vision_services(self):
+        """Start the YOLO model service and the shared camera (runs in the loader thread)"""
+        from model_service import get_model_service
+        from camera_capture import get_shared_camera
+        
+        # Load and warm up the YOLO model once in the background; splash screens share it
+        model_service = get_model_service()
+        model_service.start()
+        model_service.start_file_watch()
+        self.model_service = model_service
+        
+        # Open the camera once; every splash screen reads from the same capture thread
+        camera = get_shared_camera()
+        if self.share_camera_frames:
+            camera.enable_sharing()
+    
+    def request_camera_frames(self):
+        """Publish camera frames to shared memory for a main screen process"""
+        self.share_camera_frames = True
+        # Before the vision modules are loaded, start_vision_services enables it instead
+        if self.vision_loader.is_ready():
+            from camera_capture import get_shared_camera
+            get_shared_camera().enable_sharing()
+    
     def center_window(self):
         """Center the window on screen"""
         self.root.update_idletasks()
@@ -1279,7 +1133,15 @@ class AINiformLogin:
     
     def quit_application(self, event=None):
         """Quit the application"""
+        if self.main_screen_host is not None:
+            # Tk has no mainloop of its own under app_host.py, so root.quit() would do nothing
+            self.main_screen_host.quit()
+            return
         self.running = False
+        self.display_bus.stop()
+        if self.main_screen_supervisor is not None:
+            self.main_screen_supervisor.stop()
+        release_shared_cameras()
         self.root.quit()
     
     def on_quit_hover_enter(self, event):
@@ -1334,6 +1196,7 @@ class AINiformLogin:
             if person['role'] == 'GUARD':
                 # Store current guard information
                 self.current_guard = person
+                self.publish_to_display('guard', state='login', name=person['name'])
                 # Guard access granted
                 self.status_label.config(text="ACCESS GRANTED", fg='green')
                 # Clear the input field
@@ -1384,17 +1247,28 @@ class AINiformLogin:
     
     def launch_main_screen_window(self):
         """Launch the PyQt5 main screen in a separate window"""
-        # For better compatibility, always launch as separate process
+        if self.main_screen_host is not None:
+            # Running under app_host.py - the main screen is a window of this process
+            self.main_screen_host.show_main_screen()
+            return
+        
+        # Started on its own - launch the main screen as a separate process
         self.launch_main_screen_as_process()
     
     def launch_main_screen_as_process(self):
         """Launch main screen as separate process if PyQt5 integration fails"""
+        if self.main_screen_supervisor is not None:
+            # Swap in the warm standby; a cold start can take seconds, so don't block Tk on it
+            threading.Thread(target=self.main_screen_supervisor.activate, daemon=True).start()
+            return
+        
         try:
             # Get the current directory and path to testmainscreen.py
             current_dir = os.path.dirname(os.path.abspath(__file__))
             main_screen_path = os.path.join(current_dir, "testmainscreen.py")
             
             # Launch the PyQt5 application as separate process
+            self.request_camera_frames()
             self.main_screen_process = subprocess.Popen([sys.executable, main_screen_path])
             print("Main screen launched as separate process")
             
@@ -1782,6 +1656,7 @@ class AINiformLogin:
             
             # Log the logout
             self.db_manager.log_access(card_id, "GUARD_LOGOUT")
+            self.publish_to_display('guard', state='logout', name=self.current_guard['name'] if self.current_guard else '')
             
             # Clear current guard
             self.current_guard = None
@@ -1799,6 +1674,11 @@ class AINiformLogin:
     def close_main_screen_window(self):
         """Close the main screen window if it exists"""
         try:
+            if self.main_screen_host is not None:
+                self.main_screen_host.hide_main_screen()
+            if self.main_screen_supervisor is not None:
+                # The standby stays warm for the next guard
+                self.main_screen_supervisor.deactivate()
             if hasattr(self, 'main_screen_process') and self.main_screen_process:
                 self.main_screen_process.terminate()
                 self.main_screen_process = None
@@ -2892,6 +2772,7 @@ class AINiformLogin:
                 # Check if trying to check-in after expiration
                 if check_status == "CHECKED_OUT" and self.db_manager.is_special_pass_expired_for_checkin(card_id):
                     # Special Pass has expired for check-in - show deactivated message
+                    self.publish_to_display('scan', card_id=card_id, status='deactivated')
                     self.last_response_message = "Deactivated Pass has been scanned."
                     if hasattr(self, 'guard_message_label') and self.guard_message_label.winfo_exists():
                         self.guard_message_label.config(text=self.last_response_message)
@@ -2909,6 +2790,8 @@ class AINiformLogin:
                     self.db_manager.record_special_pass_check(card_id, "CHECK_OUT")
                     self.current_check_type = "CHECK_OUT"
                     print(f"Special Pass {card_id} checked out in grace period")
+                    self.publish_to_display('scan', card_id=card_id, status='special_pass', check_type="CHECK_OUT",
+                                            person=display_person(person))
                     
                     # Clear the input field
                     self.id_number_entry.delete(0, tk.END)
@@ -2917,6 +2800,7 @@ class AINiformLogin:
                     print(f"Special Pass checked out in grace period: {person['name']}")
                 elif self.db_manager.is_special_pass_expired(card_id):
                     # Special Pass has expired and not in grace period - show deactivated message
+                    self.publish_to_display('scan', card_id=card_id, status='deactivated')
                     self.last_response_message = "Deactivated Pass has been scanned."
                     if hasattr(self, 'guard_message_label') and self.guard_message_label.winfo_exists():
                         self.guard_message_label.config(text=self.last_response_message)
@@ -2940,6 +2824,8 @@ class AINiformLogin:
                         self.db_manager.record_special_pass_check(card_id, "CHECK_OUT")
                         self.current_check_type = "CHECK_OUT"
                         print(f"Special Pass {card_id} checked out")
+                    self.publish_to_display('scan', card_id=card_id, status='special_pass',
+                                            check_type=self.current_check_type, person=display_person(person))
                     
                     # Clear the input field
                     self.id_number_entry.delete(0, tk.END)
@@ -2955,6 +2841,9 @@ class AINiformLogin:
                     # Clear the input field
                     self.id_number_entry.delete(0, tk.END)
                     
+                    # The main screen shows the person while the console scans the uniform
+                    self.publish_to_display('scan', card_id=card_id, status='valid', person=display_person(person))
+                    
                     # Show splash screen in the same window
                     self.show_student_teacher_splash(person, 7)
                     
@@ -2971,6 +2860,7 @@ class AINiformLogin:
                     print(f"Valid card scanned: {person['name']} ({person['role']})")
         else:
             # Person not found - show error message
+            self.publish_to_display('scan', card_id=card_id, status='invalid')
             self.last_response_message = "Unknown / Invalid ID has been scanned."
             if hasattr(self, 'guard_message_label') and self.guard_message_label.winfo_exists():
                 self.guard_message_label.config(text=self.last_response_message)
@@ -2991,11 +2881,19 @@ class AINiformLogin:
     
     def show_student_teacher_splash(self, person_data, duration=7):
         """Show splash screen for student/teacher in the same window"""
+        from detection_result import EMPTY_RESULT
+        from preview_renderer import PreviewRenderer
+        from compliance_voter import ComplianceVoter
+        
         # Store current interface state
         self.splash_camera_detector = None
+        self.splash_detection_worker = None
+        self.splash_detection_result = EMPTY_RESULT
+        self.splash_preview = PreviewRenderer()
         self.splash_is_running = False
         self.compliance_person_data = person_data
-        self.no_detection_count = 0  # Counter for consecutive frames with no detection
+        self.compliance_voter = ComplianceVoter()  # Sliding-window vote instead of single-frame decisions
+        self.compliance_result = None
         
         # Disable logout button during splash screen
         self.disable_logout_button()
@@ -3017,8 +2915,8 @@ class AINiformLogin:
         # Start camera feed
         self.start_splash_camera_feed()
         
-        # Auto-close after duration
-        self.main_frame.after(duration * 1000, self.close_splash_and_restore)
+        # Auto-close after duration (cancelled if the compliance vote finishes early)
+        self.splash_close_after_id = self.main_frame.after(duration * 1000, self.close_splash_and_restore)
         
         # Bind escape key to close
         self.root.bind('<Escape>', lambda e: self.close_splash_and_restore())
@@ -3154,49 +3052,36 @@ class AINiformLogin:
     
     def get_student_number_from_rfid(self, rfid_id):
         """Get student number from RFID ID"""
-        try:
-            with open(self.db_manager.db_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 3:
-                        db_id = parts[0]
-                        role = parts[1]
-                        
-                        # Check if this is a STUDENT_RFID entry that matches our RFID
-                        if role == 'STUDENT_RFID' and db_id == rfid_id:
-                            # The student number is in the third column
-                            if len(parts) >= 3:
-                                student_number = parts[2]
-                                print(f"Found student number {student_number} for RFID {rfid_id}")
-                                return student_number
-            
-            print(f"No student number found for RFID: {rfid_id}")
-            return None
-            
-        except Exception as e:
-            print(f"Error getting student number: {e}")
-            return None
+        # Indexed lookup in the database manager instead of scanning database.txt
+        return self.db_manager.get_student_number_from_rfid(rfid_id)
     
     def initialize_splash_camera(self):
         """Initialize camera and YOLO model for splash screen"""
         try:
-            self.splash_camera_detector = YOLOCameraDetection()
+            from detection_worker import DetectionWorker
+            from presence_gate import PresenceGate
+            
+            # model_service is None only if the vision modules are still loading; the detector then
+            # waits for them and picks up the same process-wide service
+            self.splash_camera_detector = YOLOCameraDetection(model_service=self.model_service)
             if not self.splash_camera_detector.load_model():
                 print("Warning: Could not load YOLO model")
             if not self.splash_camera_detector.initialize_camera():
                 print("Warning: Could not initialize camera")
+            else:
+                self.splash_detection_worker = DetectionWorker(self.splash_camera_detector, gate=PresenceGate())
         except Exception as e:
             print(f"Error initializing camera: {e}")
     
     def start_splash_camera_feed(self):
-        """Start the camera feed update loop for splash screen"""
+        """Start the detection worker and the camera feed update loop for splash screen"""
         self.splash_is_running = True
-        # Add a small delay to let camera initialize, then start detection
-        self.main_frame.after(1000, self.update_splash_camera_feed)
+        if self.splash_detection_worker:
+            self.splash_detection_worker.start()
+        # The no-object timeout runs from now; a gated, empty scene never produces a result to start it
+        self.compliance_voter.start()
+        # The shared capture thread is already streaming, so frames are available immediately
+        self.update_splash_camera_feed()
     
     def update_splash_camera_feed(self):
         """Update camera feed with detection results for splash screen"""
@@ -3205,20 +3090,37 @@ class AINiformLogin:
         
         try:
             if self.splash_camera_detector and self.splash_camera_detector.cap:
-                frame = self.splash_camera_detector.get_frame_with_detection()
-                if frame is not None:
-                    # Convert frame to PIL Image
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frame_pil = Image.fromarray(frame_rgb)
-                    
-                    # Resize to fit the camera frame
-                    frame_pil = frame_pil.resize((640, 480), Image.Resampling.LANCZOS)
-                    
-                    # Convert to PhotoImage
-                    self.splash_camera_photo = ImageTk.PhotoImage(frame_pil)
+                # Pick up the newest result from the detection worker (never blocks)
+                result = self.splash_detection_worker.get_latest_result() if self.splash_detection_worker else None
+                if result is not None:
+                    self.splash_detection_result = result
+                
+                # Show the newest RGB frame with the most recent detections (one copy, reused PhotoImage)
+                self.splash_preview.render(self.splash_camera_detector.cap, self.splash_camera_label,
+                                           self.splash_detection_result, self.splash_camera_detector)
+                
+                if self.splash_camera_detector.model is not None:
+                    # Accumulate each new result in the voting window instead of deciding on one frame
+                    if result is not None:
+                        self.compliance_voter.add(result)
+                        if result.final:
+                            # The cascade confirmed every part and its worker stopped scanning;
+                            # no further results will come, so decide now
+                            self.finish_splash_vote(self.compliance_voter.decide()
+                                                    or self.compliance_voter.current_verdict())
+                            return  # Stop camera feed updates
                     
-                    # Update camera label
-                    self.splash_camera_label.configure(image=self.splash_camera_photo, text="")
+                    # The window is time-based, so this holds regardless of the real inference rate;
+                    # the presence gate tells it whether anyone is still moving in view
+                    presence_active = (self.splash_detection_worker.presence_active()
+                                       if self.splash_detection_worker else None)
+                    verdict = self.compliance_voter.decide(presence_active=presence_active)
+                    if verdict is not None:
+                        self.finish_splash_vote(verdict)
+                        return  # Stop camera feed updates
+                elif result is not None:
+                    # No model available - assume clean
+                    self.compliance_result = "clean"
             
         except Exception as e:
             print(f"Error updating camera feed: {e}")
@@ -3227,18 +3129,46 @@ class AINiformLogin:
         if self.splash_is_running:
             self.main_frame.after(33, self.update_splash_camera_feed)  # ~30 FPS
     
-
+    def finish_splash_vote(self, verdict):
+        """Leave the splash screen as soon as the compliance vote is confident"""
+        print(f"Compliance vote finished early: {verdict}")
+        self.compliance_result = verdict
+        self.close_splash_and_restore()
     
     def close_splash_and_restore(self):
         """Close the splash screen and restore guard interface"""
+        if not self.splash_is_running:
+            # Already closed by the vote, the timer or Escape
+            return
         self.splash_is_running = False
+        
+        # Cancel the fixed-duration auto-close when the vote or Escape got here first
+        if getattr(self, 'splash_close_after_id', None):
+            try:
+                self.main_frame.after_cancel(self.splash_close_after_id)
+            except Exception:
+                pass
+            self.splash_close_after_id = None
+        
+        if self.splash_detection_worker:
+            self.splash_detection_worker.stop()
         if self.splash_camera_detector:
             self.splash_camera_detector.cleanup()
         
+        # Use the best verdict the vote reached if time ran out before it was confident
+        if self.compliance_result is None and self.compliance_voter.total_frames:
+            self.compliance_result = self.compliance_voter.current_verdict()
+        
         # Enable logout button after splash screen closes
         self.enable_logout_button()
         
-        # Restore the guard interface
+        # Restore the guard interface, with the verdict in the message area and on the main screen
+        if self.compliance_result is not None:
+            self.publish_to_display('verdict', person_id=self.compliance_person_data.get('id'),
+                                    verdict=self.compliance_result)
+            name = self.compliance_person_data.get('name', '')
+            self.last_response_message = f"{name}: {COMPLIANCE_MESSAGES[self.compliance_result]}"
+            self._schedule_message_reset()
         self.show_guard_interface()
         
         # Unbind escape key
@@ -4577,139 +4507,18 @@ def close_compliance_and_restore(self):
 
 def get_violation_count(self, person_id):
     """Get violation count for a person"""
-    try:
-        violations_file = "violations.txt"
-        if not os.path.exists(violations_file):
-            return 0
-        
-        with open(violations_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('#') or not line:
-                    continue
-                
-                parts = line.split(',')
-                if len(parts) >= 2:
-                    db_id = parts[0]
-                    count = int(parts[1])
-                    
-                    if db_id == person_id:
-                        return count
-        
-        return 0
-    except Exception as e:
-        print(f"Error getting violation count: {e}")
-        return 0
+    return self.db_manager.get_violation_count(person_id)
 
 def add_violation(self, person_id):
     """Add a violation for a person"""
-    try:
-        violations_file = "violations.txt"
-        
-        # Read existing violations
-        violations = {}
-        if os.path.exists(violations_file):
-            with open(violations_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 2:
-                        db_id = parts[0]
-                        count = int(parts[1])
-                        violations[db_id] = count
-        
-        # Add or increment violation count
-        if person_id in violations:
-            violations[person_id] += 1
-        else:
-            violations[person_id] = 1
-        
-        # Write back to file
-        with open(violations_file, 'w') as f:
-            f.write("# Person ID, Violation Count\n")
-            for db_id, count in violations.items():
-                f.write(f"{db_id},{count}\n")
-        
-        print(f"Added violation for {person_id}. New count: {violations[person_id]}")
-        
-    except Exception as e:
-        print(f"Error adding violation: {e}")
-
-def update_splash_camera_feed(self):
-    """Update camera feed for splash screen with detection logic"""
-    try:
-        if self.splash_camera_detector and self.splash_camera_detector.cap:
-            frame = self.splash_camera_detector.get_frame_with_detection()
-            if frame is not None:
-                # Convert frame to PhotoImage
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_pil = Image.fromarray(frame_rgb)
-                frame_pil = frame_pil.resize((640, 480), Image.Resampling.LANCZOS)
-                self.splash_camera_photo = ImageTk.PhotoImage(frame_pil)
-                
-                # Update camera label
-                self.splash_camera_label.configure(image=self.splash_camera_photo, text="")
-                
-                # Check for detections and determine compliance
-                if self.splash_camera_detector.model is not None:
-                    detections = self.splash_camera_detector.detect_objects(frame)
-                    print(f"Detection count: {len(detections)}")  # Debug print
-                    
-                    if detections:
-                        # Reset no detection counter
-                        self.no_detection_count = 0
-                        
-                        # Analyze detections to determine result
-                        class_counts = {}
-                        for detection in detections:
-                            class_name = detection['class_name'].lower()
-                            class_counts[class_name] = class_counts.get(class_name, 0) + 1
-                        
-                        # Check if all required items are detected
-                        ict_longsleeve = class_counts.get('ict longsleeve', 0)
-                        ict_logo = class_counts.get('ict logo', 0)
-                        black_shoes = class_counts.get('black shoes', 0)
-                        ict_pants = class_counts.get('ict pants', 0)
-                        
-                        if ict_longsleeve >= 1 and ict_logo >= 1 and black_shoes >= 1 and ict_pants >= 1:
-                            # All required items detected - clean
-                            self.compliance_result = "clean"
-                        else:
-                            # Partial detection - manual verification needed
-                            self.compliance_result = "manual_verification"
-                            print("Manual verification needed - showing compliance interface")
-                            self.show_uniform_compliance_interface(self.compliance_person_data, "manual_verification")
-                            return  # Stop camera feed updates
-                    else:
-                        # No detections - increment counter
-                        self.no_detection_count += 1
-                        print(f"No objects detected - count: {self.no_detection_count}")  # Debug print
-                        
-                        # Show no object splash screen after 3 seconds (90 frames at 30fps)
-                        if self.no_detection_count >= 90:
-                            print("No objects detected for 3 seconds - showing no object splash screen")  # Debug print
-                            self.compliance_result = "no_object"
-                            self.show_no_object_splash()
-                            return  # Stop camera feed updates
-                else:
-                    # No model available - assume clean
-                    print("No model available - assuming clean")  # Debug print
-                    self.compliance_result = "clean"
-            
-    except Exception as e:
-        print(f"Error updating camera feed: {e}")
-    
-    # Schedule next update
-    if self.splash_is_running:
-        self.main_frame.after(33, self.update_splash_camera_feed)  # ~30 FPS
+    return self.db_manager.add_violation(person_id)
 
 def show_no_object_splash(self):
     """Show splash screen when no objects are detected"""
     # Stop camera feed
     self.splash_is_running = False
+    if self.splash_detection_worker:
+        self.splash_detection_worker.stop()
     if self.splash_camera_detector:
         self.splash_camera_detector.cleanup()
     
@@ -4847,11 +4656,17 @@ def close_no_object_splash(self):
 def close_splash_and_restore(self):
     """Close the splash screen and show compliance interface"""
     self.splash_is_running = False
+    if self.splash_detection_worker:
+        self.splash_detection_worker.stop()
     if self.splash_camera_detector:
         self.splash_camera_detector.cleanup()
     
+    # Use the best verdict the vote reached if time ran out before it was confident
+    if not getattr(self, 'compliance_result', None) and hasattr(self, 'compliance_voter') and self.compliance_voter.total_frames:
+        self.compliance_result = self.compliance_voter.current_verdict()
+    
     # Show compliance interface based on detection result
-    if hasattr(self, 'compliance_result'):
+    if getattr(self, 'compliance_result', None):
         if self.compliance_result == "no_object":
             # If no object was detected, we already showed the no object splash
             # Now restore the guard interface
@@ -4883,6 +4698,13 @@ def main():
     
     # Start the application
     root.mainloop()
+    
+    app.display_bus.stop()
+    
+    # Close the main screen processes and release the camera device owned by the capture thread
+    if app.main_screen_supervisor is not None:
+        app.main_screen_supervisor.stop()
+    release_shared_cameras()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Single-process host for the guard console and the public main screen
+
+Runs the Tkinter guard console (ai_niform_login.py) and the PyQt5 1920x1080
+display (testmainscreen.py) as two windows of one process. Qt owns the
+event loop and pumps Tk from a timer, so both stay responsive. The
+display is built once and then only shown/hidden on guard login and
+logout, and it reads cards through the console's DatabaseManager, so both
+windows share one card index cache and one YOLO model service.
+
+Run this instead of ai_niform_login.py; starting ai_niform_login.py on its
+own still launches the main screen as a separate process.
+"""
+
+import sys
+import time
+import tkinter as tk
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+
+from ai_niform_login import AINiformLogin, release_shared_cameras
+from testmainscreen import STIWelcomeScreen
+
+
+class AppHost:
+    """Owns the Qt application, the Tk root and both screens"""
+    def __init__(self, pump_interval_ms=10):
+        """Create the Qt application, the guard console and the Tk pump timer"""
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.app.setStyle('Fusion')
+        # Hiding the main screen must not end the process
+        self.app.setQuitOnLastWindowClosed(False)
+
+        self.root = tk.Tk()
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+        self.login = AINiformLogin(self.root, main_screen_host=self)
+        self.main_screen = None
+
+        # Qt runs the event loop; Tk gets its events processed from a timer
+        self.pump_timer = QTimer()
+        self.pump_timer.timeout.connect(self.pump_tk)
+        self.pump_timer.start(pump_interval_ms)
+
+    def pump_tk(self):
+        """Process pending Tk events"""
+        try:
+            self.root.update()
+        except tk.TclError:
+            # The Tk root was destroyed
+            self.quit()
+
+    def show_main_screen(self):
+        """Show the main screen, building it on first use"""
+        start_time = time.perf_counter()
+        if self.main_screen is None:
+            self.main_screen = STIWelcomeScreen(db_manager=self.login.db_manager, host=self)
+        self.main_screen.show()
+        self.main_screen.raise_()
+        self.main_screen.activateWindow()
+        print(f"Main screen shown in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    def hide_main_screen(self):
+        """Hide the main screen (it is kept for the next login)"""
+        if self.main_screen is not None:
+            self.main_screen.hide()
+
+    def show_login(self):
+        """Bring the guard console back to the front"""
+        self.hide_main_screen()
+        try:
+            self.root.deiconify()
+            self.root.lift()
+            self.login.focus_guard_entry()
+        except tk.TclError:
+            pass
+
+    def quit(self):
+        """Close both screens and leave the event loop"""
+        self.pump_timer.stop()
+        self.login.running = False
+        self.login.display_bus.stop()
+        if self.main_screen is not None:
+            self.main_screen.close()
+        try:
+            self.root.destroy()
+        except tk.TclError:
+            pass
+        self.app.quit()
+
+    def run(self):
+        """Run the shared event loop until quit()"""
+        return self.app.exec_()
+
+
+def main():
+    host = AppHost()
+    exit_code = host.run()
+
+    # Release the camera device owned by the capture thread
+    release_shared_cameras()
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
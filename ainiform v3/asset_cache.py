@@ -0,0 +1,144 @@
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap, QPainter, QPainterPath
+
+# Images every main screen uses, at the sizes the screens draw them: (path, width, height, corner radius)
+STATIC_ASSETS = [
+    (os.path.join("image-elements", "STI Balagtas Logo.png"), 400, 400, 0),
+    (os.path.join("image-elements", "Generic User Image.jpg"), 180, 180, 3),
+    (os.path.join("image-elements", "Instructions Scan.png"), 1344, 900, 0),
+    (os.path.join("image-elements", "scan-ok.png"), 1024, 1024, 0)
+]
+STATIC_PATHS = {asset[0] for asset in STATIC_ASSETS}
+
+# Per-person photos, named {person_id}{extension} (same lookup as the guard console)
+PHOTO_FOLDERS = {'student': 'image-students', 'teacher': 'image-teachers'}
+PHOTO_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
+
+
+def rounded_pixmap(pixmap, radius):
+    """Copy of pixmap clipped to a rounded rectangle"""
+    rounded = QPixmap(pixmap.size())
+    rounded.fill(Qt.transparent)
+
+    painter = QPainter(rounded)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+    # Create rounded rectangle path
+    path = QPainterPath()
+    path.addRoundedRect(0, 0, pixmap.width(), pixmap.height(), radius, radius)
+    painter.setClipPath(path)
+
+    # Draw the image
+    painter.drawPixmap(0, 0, pixmap)
+    painter.end()
+    return rounded
+
+
+class PixmapCache:
+    """Decoded, scaled and rounded pixmaps for the main screen
+
+    Every screen of testmainscreen.py is rebuilt when it is shown, and used
+    to read, decode, scale and round the same images from disk each time.
+    Here each image is prepared once per (path, width, height, radius) and
+    handed out as an implicitly shared QPixmap, so a label costs no copy.
+    Static screen elements are kept for the life of the window (preload()
+    prepares them at startup); per-person photos go into a small LRU so a
+    steady stream of different people can't grow the cache without bound.
+    Must be used on the Qt thread, after the QApplication exists.
+    """
+    def __init__(self, photo_capacity=32):
+        """Initialize empty caches"""
+        self.photo_capacity = photo_capacity
+        self.static = {}
+        self.photos = OrderedDict()
+        self.paths = {}
+        self.hits = 0
+        self.misses = 0
+
+    def exists(self, path):
+        """os.path.exists, remembered for the static screen elements only
+
+        Person photos are looked up on every scan, so one added while the
+        screen runs is shown, and unknown IDs never accumulate here.
+        """
+        if path in self.paths:
+            return self.paths[path]
+        found = os.path.exists(path)
+        if path in STATIC_PATHS:
+            self.paths[path] = found
+        return found
+
+    def _load(self, path, width, height, radius):
+        """Read and prepare one pixmap, or None if it can't be decoded"""
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            return None
+        pixmap = pixmap.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if radius:
+            pixmap = rounded_pixmap(pixmap, radius)
+        return pixmap
+
+    def get(self, path, width, height, radius=0, photo=False):
+        """The image at path scaled to fit width x height (and rounded), or None if it is missing"""
+        key = (path, width, height, radius)
+        cache = self.photos if photo else self.static
+        if key in cache:
+            self.hits += 1
+            if photo:
+                self.photos.move_to_end(key)
+            return cache[key]
+
+        self.misses += 1
+        if not self.exists(path):
+            return None
+        pixmap = self._load(path, width, height, radius)
+        if pixmap is None:
+            # An unreadable file shows as an empty label, as before
+            print(f"Error loading image: {path}")
+            return QPixmap()
+        cache[key] = pixmap
+        if photo and len(self.photos) > self.photo_capacity:
+            # Drop the least recently shown person
+            self.photos.popitem(last=False)
+        return pixmap
+
+    def person_photo_path(self, person):
+        """Path of a person's photo, or None if they have none"""
+        folder = PHOTO_FOLDERS.get(str(person.get('role', '')).lower())
+        if folder is None or person.get('id') is None:
+            return None
+        for ext in PHOTO_EXTENSIONS:
+            image_path = os.path.join(folder, f"{person['id']}{ext}")
+            if self.exists(image_path):
+                return image_path
+        return None
+
+    def person_photo(self, person, width, height, radius=0):
+        """A person's photo from the LRU, or None if they have none"""
+        image_path = self.person_photo_path(person) if person else None
+        if image_path is None:
+            return None
+        return self.get(image_path, width, height, radius, photo=True)
+
+    def preload(self, assets=STATIC_ASSETS):
+        """Prepare the static screen elements; returns how many were loaded"""
+        return sum(1 for path, width, height, radius in assets
+                   if self.get(path, width, height, radius) is not None)
+
+    def forget_paths(self):
+        """Look the static screen elements up again (after image-elements/ changed)"""
+        self.paths = {}
+
+    def stats(self):
+        """Cache sizes and hit/miss counts"""
+        return {
+            'static': len(self.static),
+            'photos': len(self.photos),
+            'photo_capacity': self.photo_capacity,
+            'hits': self.hits,
+            'misses': self.misses
+        }
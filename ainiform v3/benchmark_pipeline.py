@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the uniform detection pipeline
+
+Replays a directory of images, a recorded video or synthetic frames
+(see frame_source.py) through the same stages
+as the splash screen (capture -> preprocess -> inference -> post-processing
+-> DetectionResult -> preview render) for every combination of backend,
+input size and thread count. Reports p50/p95/p99 latency per stage,
+throughput and peak RSS, and writes everything as JSON (tagged with the
+git commit) so runs can be compared across commits with --baseline.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import subprocess
+import multiprocessing
+
+import cv2
+import numpy as np
+
+STAGES = ('capture', 'preprocess', 'inference', 'postprocess', 'result', 'render', 'total')
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ainiform2", "yolo", "house_shirt")
+
+
+def percentiles(samples):
+    """Summary statistics (ms) for one stage"""
+    values = np.array(samples) if samples else np.zeros(1)
+    return {
+        'mean': round(float(values.mean()), 3),
+        'p50': round(float(np.percentile(values, 50)), 3),
+        'p95': round(float(np.percentile(values, 95)), 3),
+        'p99': round(float(np.percentile(values, 99)), 3)
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def render_preview(drawer, frame, result, size=(640, 480)):
+    """Headless version of the splash preview: draw boxes, convert to RGB, fit the preview size"""
+    frame = drawer.draw_detections(frame, result)
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    if (frame_rgb.shape[1], frame_rgb.shape[0]) != size:
+        frame_rgb = cv2.resize(frame_rgb, size, interpolation=cv2.INTER_AREA)
+    return frame_rgb
+
+
+def run_config(model_path, source_path, backend_name, imgsz, threads, frames, warmup, conf,
+               frame_size=None, realtime=False):
+    """Benchmark one backend/imgsz/threads combination in the current process"""
+    from inference_backend import create_backend
+    from frame_source import create_frame_source
+    from detection_result import DetectionResult
+    from ai_niform_login import YOLOCameraDetection
+
+    if threads:
+        cv2.setNumThreads(threads)
+    backend = create_backend(model_path, backend_name, threads)
+    if not backend.load():
+        return {'error': f"could not load the {backend_name} backend"}
+
+    # The splash screen's own drawing code (no camera is opened)
+    drawer = YOLOCameraDetection(model_path)
+    source = create_frame_source(source_path, realtime)
+    width, height = frame_size or (None, None)
+    if not source.open(width, height):
+        return {'error': f"could not open {source_path}"}
+    samples = {stage: [] for stage in STAGES}
+
+    run_start = None
+    for frame_number in range(warmup + frames):
+        if frame_number == warmup:
+            run_start = time.perf_counter()
+            samples = {stage: [] for stage in STAGES}
+
+        start_time = time.perf_counter()
+        ret, frame = source.read()
+        if not ret:
+            break
+        capture_end = time.perf_counter()
+
+        boxes, confidences, class_ids = backend.predict_arrays(frame, conf, imgsz)
+        inference_end = time.perf_counter()
+
+        result = DetectionResult(frame_number, boxes, confidences, class_ids, backend.names)
+        result.is_complete_uniform()
+        result_end = time.perf_counter()
+
+        render_preview(drawer, frame, result)
+        render_end = time.perf_counter()
+
+        samples['capture'].append((capture_end - start_time) * 1000)
+        samples['preprocess'].append(backend.timings.get('preprocess_ms', 0.0))
+        samples['inference'].append(backend.timings.get('inference_ms', 0.0))
+        samples['postprocess'].append(backend.timings.get('postprocess_ms', 0.0))
+        samples['result'].append((result_end - inference_end) * 1000)
+        samples['render'].append((render_end - result_end) * 1000)
+        samples['total'].append((render_end - start_time) * 1000)
+
+    elapsed = time.perf_counter() - run_start if run_start else 0.0
+    source.release()
+    measured = len(samples['total'])
+    return {
+        'backend': backend_name,
+        'imgsz': imgsz,
+        'threads': threads,
+        'frames': measured,
+        'throughput_fps': round(measured / elapsed, 2) if elapsed else 0.0,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages_ms': {stage: percentiles(values) for stage, values in samples.items()}
+    }
+
+
+def _config_worker(queue, args):
+    """Child process entry point: run one configuration and send back its results"""
+    try:
+        queue.put(run_config(*args))
+    except Exception as e:
+        queue.put({'error': str(e)})
+
+
+def run_isolated(args):
+    """Run one configuration in a fresh process so imports and peak RSS don't leak between configs"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_config_worker, args=(queue, args))
+    process.start()
+    while True:
+        try:
+            result = queue.get(timeout=1.0)
+            break
+        except Exception:
+            if not process.is_alive():
+                result = {'error': f"benchmark process exited with code {process.exitcode}"}
+                break
+    process.join()
+    return result
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except Exception:
+        return None
+
+
+def print_results(report, baseline=None):
+    """Print one line per configuration (and the change versus a baseline run)"""
+    previous = {}
+    if baseline:
+        for entry in baseline.get('results', []):
+            previous[(entry.get('backend'), entry.get('imgsz'), entry.get('threads'))] = entry
+
+    print(f"\nPipeline benchmark ({report['frames']} frames from {report['source']}, commit {report['commit']})")
+    print(f"{'backend':<9}{'imgsz':>6}{'thr':>5}{'fps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'infer p50':>11}{'RSS MB':>9}")
+    for entry in report['results']:
+        if 'error' in entry:
+            print(f"  error: {entry['error']}")
+            continue
+        total = entry['stages_ms']['total']
+        line = (f"{entry['backend']:<9}{entry['imgsz'] or '-':>6}{entry['threads'] or '-':>5}"
+                f"{entry['throughput_fps']:>8.1f}{total['p50']:>9.1f}{total['p95']:>9.1f}{total['p99']:>9.1f}"
+                f"{entry['stages_ms']['inference']['p50']:>11.1f}{entry['peak_rss_mb']:>9.1f}")
+        old = previous.get((entry['backend'], entry['imgsz'], entry['threads']))
+        if old and 'stages_ms' in old:
+            old_p50 = old['stages_ms']['total']['p50']
+            change = (total['p50'] - old_p50) / old_p50 * 100 if old_p50 else 0.0
+            line += f"   p50 {change:+.1f}% vs {baseline.get('commit')}"
+        print(line)
+
+
+def parse_list(value, cast):
+    """Parse a comma-separated option ('none' becomes None)"""
+    return [None if part.strip().lower() in ('none', 'default') else cast(part) for part in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the uniform detection pipeline offline')
+    parser.add_argument('--source', type=str, default=DEFAULT_SOURCE,
+                       help="Image directory, video file or 'synthetic' to replay (default: ainiform2/yolo/house_shirt)")
+    parser.add_argument('--frame-size', type=str, default='native',
+                       help="Resize frames to WIDTHxHEIGHT, e.g. 640x480 like the camera (default: native)")
+    parser.add_argument('--realtime', action='store_true',
+                       help="Deliver frames at the source's frame rate instead of as fast as possible")
+    parser.add_argument('--model', type=str, default='best.pt',
+                       help='Path to YOLO model file (default: best.pt)')
+    parser.add_argument('--backends', type=str, default='torch',
+                       help='Comma-separated backends: torch, onnx, openvino (default: torch)')
+    parser.add_argument('--imgsz', type=str, default='640',
+                       help='Comma-separated inference sizes (default: 640)')
+    parser.add_argument('--threads', type=str, default='none',
+                       help="Comma-separated thread counts, 'none' for the library default (default: none)")
+    parser.add_argument('--frames', type=int, default=200,
+                       help='Measured frames per configuration (default: 200)')
+    parser.add_argument('--warmup', type=int, default=10,
+                       help='Unmeasured warm-up frames per configuration (default: 10)')
+    parser.add_argument('--conf', type=float, default=0.5,
+                       help='Confidence threshold (default: 0.5)')
+    parser.add_argument('--output', type=str, default='benchmark_results.json',
+                       help='JSON results file (default: benchmark_results.json)')
+    parser.add_argument('--baseline', type=str, default=None,
+                       help='Earlier results file to compare against')
+    parser.add_argument('--in-process', action='store_true',
+                       help='Run every configuration in this process (peak RSS is then cumulative)')
+
+    args = parser.parse_args()
+    frame_size = None
+    if args.frame_size != 'native':
+        frame_size = tuple(int(part) for part in args.frame_size.lower().split('x'))
+    configs = [(args.model, args.source, backend, imgsz, threads, args.frames, args.warmup, args.conf,
+                frame_size, args.realtime)
+               for backend in parse_list(args.backends, str)
+               for imgsz in parse_list(args.imgsz, int)
+               for threads in parse_list(args.threads, int)]
+
+    results = []
+    for config in configs:
+        print(f"Running backend={config[2]} imgsz={config[3]} threads={config[4]}...")
+        results.append(run_config(*config) if args.in_process else run_isolated(config))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'platform': {'python': platform.python_version(), 'machine': platform.machine(),
+                     'processor': platform.processor(), 'cpu_count': os.cpu_count()},
+        'source': args.source,
+        'frame_size': args.frame_size,
+        'realtime': args.realtime,
+        'frames': args.frames,
+        'results': results
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the guard login screen
+
+Profiles what `import ai_niform_login` costs with `python -X importtime`
+in fresh interpreters, reports the slowest top-level packages, and flags
+heavy modules (OpenCV, NumPy, torch, ultralytics, PyQt5) that are imported
+before the login screen can appear - those should be loaded in the
+background by startup_loader.py instead. It also measures how long the
+background loader takes to make the vision modules ready. Results are
+written as JSON so runs can be compared with --baseline.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# Modules that must not be imported on the login screen's critical path
+HEAVY_MODULES = ('cv2', 'numpy', 'torch', 'ultralytics', 'onnxruntime', 'openvino', 'PyQt5')
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+READY_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from startup_loader import get_vision_loader
+loader = get_vision_loader()
+loader.start()
+loader.wait()
+ready = time.perf_counter()
+print(json.dumps({{'import_ms': (imported - start) * 1000, 'ready_ms': (ready - start) * 1000,
+                  'loader_ms': loader.timings}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into (self_us, cumulative_us, depth, module) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+            rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def profile_imports(module, python=sys.executable):
+    """Import module in a fresh interpreter with -X importtime; returns the parsed rows"""
+    completed = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                               cwd=SCRIPT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'import failed')
+    return parse_importtime(completed.stderr)
+
+
+def summarize_imports(rows, top):
+    """Total import time, slowest top-level packages and heavy modules on the critical path"""
+    packages = {}
+    for self_us, _, _, name in rows:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    imported = {name.split('.')[0] for _, _, _, name in rows}
+    return {
+        'total_ms': round(sum(row[1] for row in rows if row[2] == 0) / 1000, 1),
+        'module_count': len(rows),
+        'slowest_packages_ms': {package: round(us / 1000, 1) for package, us in slowest},
+        'heavy_on_critical_path': [name for name in HEAVY_MODULES if name in imported]
+    }
+
+
+def measure_ready(module, python=sys.executable):
+    """Time to import module and time until the background vision loader is ready"""
+    completed = subprocess.run([python, '-c', READY_SCRIPT.format(module=module)],
+                               cwd=SCRIPT_DIR, capture_output=True, text=True)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    return {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr else 'no output'}
+
+
+def print_report(report, baseline=None):
+    """Print the startup summary (and the change versus a baseline run)"""
+    imports = report['imports']
+    print(f"\nStartup benchmark for {report['module']} ({report['runs']} runs, commit {report['commit']})")
+    print(f"  import time (median): {imports['total_ms']:.1f} ms over {imports['module_count']} modules")
+    if baseline:
+        old_total = baseline['imports']['total_ms']
+        change = (imports['total_ms'] - old_total) / old_total * 100 if old_total else 0.0
+        print(f"  vs {baseline.get('commit')}: {old_total:.1f} ms ({change:+.1f}%)")
+    print("  slowest packages:")
+    for package, ms in imports['slowest_packages_ms'].items():
+        print(f"    {package:<28}{ms:>9.1f} ms")
+    if imports['heavy_on_critical_path']:
+        print(f"  WARNING: heavy modules imported before the login screen: "
+              f"{', '.join(imports['heavy_on_critical_path'])}")
+    else:
+        print("  no heavy modules on the critical path")
+    ready = report['vision_ready']
+    if 'error' in ready:
+        print(f"  vision loader: error: {ready['error']}")
+    else:
+        print(f"  vision modules ready after {ready['ready_ms']:.0f} ms (in the background)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile the login screen cold start')
+    parser.add_argument('--module', type=str, default='ai_niform_login',
+                       help='Module to profile (default: ai_niform_login)')
+    parser.add_argument('--runs', type=int, default=5,
+                       help='Fresh-interpreter runs; the median is reported (default: 5)')
+    parser.add_argument('--top', type=int, default=15,
+                       help='Number of slowest packages to list (default: 15)')
+    parser.add_argument('--output', type=str, default='startup_results.json',
+                       help='JSON results file (default: startup_results.json)')
+    parser.add_argument('--baseline', type=str, default=None,
+                       help='Earlier results file to compare against')
+
+    args = parser.parse_args()
+
+    # Median run by total import time, so one slow disk read doesn't skew the report
+    summaries = []
+    for run in range(args.runs):
+        try:
+            summaries.append(summarize_imports(profile_imports(args.module), args.top))
+        except RuntimeError as e:
+            print(f"Error importing {args.module}: {e}")
+            sys.exit(1)
+    totals = [summary['total_ms'] for summary in summaries]
+    median_summary = sorted(summaries, key=lambda summary: summary['total_ms'])[len(summaries) // 2]
+
+    from benchmark_pipeline import git_commit
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'module': args.module,
+        'runs': args.runs,
+        'import_totals_ms': totals,
+        'imports': median_summary,
+        'vision_ready': measure_ready(args.module)
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
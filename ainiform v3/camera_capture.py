@@ -0,0 +1,257 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from frame_source import create_frame_source
+from shared_frame_ring import SharedFrameRing
+
+
+class SharedCameraCapture:
+    """Background thread that owns the camera for the life of the app
+
+    Frames are decoded straight into a fixed-size, preallocated ring buffer.
+    Consumers read the newest slot without reopening the device. A view
+    returned by get_latest() stays valid until buffer_size - 1 newer frames
+    have been captured; slow consumers should ask for a copy.
+
+    Frames come from a FrameSource, so a video file, an image directory or
+    the synthetic generator can stand in for the camera.
+
+    Once a preview asks for RGB frames (enable_rgb), the capture thread also
+    converts every frame into a parallel RGB ring, so the UI thread only has
+    to copy the newest one. With share_frames, every frame is also published
+    to a SharedFrameRing so other processes (the Qt main screen, a recorder)
+    can show the camera without opening it.
+    """
+    def __init__(self, camera_id=0, width=640, height=480, fps=30, buffer_size=4, source=None, share_frames=False):
+        """Initialize the capture thread and allocate the ring buffer"""
+        self.camera_id = camera_id
+        self.source = source if source is not None else create_frame_source(camera_id)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer_size = buffer_size
+        self.frames = np.zeros((buffer_size, height, width, 3), dtype=np.uint8)
+        self.rgb_frames = None
+        self.share_frames = share_frames
+        self.frame_ring = None
+        self.frame_ids = [-1] * buffer_size
+        self.rgb_frame_ids = [-1] * buffer_size
+        self.timestamps = [0.0] * buffer_size
+        self.latest_index = -1
+        self.frame_count = 0
+        self.cap = None
+        self.is_running = False
+        self.is_opened = False
+        self._thread = None
+        self._opened_event = threading.Event()
+        self._frame_condition = threading.Condition()
+        self._start_lock = threading.Lock()
+
+    def start(self, timeout=None):
+        """Open the device in the capture thread; returns True once the camera is open"""
+        # The vision loader and the splash can both start the camera; only one may open it
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self.is_running = True
+                self._opened_event.clear()
+                self._thread = threading.Thread(target=self._capture_loop, name="SharedCameraCapture", daemon=True)
+                self._thread.start()
+        if timeout is not None:
+            self._opened_event.wait(timeout)
+        return self.is_opened
+
+    def _open_device(self):
+        """Open and configure the frame source"""
+        try:
+            self.cap = self.source
+            if not self.cap.open(self.width, self.height, self.fps):
+                return False
+
+            print(f"Camera {self.camera_id} initialized successfully ({self.cap.describe()})!")
+            return True
+        except Exception as e:
+            print(f"Error initializing camera: {e}")
+            return False
+
+    def _capture_loop(self):
+        """Read frames into the ring buffer until stopped"""
+        self.is_opened = self._open_device()
+        self._opened_event.set()
+        if not self.is_opened:
+            self.is_running = False
+            return
+
+        while self.is_running:
+            slot = (self.latest_index + 1) % self.buffer_size
+            ret, frame = self.cap.read(self.frames[slot])
+            if not ret:
+                time.sleep(0.01)
+                continue
+
+            if frame is not self.frames[slot]:
+                # Device ignored the requested size - resize the ring once to match
+                if frame.shape != self.frames.shape[1:]:
+                    self._reallocate(frame.shape)
+                self.frames[slot][...] = frame
+
+            # Colour conversion for the preview happens here, off the UI thread
+            rgb_frames = self.rgb_frames
+            converted = rgb_frames is not None and rgb_frames.shape == self.frames.shape
+            if converted:
+                cv2.cvtColor(self.frames[slot], cv2.COLOR_BGR2RGB, dst=rgb_frames[slot])
+
+            if self.share_frames:
+                self._publish_shared(self.frames[slot])
+
+            with self._frame_condition:
+                self.frame_count += 1
+                self.frame_ids[slot] = self.frame_count
+                self.rgb_frame_ids[slot] = self.frame_count if converted else -1
+                self.timestamps[slot] = time.monotonic()
+                self.latest_index = slot
+                self._frame_condition.notify_all()
+
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.frame_ring = None
+        self.is_opened = False
+
+    def _publish_shared(self, frame):
+        """Copy a frame into the shared-memory ring, (re)creating it for the frame shape"""
+        try:
+            if self.frame_ring is None or self.frame_ring.shape != frame.shape:
+                if self.frame_ring is not None:
+                    self.frame_ring.close()
+                self.frame_ring = SharedFrameRing(frame.shape, self.buffer_size)
+            self.frame_ring.publish(frame)
+        except Exception as e:
+            print(f"Error sharing camera frames: {e}")
+            self.share_frames = False
+
+    def _reallocate(self, shape):
+        """Reallocate the ring buffer for the real device frame shape"""
+        print(f"Camera {self.camera_id} delivers {shape[1]}x{shape[0]} frames - resizing ring buffer")
+        with self._frame_condition:
+            self.frames = np.zeros((self.buffer_size,) + tuple(shape), dtype=np.uint8)
+            if self.rgb_frames is not None:
+                self.rgb_frames = np.zeros_like(self.frames)
+            self.frame_ids = [-1] * self.buffer_size
+            self.rgb_frame_ids = [-1] * self.buffer_size
+            self.latest_index = -1
+            self.height, self.width = shape[0], shape[1]
+
+    def get_latest(self, copy=False):
+        """Get (frame_id, frame) for the newest frame, or (None, None) before the first frame"""
+        with self._frame_condition:
+            index = self.latest_index
+            if index < 0:
+                return None, None
+            frame_id = self.frame_ids[index]
+            frame = self.frames[index]
+        if copy:
+            frame = frame.copy()
+        return frame_id, frame
+
+    def is_current(self, frame_id):
+        """True if the view returned with frame_id has not started being overwritten"""
+        with self._frame_condition:
+            # The capture thread starts refilling a slot once buffer_size - 1 newer frames exist
+            return self.frame_count < frame_id + self.buffer_size - 1
+
+    def enable_rgb(self):
+        """Start converting captured frames to RGB in the capture thread"""
+        with self._frame_condition:
+            if self.rgb_frames is None:
+                self.rgb_frames = np.zeros_like(self.frames)
+
+    def enable_sharing(self):
+        """Start publishing captured frames to the shared-memory ring"""
+        self.share_frames = True
+
+    def read_rgb(self, out=None):
+        """Copy the newest RGB frame into out (allocated if None); returns (ret, frame)"""
+        if self.rgb_frames is None:
+            self.enable_rgb()
+        with self._frame_condition:
+            index = self.latest_index
+            if index < 0:
+                return False, None
+            # Frames captured before enable_rgb() have no RGB copy yet
+            converted = self.rgb_frame_ids[index] == self.frame_ids[index]
+            frame = self.rgb_frames[index] if converted else self.frames[index]
+        if out is None or out.shape != frame.shape:
+            out = np.empty_like(frame)
+        if converted:
+            out[...] = frame
+        else:
+            # Convert here once instead
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+        return True, out
+
+    def wait_for_frame(self, after_frame_id=0, timeout=None):
+        """Block until a frame newer than after_frame_id exists; returns (frame_id, view)"""
+        with self._frame_condition:
+            self._frame_condition.wait_for(lambda: self.frame_count > after_frame_id or not self.is_running,
+                                           timeout)
+        return self.get_latest()
+
+    def read(self):
+        """cv2.VideoCapture-compatible read returning a private copy of the newest frame"""
+        frame_id, frame = self.get_latest(copy=True)
+        return frame is not None, frame
+
+    def isOpened(self):
+        """cv2.VideoCapture-compatible open check"""
+        return self.is_opened
+
+    def stop(self):
+        """Stop the capture thread and release the device"""
+        self.is_running = False
+        with self._frame_condition:
+            self._frame_condition.notify_all()
+        with self._start_lock:
+            if self._thread is not None:
+                self._thread.join(timeout=2.0)
+                self._thread = None
+        print("Camera cleanup completed")
+
+
+_shared_cameras = {}
+_shared_cameras_lock = threading.Lock()
+
+
+def get_shared_camera(camera_id=0):
+    """Get the process-wide capture thread for a camera, starting it on first use
+
+    AINIFORM_CAMERA_SOURCE replaces the device with another frame source
+    ('synthetic', an image directory or a video file) for headless runs;
+    AINIFORM_SOURCE_PACING=fast delivers those frames without waiting.
+    Frames are shared with other processes only once a main screen process
+    asks for them (enable_sharing), or from the start with AINIFORM_SHARE_FRAMES=1.
+    """
+    with _shared_cameras_lock:
+        camera = _shared_cameras.get(camera_id)
+        if camera is None:
+            realtime = os.environ.get("AINIFORM_SOURCE_PACING", "realtime") != "fast"
+            source = create_frame_source(os.environ.get("AINIFORM_CAMERA_SOURCE", camera_id), realtime)
+            share_frames = os.environ.get("AINIFORM_SHARE_FRAMES", "0") == "1"
+            camera = SharedCameraCapture(camera_id, source=source, share_frames=share_frames)
+            _shared_cameras[camera_id] = camera
+    camera.start()
+    return camera
+
+
+def shutdown_shared_cameras():
+    """Stop every shared capture thread (call on application exit)"""
+    with _shared_cameras_lock:
+        cameras = list(_shared_cameras.values())
+        _shared_cameras.clear()
+    for camera in cameras:
+        camera.stop()
@@ -0,0 +1,150 @@
+import os
+import time
+
+import numpy as np
+
+from detection_result import REQUIRED_UNIFORM_CLASSES, NO_BOXES, NO_CONFIDENCES, NO_CLASS_IDS, class_index
+
+# Where each required part is found on a standing person
+UPPER_BODY_CLASSES = ('ict longsleeve', 'ict logo')
+LOWER_BODY_CLASSES = ('black shoes', 'ict pants')
+# Fraction of the subject box height where the upper/lower body crops end/start
+UPPER_BODY_END = 0.6
+LOWER_BODY_START = 0.45
+
+
+class CascadeDetector:
+    """Staged per-scan detector that stops once every required uniform part is confirmed
+
+    The first stage runs the full detector (usually a RegionDetector) on
+    the whole frame with every class. A part is confirmed once it has been
+    detected at confirm_confidence or higher in confirm_frames frames. Later
+    stages only look for the parts that are still missing, using the
+    backend's classes= filter, on the part of the subject where they can be:
+    shoes and pants on the lower body crop, longsleeve and logo on the upper
+    body crop. Confirmed parts are carried forward into every result, so
+    the drawing and the compliance vote still see all four. When the last
+    part is confirmed, the result is marked final and the detection worker
+    stops scanning.
+    """
+    def __init__(self, detector, backend, required_classes=REQUIRED_UNIFORM_CLASSES,
+                 confirm_confidence=0.7, confirm_frames=2, margin=0.1):
+        """Wrap the full-frame detector and the raw backend used for crops"""
+        self.detector = detector
+        self.backend = backend
+        self.required_classes = required_classes
+        self.confirm_confidence = confirm_confidence
+        self.confirm_frames = confirm_frames
+        self.margin = margin
+        self.timings = {}
+        self.reset()
+
+    @property
+    def names(self):
+        return self.backend.names
+
+    def reset(self):
+        """Start a new scan: nothing confirmed, no subject box"""
+        self.hits = dict.fromkeys(self.required_classes, 0)
+        self.confirmed = {}  # class name -> (box, confidence) of its best detection
+        self.subject_box = None
+        self.stage = 'full'
+
+    @property
+    def is_complete(self):
+        """True once every required part is confirmed"""
+        return len(self.confirmed) == len(self.required_classes)
+
+    def missing_classes(self):
+        """Required parts not confirmed yet"""
+        return [class_name for class_name in self.required_classes if class_name not in self.confirmed]
+
+    def _crop_for(self, missing, frame_shape):
+        """(stage, x1, y1, x2, y2) of the crop to search for the missing parts, or None for the full frame"""
+        if self.subject_box is None:
+            return None
+        x1, y1, x2, y2 = self.subject_box
+        height = y2 - y1
+        if all(class_name in LOWER_BODY_CLASSES for class_name in missing):
+            return 'lower_body', x1, y1 + int(height * LOWER_BODY_START), x2, y2
+        if all(class_name in UPPER_BODY_CLASSES for class_name in missing):
+            return 'upper_body', x1, y1, x2, y1 + int(height * UPPER_BODY_END)
+        return 'subject', x1, y1, x2, y2
+
+    def _update_subject_box(self, boxes, frame_shape):
+        """Grow the tracked subject box to cover new detections (plus margin)"""
+        if len(boxes) == 0:
+            return
+        x1, y1 = int(boxes[:, 0].min()), int(boxes[:, 1].min())
+        x2, y2 = int(boxes[:, 2].max()), int(boxes[:, 3].max())
+        if self.subject_box is not None:
+            x1, y1 = min(x1, self.subject_box[0]), min(y1, self.subject_box[1])
+            x2, y2 = max(x2, self.subject_box[2]), max(y2, self.subject_box[3])
+        margin_x, margin_y = int((x2 - x1) * self.margin), int((y2 - y1) * self.margin)
+        height, width = frame_shape[:2]
+        self.subject_box = (max(0, x1 - margin_x), max(0, y1 - margin_y),
+                            min(width, x2 + margin_x), min(height, y2 + margin_y))
+
+    def _confirm(self, boxes, confidences, class_ids):
+        """Count high-confidence hits per missing part and confirm those with enough"""
+        index = class_index(self.names)
+        for class_name in self.missing_classes():
+            class_id = index.get(class_name)
+            if class_id is None:
+                continue
+            matches = np.flatnonzero(class_ids == class_id)
+            if len(matches) == 0:
+                continue
+            best = matches[confidences[matches].argmax()]
+            if confidences[best] >= self.confirm_confidence:
+                self.hits[class_name] += 1
+                if self.hits[class_name] >= self.confirm_frames:
+                    self.confirmed[class_name] = (boxes[best], float(confidences[best]))
+
+    def predict_arrays(self, frame, conf=0.5, imgsz=None, classes=None):
+        """Run the next cascade stage; returns (boxes, confidences, class_ids) including confirmed parts"""
+        start_time = time.perf_counter()
+        missing = self.missing_classes()
+        if not missing:
+            # Scan already complete - nothing left to run
+            self.stage = 'complete'
+            self.timings = {'inference_ms': 0.0, 'postprocess_ms': 0.0}
+            return self._with_confirmed(NO_BOXES, NO_CONFIDENCES, NO_CLASS_IDS)
+
+        crop = self._crop_for(missing, frame.shape) if self.confirmed else None
+        if crop is None:
+            # Stage 1 (and whenever nothing is confirmed yet): full detector, every class
+            self.stage = 'full'
+            boxes, confidences, class_ids = self.detector.predict_arrays(frame, conf, imgsz)
+            self.timings = dict(self.detector.timings)
+        else:
+            # Later stages: only the missing classes, only where they can be
+            self.stage, x1, y1, x2, y2 = crop
+            index = class_index(self.names)
+            missing_ids = [index[class_name] for class_name in missing if class_name in index]
+            boxes, confidences, class_ids = self.backend.predict_arrays(frame[y1:y2, x1:x2], conf, imgsz, missing_ids)
+            boxes = boxes + np.array([x1, y1, x1, y1], dtype=np.int32)
+            self.timings = dict(self.backend.timings)
+
+        self._update_subject_box(boxes, frame.shape)
+        self._confirm(boxes, confidences, class_ids)
+        self.timings['cascade_ms'] = (time.perf_counter() - start_time) * 1000
+        return self._with_confirmed(boxes, confidences, class_ids)
+
+    def _with_confirmed(self, boxes, confidences, class_ids):
+        """Append the carried-forward detections of confirmed parts not present in this frame"""
+        index = class_index(self.names)
+        carried = [(box, confidence, index[class_name]) for class_name, (box, confidence) in self.confirmed.items()
+                   if class_name in index and not np.any(class_ids == index[class_name])]
+        if not carried:
+            return boxes, confidences, class_ids
+        return (np.vstack([boxes] + [box[None, :] for box, _, _ in carried]).astype(np.int32),
+                np.concatenate([confidences, np.array([c for _, c, _ in carried], dtype=np.float32)]),
+                np.concatenate([class_ids, np.array([i for _, _, i in carried], dtype=np.int32)]))
+
+
+def create_cascade_detector(detector, backend):
+    """Wrap the detector in a CascadeDetector when AINIFORM_CASCADE=1"""
+    if os.environ.get("AINIFORM_CASCADE", "0") != "1":
+        return detector
+    return CascadeDetector(detector, backend)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Parity check between the torch detector and an exported inference backend
+
+Runs best.pt through ultralytics and through the ONNX Runtime or OpenVINO
+backend on the same images (by default ainiform2/yolo/house_shirt) and
+compares the detections: every detection must have a partner of the same
+class with IoU >= --min-iou and a confidence within --conf-tolerance.
+Exits with status 1 if any image does not match.
+"""
+
+import os
+import sys
+import argparse
+
+import cv2
+
+from inference_backend import TorchBackend, create_backend
+
+DEFAULT_IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ainiform2", "yolo", "house_shirt")
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def box_iou(box_a, box_b):
+    """IoU of two (x1, y1, x2, y2) boxes"""
+    x1 = max(box_a[0], box_b[0])
+    y1 = max(box_a[1], box_b[1])
+    x2 = min(box_a[2], box_b[2])
+    y2 = min(box_a[3], box_b[3])
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    union = area_a + area_b - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def match_detections(reference, candidate, min_iou, conf_tolerance):
+    """Greedily pair detections of the same class; returns (matched, unmatched_reference, unmatched_candidate)"""
+    remaining = list(candidate)
+    matched = []
+    unmatched_reference = []
+    for ref in sorted(reference, key=lambda d: d['confidence'], reverse=True):
+        best, best_iou = None, 0.0
+        for cand in remaining:
+            if cand['class_name'] != ref['class_name']:
+                continue
+            iou = box_iou(ref['bbox'], cand['bbox'])
+            if iou > best_iou:
+                best, best_iou = cand, iou
+
+        if best is not None and best_iou >= min_iou and abs(best['confidence'] - ref['confidence']) <= conf_tolerance:
+            matched.append((ref, best, best_iou))
+            remaining.remove(best)
+        else:
+            unmatched_reference.append(ref)
+    return matched, unmatched_reference, remaining
+
+
+def check_parity(model_path, backend, image_dir, conf, min_iou, conf_tolerance):
+    """Compare the torch path with another backend on every image; returns True if all match"""
+    reference_backend = TorchBackend(model_path)
+    candidate_backend = create_backend(model_path, backend)
+    if not reference_backend.load() or not candidate_backend.load():
+        print("Error: could not load both backends")
+        return False
+
+    images = sorted(f for f in os.listdir(image_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+    if not images:
+        print(f"No images found in {image_dir}")
+        return False
+
+    print(f"Comparing torch and {backend} on {len(images)} images from {image_dir}")
+    failures = 0
+    for image_name in images:
+        frame = cv2.imread(os.path.join(image_dir, image_name))
+        if frame is None:
+            print(f"  {image_name}: could not read image, skipped")
+            continue
+
+        reference = reference_backend.predict(frame, conf)
+        candidate = candidate_backend.predict(frame, conf)
+        matched, missing, extra = match_detections(reference, candidate, min_iou, conf_tolerance)
+
+        if missing or extra:
+            failures += 1
+            print(f"  {image_name}: MISMATCH ({len(matched)} matched, {len(missing)} only in torch, "
+                  f"{len(extra)} only in {backend})")
+            for detection in missing:
+                print(f"    torch only: {detection['class_name']} {detection['confidence']:.2f} {detection['bbox']}")
+            for detection in extra:
+                print(f"    {backend} only: {detection['class_name']} {detection['confidence']:.2f} {detection['bbox']}")
+        else:
+            worst_iou = min((iou for _, _, iou in matched), default=1.0)
+            print(f"  {image_name}: OK ({len(matched)} detections, worst IoU {worst_iou:.3f}, "
+                  f"torch {reference_backend.timings['inference_ms']:.1f} ms, "
+                  f"{backend} {candidate_backend.timings['inference_ms']:.1f} ms)")
+
+    print(f"\n{len(images) - failures}/{len(images)} images match")
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that an exported backend matches the torch detector')
+    parser.add_argument('--model', type=str, default='best.pt',
+                       help='Path to YOLO model file (default: best.pt)')
+    parser.add_argument('--backend', type=str, default='onnx', choices=['onnx', 'openvino'],
+                       help='Backend to compare against torch (default: onnx)')
+    parser.add_argument('--images', type=str, default=DEFAULT_IMAGE_DIR,
+                       help='Directory of test images (default: ainiform2/yolo/house_shirt)')
+    parser.add_argument('--conf', type=float, default=0.5,
+                       help='Confidence threshold (default: 0.5)')
+    parser.add_argument('--min-iou', type=float, default=0.9,
+                       help='Minimum IoU between paired boxes (default: 0.9)')
+    parser.add_argument('--conf-tolerance', type=float, default=0.05,
+                       help='Maximum confidence difference between paired boxes (default: 0.05)')
+
+    args = parser.parse_args()
+    if not check_parity(args.model, args.backend, args.images, args.conf, args.min_iou, args.conf_tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
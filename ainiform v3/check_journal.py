@@ -0,0 +1,154 @@
+import os
+import time
+import atexit
+import threading
+
+
+class CheckEventJournal:
+    """Append-only journal of Special Pass check-in/check-out events
+
+    Each check is one line appended with a single O_APPEND write, so a tap
+    costs O(1) no matter how long visitors.txt is. fsync is batched on a
+    background thread. The current check-in/check-out times per pass are kept in an
+    in-memory projection rebuilt by replaying the journal at startup.
+    """
+    def __init__(self, journal_file="special_pass_checks.journal", fsync_interval=1.0):
+        """Open the journal and replay it into the projection"""
+        self.journal_file = journal_file
+        self.fsync_interval = fsync_interval
+        self.projection = {}
+        self.event_count = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = False
+        self._fd = None
+        self._flush_event = threading.Event()
+
+        self._replay()
+        self._open()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="CheckJournalFlusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _open(self):
+        """Open the journal file for appending, writing the header for a new file"""
+        is_new = not os.path.exists(self.journal_file)
+        self._fd = os.open(self.journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if is_new:
+            os.write(self._fd, b"# Special Pass check journal\n# Format: TIMESTAMP,SPECIAL_PASS,CHECK_TYPE\n")
+
+    def _replay(self):
+        """Rebuild the projection from the journal file"""
+        if not os.path.exists(self.journal_file):
+            return
+        try:
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('#') or not line:
+                        continue
+
+                    parts = line.split(',')
+                    if len(parts) == 3:
+                        self._apply(parts[1], parts[2], parts[0])
+                        self.event_count += 1
+        except Exception as e:
+            print(f"Error replaying check journal: {e}")
+
+    def _apply(self, special_pass_id, check_type, timestamp):
+        """Apply one event to the projection (same rules as the old visitors.txt rewrite)
+
+        A check_in_time of None means "keep the value stored in visitors.txt",
+        since a check-out never touched the check-in column.
+        """
+        check_in_time, check_out_time = self.projection.get(special_pass_id, (None, None))
+        if check_type == "CHECK_IN":
+            self.projection[special_pass_id] = (timestamp, "")
+        elif check_type == "CHECK_OUT":
+            self.projection[special_pass_id] = (check_in_time, timestamp)
+
+    def append(self, special_pass_id, check_type, timestamp):
+        """Record one check event"""
+        line = f"{timestamp},{special_pass_id},{check_type}\n".encode()
+        with self._lock:
+            os.write(self._fd, line)
+            self._apply(special_pass_id, check_type, timestamp)
+            self.event_count += 1
+            self._dirty = True
+        self._flush_event.set()
+
+    def get_check_times(self, special_pass_id):
+        """(check_in_time, check_out_time) from the journal, or None if the pass has no events"""
+        with self._lock:
+            return self.projection.get(special_pass_id)
+
+    def pending_passes(self):
+        """Special Pass IDs that have events not yet compacted into visitors.txt"""
+        with self._lock:
+            return set(self.projection)
+
+    def _flush_loop(self):
+        """Batch fsync calls: at most one per fsync_interval while events arrive"""
+        while not self._closed:
+            self._flush_event.wait()
+            self._flush_event.clear()
+            if self._closed:
+                break
+            self.flush()
+            # Events arriving meanwhile are picked up by the next flush
+            time.sleep(self.fsync_interval)
+
+    def flush(self):
+        """fsync pending events to disk"""
+        with self._lock:
+            if not self._dirty or self._fd is None:
+                return
+            try:
+                os.fsync(self._fd)
+                self._dirty = False
+            except OSError as e:
+                print(f"Error syncing check journal: {e}")
+
+    def compact(self, apply_to_visitors):
+        """Fold the projection into visitors.txt via apply_to_visitors(projection), then truncate the journal
+
+        apply_to_visitors must durably replace visitors.txt before returning.
+        A crash between that and the truncation only means the same events
+        are replayed again, which is idempotent. Appends from this process
+        wait on the lock, but the journal is replaced underneath any other
+        process appending to it, so its events would be lost: only one
+        process may write the journal while it is compacted.
+        """
+        with self._lock:
+            if not self.projection:
+                return 0
+            projection = dict(self.projection)
+            apply_to_visitors(projection)
+
+            os.close(self._fd)
+            temp_file = self.journal_file + ".tmp"
+            with open(temp_file, 'w') as f:
+                f.write("# Special Pass check journal\n# Format: TIMESTAMP,SPECIAL_PASS,CHECK_TYPE\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.journal_file)
+            self._fd = os.open(self.journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+            compacted = self.event_count
+            self.projection = {}
+            self.event_count = 0
+            self._dirty = False
+            return compacted
+
+    def close(self):
+        """Flush and close the journal"""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._flush_event.set()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,148 @@
+import time
+from collections import deque
+
+from detection_result import REQUIRED_UNIFORM_CLASSES
+
+
+class ComplianceVoter:
+    """Aggregates per-frame detections over a sliding window before deciding compliance
+
+    Each DetectionResult contributes the best confidence seen for every
+    required uniform part; a part counts as seen in a frame when that
+    confidence reaches min_confidence. The window is bounded both in frames
+    and in milliseconds, so decisions do not depend on the real inference
+    frame rate. A verdict is returned as soon as the window supports it:
+
+    - clean: every required part seen in enough recent frames (early exit),
+      or a final result from the cascade detector, which already confirmed
+      every part over several frames
+    - manual_verification: someone is in view for a full window but at
+      least one part stays missing
+    - no_object: nothing detected for no_object_ms of wall-clock time; if
+      the presence gate still sees motion (someone approaching but not yet
+      detected) the wait is extended to twice as long
+    """
+    def __init__(self, window_ms=1500, max_frames=30, min_frames=3,
+                 present_ratio=0.6, missing_ratio=0.2, min_confidence=0.5,
+                 no_object_ms=3000, required_classes=REQUIRED_UNIFORM_CLASSES):
+        """Initialize the voter thresholds"""
+        self.window_ms = window_ms
+        self.max_frames = max_frames
+        self.min_frames = min_frames
+        self.present_ratio = present_ratio
+        self.missing_ratio = missing_ratio
+        self.min_confidence = min_confidence
+        self.no_object_ms = no_object_ms
+        self.required_classes = required_classes
+        self.samples = deque(maxlen=max_frames)
+        self.started_at = None
+        self.last_seen_at = None
+        self.total_frames = 0
+        self.final_verdict = None
+
+    def reset(self):
+        """Forget all accumulated frames"""
+        self.samples.clear()
+        self.started_at = None
+        self.last_seen_at = None
+        self.total_frames = 0
+        self.final_verdict = None
+
+    def start(self, now=None):
+        """Start the no-object clock before the first result arrives
+
+        With a presence gate an empty, still scene produces no results at
+        all, so the clock can't wait for the first add().
+        """
+        self.started_at = now if now is not None else time.monotonic()
+
+    def add(self, result, now=None):
+        """Add one DetectionResult to the window"""
+        now = now if now is not None else result.created_at
+        if self.started_at is None:
+            self.started_at = now
+
+        # Best confidence per required class in this frame (0.0 if absent), one vectorized pass
+        best = result.best_confidences()
+        confidences = {class_name: result.best_confidence(class_name, best) for class_name in self.required_classes}
+
+        if result:
+            self.last_seen_at = now
+        self.samples.append((now, bool(result), confidences))
+        self.total_frames += 1
+        if result.final and result.is_complete_uniform():
+            self.final_verdict = "clean"
+        self._expire(now)
+
+    def _expire(self, now):
+        """Drop samples older than the time window"""
+        while self.samples and (now - self.samples[0][0]) * 1000 > self.window_ms:
+            self.samples.popleft()
+
+    def class_scores(self):
+        """Fraction of frames in the window in which each required class was seen"""
+        if not self.samples:
+            return dict.fromkeys(self.required_classes, 0.0)
+        scores = {}
+        for class_name in self.required_classes:
+            hits = sum(1 for sample in self.samples if sample[2][class_name] >= self.min_confidence)
+            scores[class_name] = hits / len(self.samples)
+        return scores
+
+    def mean_confidences(self):
+        """Mean best confidence per required class over the current window"""
+        if not self.samples:
+            return dict.fromkeys(self.required_classes, 0.0)
+        return {class_name: sum(sample[2][class_name] for sample in self.samples) / len(self.samples)
+                for class_name in self.required_classes}
+
+    def window_span_ms(self):
+        """Time covered by the samples currently in the window"""
+        if len(self.samples) < 2:
+            return 0.0
+        return (self.samples[-1][0] - self.samples[0][0]) * 1000
+
+    def decide(self, now=None, presence_active=None):
+        """Return 'clean', 'manual_verification', 'no_object' or None if not confident yet
+
+        presence_active is the presence gate state (None when there is no gate).
+        """
+        now = now if now is not None else time.monotonic()
+
+        # The cascade detector already confirmed every part and stopped scanning
+        if self.final_verdict is not None:
+            return self.final_verdict
+
+        # Nothing seen for long enough (measured in time, not frames)
+        last_seen = self.last_seen_at if self.last_seen_at is not None else self.started_at
+        if last_seen is not None:
+            unseen_ms = (now - last_seen) * 1000
+            if unseen_ms >= self.no_object_ms and (not presence_active or unseen_ms >= 2 * self.no_object_ms):
+                return "no_object"
+
+        if len(self.samples) < self.min_frames:
+            return None
+
+        scores = self.class_scores()
+
+        # Early exit as soon as every part is consistently present
+        if all(score >= self.present_ratio for score in scores.values()):
+            return "clean"
+
+        # Only call for manual verification once a whole window has been observed with someone in view
+        window_full = (self.window_span_ms() >= self.window_ms * 0.9
+                       or len(self.samples) == self.samples.maxlen)
+        someone_visible = sum(1 for sample in self.samples if sample[1]) >= self.min_frames
+        if window_full and someone_visible and any(score <= self.missing_ratio for score in scores.values()):
+            return "manual_verification"
+
+        return None
+
+    def current_verdict(self):
+        """Best available verdict when time runs out before decide() was confident"""
+        if not any(sample[1] for sample in self.samples):
+            return "no_object"
+        scores = self.class_scores()
+        if all(score >= self.present_ratio for score in scores.values()):
+            return "clean"
+        return "manual_verification"
@@ -2,14 +2,67 @@ import os
 import datetime
 import csv
 
+from person_index import PersonIndex, parse_timestamp
+from check_journal import CheckEventJournal
+from access_logger import AsyncAccessLogger
+from violation_ledger import ViolationLedger
+
+def apply_check_projection(visitors_file, projection):
+    """Rewrite visitors.txt once with the journal's check times (atomic replace)"""
+    with open(visitors_file, 'r') as f:
+        lines = f.readlines()
+    
+    updated_lines = []
+    for line in lines:
+        if line.startswith('#') or not line.strip():
+            updated_lines.append(line)
+            continue
+        
+        parts = line.strip().split(',')
+        if len(parts) >= 10 and parts[6] in projection:
+            # Ensure we have enough fields
+            while len(parts) < 12:
+                parts.append("")
+            
+            check_in_time, check_out_time = projection[parts[6]]
+            if check_in_time is not None:
+                parts[10] = check_in_time  # Check-in time
+            parts[11] = check_out_time  # Check-out time
+            updated_lines.append(','.join(parts) + '\n')
+        else:
+            updated_lines.append(line)
+    
+    temp_file = visitors_file + ".tmp"
+    with open(temp_file, 'w') as f:
+        f.writelines(updated_lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, visitors_file)
+
 class DatabaseManager:
     def __init__(self, db_file="database.txt"):
         self.db_file = db_file
         self.visitors_file = "visitors.txt"
         self.access_log_file = "access_log.txt"
+        self.violations_file = "violations.txt"
+        self.violations_log_file = "violations.log"
         
         # Create files if they don't exist
         self._create_files_if_not_exist()
+        
+        # In-memory index over database.txt and visitors.txt, reloaded when either file changes
+        self.index = PersonIndex(self.db_file, self.visitors_file)
+        
+        # Access log lines are written in batches by a background thread
+        self.access_logger = AsyncAccessLogger(self.access_log_file)
+        
+        # Check-ins/outs are appended to a journal instead of rewriting visitors.txt
+        self.check_journal = CheckEventJournal()
+        self.check_journal_compact_threshold = 500
+        self.compact_check_journal()
+        
+        # Violation counters: in-memory map, append-only log, violations.txt as the snapshot
+        self.violation_ledger = ViolationLedger(self.violations_file, self.violations_log_file)
     
     def _create_files_if_not_exist(self):
         """Create necessary files if they don't exist"""
@@ -26,119 +79,62 @@ class DatabaseManager:
     def find_person(self, card_id):
         """Find a person by their card ID"""
         # First check visitors.txt for Special Pass IDs (prioritize fresh registrations)
-        try:
-            with open(self.visitors_file, 'r') as f:
-                # Find the most recent valid entry for this Special Pass ID
-                best_match = None
-                best_created_at = None
-                
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 10:
-                        visitor_special_pass = parts[6]  # Special Pass ID
-                        status = parts[9]  # Status
-                        visitor_name = parts[0]  # Visitor name
-                        created_at_str = parts[7]  # Creation timestamp
-                        expires_at_str = parts[8]  # Expiration timestamp
-                        
-                        if visitor_special_pass == card_id and status == "ACTIVE":
-                            try:
-                                created_at = datetime.datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
-                                expires_at = datetime.datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
-                                current_time = datetime.datetime.now()
-                                
-                                # Only consider entries that haven't expired yet
-                                if expires_at > current_time:
-                                    # Keep track of the entry with the most recent creation time
-                                    if best_match is None or created_at > best_created_at:
-                                        best_match = {
-                                            'id': visitor_special_pass,
-                                            'role': 'SPECIAL',
-                                            'name': visitor_name,
-                                            'status': status
-                                        }
-                                        best_created_at = created_at
-                            except Exception as e:
-                                print(f"Error parsing dates: {e}")
-                                # If we can't parse the dates, still consider this entry
-                                if best_match is None:
-                                    best_match = {
-                                        'id': visitor_special_pass,
-                                        'role': 'SPECIAL',
-                                        'name': visitor_name,
-                                        'status': status
-                                    }
-                
-                if best_match:
-                    return best_match
-        except Exception as e:
-            print(f"Error reading visitors file: {e}")
+        best_match = None
+        best_created_at = None
+        current_time = datetime.datetime.now()
         
-        # If not found in visitors, check the main database
-        try:
-            with open(self.db_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 3:
-                        db_id = parts[0]
-                        role = parts[1]
-                        name = parts[2]
-                        status = parts[3] if len(parts) > 3 else "ACTIVE"
-                        
-                        if db_id == card_id and status == "ACTIVE":
-                            return {
-                                'id': db_id,
-                                'role': role,
-                                'name': name,
-                                'status': status
-                            }
-        except Exception as e:
-            print(f"Error reading database: {e}")
+        for record in self.index.get_visitor_records(card_id, active_only=True):
+            created_at = record['created_at']
+            expires_at = record['expires_at']
+            
+            if created_at is None or expires_at is None:
+                # If we can't parse the dates, only use this entry when nothing else matches
+                if best_match is None:
+                    best_match = self._special_pass_person(record)
+                continue
+            
+            # Only consider entries that haven't expired yet
+            if expires_at > current_time:
+                # Keep track of the entry with the most recent creation time
+                if best_created_at is None or created_at > best_created_at:
+                    best_match = self._special_pass_person(record)
+                    best_created_at = created_at
         
-        return None
+        if best_match:
+            return best_match
+        
+        # If not found in visitors, check the main database
+        person = self.index.get_person(card_id)
+        return dict(person) if person else None
+    
+    def _special_pass_person(self, record):
+        """Build the person dict for a visitors.txt record"""
+        return {
+            'id': record['special_pass'],
+            'role': 'SPECIAL',
+            'name': record['name'],
+            'status': record['status']
+        }
     
     def is_special_pass_in_use(self, special_pass_id):
         """Check if a special pass ID is currently in use"""
-        try:
-            with open(self.visitors_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 10:  # Updated to 10 fields (removed ID)
-                        visitor_special_pass = parts[6]  # Updated index
-                        expires_at_str = parts[8]  # Updated index
-                        status = parts[9]  # Updated index
-                        
-                        if visitor_special_pass == special_pass_id and status == "ACTIVE":
-                            # Check if the pass has expired
-                            try:
-                                expires_at = datetime.datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
-                                if expires_at > datetime.datetime.now():
-                                    return True, {
-                                        'name': parts[0],  # Updated index
-                                        'expires_at': expires_at_str
-                                    }
-                            except:
-                                pass
-        except Exception as e:
-            print(f"Error checking special pass: {e}")
+        current_time = datetime.datetime.now()
+        for record in self.index.get_visitor_records(special_pass_id, active_only=True):
+            # Check if the pass has expired
+            if record['expires_at'] is not None and record['expires_at'] > current_time:
+                return True, {
+                    'name': record['name'],
+                    'expires_at': record['expires_at_str']
+                }
         
         return False, None
     
     def add_visitor(self, visitor_data):
         """Add a new visitor to the database"""
         try:
+            # A new registration must not inherit journaled check times of an earlier holder
+            self.compact_check_journal()
+            
             # First, deactivate any existing entries for the same special pass ID
             self._deactivate_existing_special_pass(visitor_data['special_pass'])
             
@@ -156,6 +152,7 @@ class DatabaseManager:
                     visitor_data['expires_at'],
                     visitor_data['status']
                 ])
+            self.index.invalidate()
             return True
         except Exception as e:
             print(f"Error adding visitor: {e}")
@@ -164,12 +161,45 @@ class DatabaseManager:
     def log_access(self, id_number, action, status="SUCCESS"):
         """Log an access attempt"""
         try:
+            # Queued for the background writer - never blocks the UI thread
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(self.access_log_file, 'a') as f:
-                f.write(f"{timestamp},{id_number},{action},{status}\n")
+            self.access_logger.log(f"{timestamp},{id_number},{action},{status}")
         except Exception as e:
             print(f"Error logging access: {e}")
     
+    def get_violation_count(self, person_id):
+        """Get violation count for a person"""
+        try:
+            return self.violation_ledger.get_count(person_id)
+        except Exception as e:
+            print(f"Error getting violation count: {e}")
+            return 0
+    
+    def add_violation(self, person_id):
+        """Add a violation for a person"""
+        try:
+            # One appended log line; violations.txt is only rewritten as a periodic snapshot
+            count = self.violation_ledger.add(person_id)
+            print(f"Added violation for {person_id}. New count: {count}")
+        except Exception as e:
+            print(f"Error adding violation: {e}")
+    
+    def get_violation_count_this_week(self, person_id):
+        """Violations recorded for a person since Monday"""
+        try:
+            return self.violation_ledger.count_this_week(person_id)
+        except Exception as e:
+            print(f"Error getting weekly violation count: {e}")
+            return 0
+    
+    def get_violation_count_this_semester(self, person_id):
+        """Violations recorded for a person since the start of the current term"""
+        try:
+            return self.violation_ledger.count_this_semester(person_id)
+        except Exception as e:
+            print(f"Error getting semester violation count: {e}")
+            return 0
+    
     def get_guard_name(self, guard_id):
         """Get guard name by ID"""
         person = self.find_person(guard_id)
@@ -179,236 +209,144 @@ class DatabaseManager:
     
     def is_student_number_valid(self, student_number):
         """Check if a student number is valid"""
-        try:
-            with open(self.db_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 3:
-                        db_id = parts[0]
-                        role = parts[1]
-                        status = parts[3] if len(parts) > 3 else "ACTIVE"
-                        
-                        # Check if it's a STUDENT_NUMBER entry and matches
-                        if role == 'STUDENT_NUMBER' and db_id == student_number and status == "ACTIVE":
-                            return True
-        except Exception as e:
-            print(f"Error checking student number: {e}")
-        
-        return False
+        return self.index.is_student_number_active(student_number)
+    
+    def get_student_number_from_rfid(self, rfid_id):
+        """Get student number from RFID ID"""
+        student_number = self.index.get_student_number(rfid_id)
+        if student_number:
+            print(f"Found student number {student_number} for RFID {rfid_id}")
+        else:
+            print(f"No student number found for RFID: {rfid_id}")
+        return student_number
     
     def is_special_pass_expired(self, special_pass_id):
         """Check if a special pass has expired"""
-        try:
-            with open(self.visitors_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 10:  # Updated to 10 fields
-                        visitor_special_pass = parts[6]  # Special Pass ID
-                        expires_at_str = parts[8]  # Expiration timestamp
-                        status = parts[9]  # Status
-                        
-                        if visitor_special_pass == special_pass_id and status == "ACTIVE":
-                            # Check if the pass has expired
-                            try:
-                                expires_at = datetime.datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
-                                current_time = datetime.datetime.now()
-                                if expires_at < current_time:
-                                    return True  # Pass has expired
-                            except Exception as e:
-                                print(f"Error parsing expiration date: {e}")
-        except Exception as e:
-            print(f"Error checking special pass expiration: {e}")
+        current_time = datetime.datetime.now()
+        for record in self.index.get_visitor_records(special_pass_id, active_only=True):
+            if record['expires_at'] is not None and record['expires_at'] < current_time:
+                return True  # Pass has expired
         
         return False
     
     def get_special_pass_check_status(self, special_pass_id):
         """Get the current check-in/check-out status of a special pass"""
-        try:
-            with open(self.visitors_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 10:
-                        visitor_special_pass = parts[6]  # Special Pass ID
-                        status = parts[9]  # Status
-                        
-                        if visitor_special_pass == special_pass_id and status == "ACTIVE":
-                            # Check if there's a check-in time recorded
-                            if len(parts) >= 11:
-                                check_in_time = parts[10]  # Check-in time
-                                check_out_time = parts[11] if len(parts) > 11 else ""  # Check-out time
-                                
-                                if check_in_time and check_in_time != "":
-                                    if check_out_time and check_out_time != "":
-                                        # Has both check-in and check-out, next should be check-in
-                                        return "CHECKED_OUT"
-                                    else:
-                                        # Has check-in but no check-out, next should be check-out
-                                        return "CHECKED_IN"
-                                else:
-                                    # No check-in time, next should be check-in
-                                    return "CHECKED_OUT"
-                            else:
-                                return "CHECKED_OUT"  # No check-in time recorded yet
-        except Exception as e:
-            print(f"Error getting check status: {e}")
+        records = self.index.get_visitor_records(special_pass_id, active_only=True)
+        if records:
+            check_in_time, check_out_time = self._check_times(records[0])
+            if check_in_time:
+                if check_out_time:
+                    # Has both check-in and check-out, next should be check-in
+                    return "CHECKED_OUT"
+                # Has check-in but no check-out, next should be check-out
+                return "CHECKED_IN"
         
         return "CHECKED_OUT"  # Default to checked out
     
     def record_special_pass_check(self, special_pass_id, check_type):
         """Record a check-in or check-out for a special pass"""
         try:
-            # Read all lines
-            with open(self.visitors_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Find and update the line with the special pass
+            # O(1) append; visitors.txt is only rewritten when the journal is compacted
             current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            updated_lines = []
+            self.check_journal.append(special_pass_id, check_type, current_time)
             
-            for line in lines:
-                if line.startswith('#') or not line.strip():
-                    updated_lines.append(line)
-                    continue
-                
-                parts = line.strip().split(',')
-                if len(parts) >= 10:
-                    visitor_special_pass = parts[6]  # Special Pass ID
-                    
-                    if visitor_special_pass == special_pass_id:
-                        # Ensure we have enough fields
-                        while len(parts) < 12:
-                            parts.append("")
-                        
-                        if check_type == "CHECK_IN":
-                            parts[10] = current_time  # Check-in time
-                            parts[11] = ""  # Clear check-out time
-                        elif check_type == "CHECK_OUT":
-                            parts[11] = current_time  # Check-out time
-                        
-                        # Reconstruct the line
-                        updated_line = ','.join(parts) + '\n'
-                        updated_lines.append(updated_line)
-                    else:
-                        updated_lines.append(line)
-                else:
-                    updated_lines.append(line)
-            
-            # Write back to file
-            with open(self.visitors_file, 'w') as f:
-                f.writelines(updated_lines)
+            if self.check_journal.event_count >= self.check_journal_compact_threshold:
+                self.compact_check_journal()
             
             return True
         except Exception as e:
             print(f"Error recording check: {e}")
             return False
     
-    def get_special_pass_check_times(self, special_pass_id):
-        """Get the check-in and check-out times for a special pass"""
+    def _check_times(self, record):
+        """Check-in/check-out times of a visitors.txt record with journaled events applied"""
+        journaled = self.check_journal.get_check_times(record['special_pass'])
+        if journaled is None:
+            return record['check_in_time'], record['check_out_time']
+        check_in_time, check_out_time = journaled
+        if check_in_time is None:
+            check_in_time = record['check_in_time']
+        return check_in_time, check_out_time
+    
+    def compact_check_journal(self):
+        """Fold journaled check events into visitors.txt and truncate the journal"""
         try:
-            with open(self.visitors_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 12:
-                        visitor_special_pass = parts[6]  # Special Pass ID
-                        
-                        if visitor_special_pass == special_pass_id:
-                            check_in_time = parts[10] if len(parts) > 10 else ""
-                            check_out_time = parts[11] if len(parts) > 11 else ""
-                            return check_in_time, check_out_time
+            compacted = self.check_journal.compact(self._apply_check_projection)
+            if compacted:
+                print(f"Compacted {compacted} Special Pass check event(s) into {self.visitors_file}")
+            return compacted
         except Exception as e:
-            print(f"Error getting check times: {e}")
+            print(f"Error compacting check journal: {e}")
+            return 0
+    
+    def _apply_check_projection(self, projection):
+        """Rewrite visitors.txt once with the journal's check times (atomic replace)"""
+        apply_check_projection(self.visitors_file, projection)
+        self.index.invalidate()
+    
+    def get_special_pass_check_times(self, special_pass_id):
+        """Get the check-in and check-out times for a special pass"""
+        records = self.index.get_visitor_records(special_pass_id)
+        if records and self.check_journal.get_check_times(special_pass_id) is not None:
+            return self._check_times(records[0])
+        
+        for record in records:
+            if record['field_count'] >= 12:
+                return record['check_in_time'], record['check_out_time']
         
         return "", ""
     
     def is_special_pass_in_grace_period(self, special_pass_id):
         """Check if a special pass is in grace period (can check-out but not check-in)"""
-        try:
-            with open(self.visitors_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 10:
-                        visitor_special_pass = parts[6]  # Special Pass ID
-                        expires_at_str = parts[8]  # Expiration timestamp
-                        status = parts[9]  # Status
-                        
-                        if visitor_special_pass == special_pass_id and status == "ACTIVE":
-                            # Get check-in time
-                            check_in_time = parts[10] if len(parts) > 10 else ""
-                            
-                            if check_in_time and check_in_time != "":
-                                try:
-                                    # Parse expiration and check-in times
-                                    expires_at = datetime.datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
-                                    check_in_dt = datetime.datetime.strptime(check_in_time, "%Y-%m-%d %H:%M:%S")
-                                    current_time = datetime.datetime.now()
-                                    
-                                    # Calculate time remaining when checked in
-                                    time_remaining_at_checkin = expires_at - check_in_dt
-                                    minutes_remaining_at_checkin = time_remaining_at_checkin.total_seconds() / 60
-                                    
-                                    # If 10 minutes or less remaining at check-in, and now past expiration
-                                    if minutes_remaining_at_checkin <= 10 and current_time > expires_at:
-                                        return True  # In grace period
-                                except Exception as e:
-                                    print(f"Error parsing dates for grace period: {e}")
-        except Exception as e:
-            print(f"Error checking grace period: {e}")
+        current_time = datetime.datetime.now()
+        for record in self.index.get_visitor_records(special_pass_id, active_only=True):
+            expires_at = record['expires_at']
+            check_in_time, _ = self._check_times(record)
+            check_in_dt = record['check_in_at'] if check_in_time == record['check_in_time'] else parse_timestamp(check_in_time)
+            if expires_at is None or check_in_dt is None:
+                continue
+            
+            # Calculate time remaining when checked in
+            time_remaining_at_checkin = expires_at - check_in_dt
+            minutes_remaining_at_checkin = time_remaining_at_checkin.total_seconds() / 60
+            
+            # If 10 minutes or less remaining at check-in, and now past expiration
+            if minutes_remaining_at_checkin <= 10 and current_time > expires_at:
+                return True  # In grace period
         
         return False
     
     def is_special_pass_expired_for_checkin(self, special_pass_id):
         """Check if a special pass has expired for check-in (considers grace period)"""
-        try:
-            with open(self.visitors_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('#') or not line:
-                        continue
-                    
-                    parts = line.split(',')
-                    if len(parts) >= 10:
-                        visitor_special_pass = parts[6]  # Special Pass ID
-                        expires_at_str = parts[8]  # Expiration timestamp
-                        status = parts[9]  # Status
-                        
-                        if visitor_special_pass == special_pass_id and status == "ACTIVE":
-                            try:
-                                expires_at = datetime.datetime.strptime(expires_at_str, "%Y-%m-%d %H:%M:%S")
-                                current_time = datetime.datetime.now()
-                                
-                                # For check-in, always check against expiration (no grace period)
-                                if current_time > expires_at:
-                                    return True  # Expired for check-in
-                            except Exception as e:
-                                print(f"Error parsing expiration date: {e}")
-        except Exception as e:
-            print(f"Error checking expiration for check-in: {e}")
+        current_time = datetime.datetime.now()
+        for record in self.index.get_visitor_records(special_pass_id, active_only=True):
+            # For check-in, always check against expiration (no grace period)
+            if record['expires_at'] is not None and current_time > record['expires_at']:
+                return True  # Expired for check-in
         
         return False
     
+    def _has_expired_special_passes(self, current_time):
+        """Check the in-memory index for ACTIVE passes past expiration plus the 1 hour cleanup grace"""
+        self.index.refresh()
+        for records in self.index.visitors_by_pass.values():
+            for record in records:
+                expires_at = record['expires_at']
+                if record['status'] == "ACTIVE" and expires_at is not None:
+                    if current_time > expires_at + datetime.timedelta(hours=1):
+                        return True
+        return False
+    
     def cleanup_expired_special_passes(self):
         """Remove expired Special Passes from visitors.txt to allow reuse"""
         try:
+            # Called on every tap - skip the file read/rewrite when nothing has expired
+            if not self._has_expired_special_passes(datetime.datetime.now()):
+                return 0
+            
+            # Removed passes may be re-registered, so fold their journaled checks in first
+            self.compact_check_journal()
+            
             # Read all lines
             with open(self.visitors_file, 'r') as f:
                 lines = f.readlines()
@@ -456,10 +394,10 @@ class DatabaseManager:
                     updated_lines.append(line)
             
             # Write back to file
-            with open(self.visitors_file, 'w') as f:
-                f.writelines(updated_lines)
-            
             if removed_count > 0:
+                with open(self.visitors_file, 'w') as f:
+                    f.writelines(updated_lines)
+                self.index.invalidate()
                 print(f"Cleanup completed: {removed_count} expired Special Pass(es) removed")
             
             return removed_count
@@ -504,6 +442,7 @@ class DatabaseManager:
             if deactivated_count > 0:
                 with open(self.visitors_file, 'w') as f:
                     f.writelines(updated_lines)
+                self.index.invalidate()
                 print(f"Deactivated {deactivated_count} existing Special Pass entry(ies) for ID: {special_pass_id}")
             
             return deactivated_count
@@ -520,3 +459,21 @@ class DatabaseManager:
         is_in_use, existing_visitor = self.is_special_pass_in_use(special_pass_id)
         
         return not is_in_use
+
+
+def create_database_manager(backend=None):
+    """Create the DatabaseManager for the configured storage backend ("text" or "sqlite")"""
+    backend = backend or os.environ.get("AINIFORM_STORAGE", "text")
+    if backend == "sqlite":
+        # Imported here so the text backend never loads sqlite3
+        from sqlite_database_manager import SQLiteDatabaseManager
+        db_path = os.environ.get("AINIFORM_SQLITE_DB", "ainiform.db")
+        if not os.path.exists(db_path):
+            # First start on SQLite - import the existing text files once
+            from migrate_to_sqlite import migrate
+            if not migrate(".", db_path):
+                # No half-made database is left behind, so the next start tries the import again
+                print("SQLite migration failed - using the text database files")
+                return DatabaseManager()
+        return SQLiteDatabaseManager(db_path)
+    return DatabaseManager()
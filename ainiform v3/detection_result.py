@@ -0,0 +1,130 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Uniform parts that must all be present for a clean verdict
+REQUIRED_UNIFORM_CLASSES = ('ict longsleeve', 'ict logo', 'black shoes', 'ict pants')
+
+NO_BOXES = np.zeros((0, 4), dtype=np.int32)
+NO_CONFIDENCES = np.zeros(0, dtype=np.float32)
+NO_CLASS_IDS = np.zeros(0, dtype=np.int32)
+# Shared by every result without a model (must never be modified)
+NO_NAMES = {}
+
+# Lower-cased class name -> class ID, built once per model names mapping; only a
+# few mappings are ever live (one per loaded model), so a small LRU is enough
+CLASS_INDEX_CACHE_SIZE = 8
+_class_index_cache = OrderedDict()
+
+
+def class_index(names):
+    """Lower-cased class name -> class ID lookup for a model's names mapping"""
+    cached = _class_index_cache.get(id(names))
+    if cached is not None and cached[0] is names:
+        _class_index_cache.move_to_end(id(names))
+        return cached[1]
+    items = names.items() if isinstance(names, dict) else enumerate(names)
+    index = {str(name).lower(): int(class_id) for class_id, name in items}
+    # Keep a reference to names so its id() cannot be reused by another object while cached
+    _class_index_cache[id(names)] = (names, index)
+    if len(_class_index_cache) > CLASS_INDEX_CACHE_SIZE:
+        _class_index_cache.popitem(last=False)
+    return index
+
+
+class DetectionResult:
+    """Detections for one camera frame, computed once and shared by every consumer
+
+    Detections are stored column-wise as NumPy arrays (boxes as int32
+    x1, y1, x2, y2 rows, float32 confidences, int32 class IDs) straight from
+    the backend's single host transfer. Per-class counts come from one
+    np.bincount, so drawing, the compliance decision and the debug log never
+    build a Python object per box. The drawing code, the compliance status
+    labels and the compliance decision all read the same object instead of
+    re-running the model. final marks a result after which the detector
+    has stopped scanning (the cascade confirmed every required part).
+    """
+    def __init__(self, frame_id, boxes=None, confidences=None, class_ids=None, names=None,
+                 timings=None, created_at=None, final=False):
+        """Initialize the result and build the per-class histogram"""
+        self.frame_id = frame_id
+        self.boxes = boxes if boxes is not None else NO_BOXES
+        self.confidences = confidences if confidences is not None else NO_CONFIDENCES
+        self.class_ids = class_ids if class_ids is not None else NO_CLASS_IDS
+        self.names = names if names is not None else NO_NAMES
+        self.timings = timings if timings is not None else {}
+        self.created_at = created_at if created_at is not None else time.monotonic()
+        self.final = final
+        self.class_histogram = np.bincount(self.class_ids, minlength=len(self.names))
+        self._class_index = class_index(self.names)
+        self._detections = None
+
+    def __len__(self):
+        return len(self.class_ids)
+
+    def __bool__(self):
+        return len(self.class_ids) > 0
+
+    def count(self, class_name):
+        """Number of detections of a class"""
+        class_id = self._class_index.get(class_name)
+        if class_id is None or class_id >= len(self.class_histogram):
+            return 0
+        return int(self.class_histogram[class_id])
+
+    @property
+    def class_counts(self):
+        """Detections per class name (classes that were not detected are left out)"""
+        return {self.class_name(class_id): int(count)
+                for class_id, count in enumerate(self.class_histogram) if count}
+
+    def best_confidences(self):
+        """Highest confidence per class ID (0.0 for classes that were not detected)"""
+        best = np.zeros(len(self.class_histogram), dtype=np.float32)
+        np.maximum.at(best, self.class_ids, self.confidences)
+        return best
+
+    def best_confidence(self, class_name, best=None):
+        """Highest confidence of a class in this frame, or 0.0"""
+        class_id = self._class_index.get(class_name)
+        if class_id is None or class_id >= len(self.class_histogram):
+            return 0.0
+        best = best if best is not None else self.best_confidences()
+        return float(best[class_id])
+
+    def class_name(self, class_id):
+        """Display name of a class ID"""
+        return self.names.get(class_id, str(class_id)) if isinstance(self.names, dict) else self.names[class_id]
+
+    def is_complete_uniform(self):
+        """True if every required uniform part was detected at least once"""
+        return all(self.count(class_name) >= 1 for class_name in REQUIRED_UNIFORM_CLASSES)
+
+    def compliance_result(self):
+        """Single-frame verdict: 'clean', 'manual_verification' or 'no_object'"""
+        if not self:
+            return "no_object"
+        if self.is_complete_uniform():
+            return "clean"
+        return "manual_verification"
+
+    def class_names(self):
+        """Class names of all detections, in detection order"""
+        return [self.class_name(class_id) for class_id in self.class_ids.tolist()]
+
+    @property
+    def detections(self):
+        """Row-wise list of detection dicts, built on first access (for older callers)"""
+        if self._detections is None:
+            self._detections = [{
+                'bbox': tuple(box),
+                'confidence': confidence,
+                'class_id': class_id,
+                'class_name': self.class_name(class_id)
+            } for box, confidence, class_id in zip(self.boxes.tolist(), self.confidences.tolist(),
+                                                   self.class_ids.tolist())]
+        return self._detections
+
+
+EMPTY_RESULT = DetectionResult(0)
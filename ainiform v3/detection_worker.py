@@ -0,0 +1,115 @@
+import time
+import queue
+import threading
+
+
+class DetectionWorker:
+    """Runs YOLO detection off the Tk thread, always on the newest camera frame
+
+    The worker skips every frame that arrived while the previous inference was
+    running and keeps only the newest result in its queue. The Tk loop can
+    therefore render the preview at camera rate and poll for detections at
+    whatever rate the model manages.
+
+    With a PresenceGate, frames without significant change are not sent to
+    the detector at all (and are not even copied out of the ring buffer).
+    """
+    def __init__(self, detector, camera=None, gate=None):
+        """Initialize the worker for a YOLOCameraDetection instance"""
+        self.detector = detector
+        self.camera = camera if camera is not None else detector.cap
+        self.gate = gate
+        self.results = queue.Queue(maxsize=1)
+        self.is_running = False
+        self.processed_count = 0
+        self.dropped_count = 0
+        self.gated_count = 0
+        self._thread = None
+
+    def start(self):
+        """Start the inference thread"""
+        if self._thread is not None and self._thread.is_alive():
+            if self.is_running:
+                return
+            # A stopped loop may still be finishing its last inference; it must not run alongside the new one
+            self._thread.join(timeout=2.0)
+            if self._thread.is_alive():
+                print("Error: previous detection worker is still running")
+                return
+        self.is_running = True
+        if self.gate is not None:
+            self.gate.reset()
+        self._thread = threading.Thread(target=self._run, name="DetectionWorker", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Inference loop: wait for a newer frame, detect, publish"""
+        last_frame_id = 0
+        while self.is_running:
+            if self.camera is None:
+                break
+            frame_id, _ = self.camera.wait_for_frame(last_frame_id, timeout=0.5)
+            if frame_id is None or frame_id <= last_frame_id or not self.is_running:
+                continue
+
+            if self.gate is not None:
+                # Cheap change check on the ring buffer view; idle frames never reach YOLO
+                frame_id, view = self.camera.get_latest()
+                if not self.gate.update(view):
+                    self.gated_count += 1
+                    last_frame_id = frame_id
+                    continue
+
+            # Copy out of the ring buffer; inference can outlast the slot's lifetime
+            frame_id, frame = self.camera.get_latest(copy=True)
+            if last_frame_id:
+                self.dropped_count += max(0, frame_id - last_frame_id - 1)
+            last_frame_id = frame_id
+
+            # One inference per frame; the result object is shared by drawing and compliance logic
+            result = self.detector.detect(frame, frame_id)
+            self.processed_count += 1
+            if self.gate is not None:
+                self.gate.note_detections(bool(result))
+            self._publish(result)
+
+            if result.final:
+                # The cascade confirmed every required part; nothing is left to scan
+                self.is_running = False
+                break
+
+    def _publish(self, item):
+        """Replace any unread result with the newest one"""
+        try:
+            self.results.put_nowait(item)
+        except queue.Full:
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.results.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def get_latest_result(self):
+        """Get the newest unread DetectionResult, or None (safe to call from Tk)"""
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def presence_active(self):
+        """Presence gate state: True/False, or None if the worker has no gate"""
+        if self.gate is None:
+            return None
+        return self.gate.is_active(time.monotonic())
+
+    def stop(self, wait=False):
+        """Stop the inference thread (without blocking the caller unless wait=True)"""
+        self.is_running = False
+        if wait and self._thread is not None:
+            self._thread.join(timeout=2.0)
+        # Keep the handle until the loop has really exited so start() can wait for it
+        if self._thread is not None and not self._thread.is_alive():
+            self._thread = None
@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import queue
+import socket
+import struct
+import threading
+import tempfile
+
+# Every message is a 4-byte big-endian length followed by a compact JSON object:
+#   {"type": ..., "seq": N, "ts": UNIX_TIME, ...fields}
+# Types the console sends:
+#   guard    - state ("login"/"logout"), name
+#   scan     - card_id, status ("valid", "invalid", "deactivated", "special_pass"),
+#              person {id, role, name} for known cards, check_type for special passes
+#   verdict  - person_id, verdict ("clean", "manual_verification", "no_object")
+HEADER = struct.Struct('>I')
+MAX_MESSAGE_BYTES = 64 * 1024
+
+
+def default_socket_path():
+    """Socket path from AINIFORM_DISPLAY_SOCKET, or one in the temp directory"""
+    return os.environ.get("AINIFORM_DISPLAY_SOCKET", os.path.join(tempfile.gettempdir(), "ainiform-display.sock"))
+
+
+def encode_message(message_type, seq, **fields):
+    """One length-prefixed message"""
+    message = {'type': message_type, 'seq': seq, 'ts': round(time.time(), 3)}
+    message.update(fields)
+    payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(len(payload)) + payload
+
+
+def _recv_exact(sock, size):
+    """Read exactly size bytes, or None if the peer closed the connection"""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def read_message(sock):
+    """Read one message dict from a socket, or None on EOF"""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Display bus message too large ({size} bytes)")
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    return json.loads(payload.decode('utf-8'))
+
+
+class DisplayBusServer:
+    """Console side of the display bus: publishes messages to every connected main screen
+
+    Listens on a Unix domain socket. Main screens (the active one and a
+    warm standby) connect whenever they start, so the console never needs
+    to know which process is on screen. The latest guard message is replayed
+    to new connections so a restarted screen shows the right state.
+    publish() only queues the message; a writer thread sends it, so the
+    Tk thread never waits on a socket. A display that can't take a message
+    within half a second is dropped.
+    """
+    def __init__(self, socket_path=None):
+        """Initialize the server (call start() to listen)"""
+        self.socket_path = socket_path or default_socket_path()
+        self.clients = []
+        self.seq = 0
+        self.last_guard_message = None
+        self.is_running = False
+        self.outbox = queue.Queue()
+        self._server = None
+        self._thread = None
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Bind the socket and accept displays in a background thread; returns True if listening"""
+        if not hasattr(socket, 'AF_UNIX'):
+            print("Display bus not available on this platform")
+            return False
+        try:
+            # A socket file left behind by a crashed console would make bind() fail
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(self.socket_path)
+            self._server.listen(4)
+        except OSError as e:
+            print(f"Error starting display bus: {e}")
+            self._server = None
+            return False
+
+        self.is_running = True
+        self._thread = threading.Thread(target=self._accept_loop, name="DisplayBusServer", daemon=True)
+        self._thread.start()
+        self._writer = threading.Thread(target=self._write_loop, name="DisplayBusWriter", daemon=True)
+        self._writer.start()
+        return True
+
+    def _accept_loop(self):
+        """Accept display connections until stopped"""
+        while self.is_running:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                break
+            client.settimeout(0.5)
+            with self._lock:
+                if self.last_guard_message is not None:
+                    try:
+                        client.sendall(self.last_guard_message)
+                    except OSError:
+                        client.close()
+                        continue
+                self.clients.append(client)
+
+    def publish(self, message_type, **fields):
+        """Queue a message for every connected display (never blocks); returns False if the bus isn't running"""
+        with self._lock:
+            self.seq += 1
+            data = encode_message(message_type, self.seq, **fields)
+            if message_type == 'guard':
+                self.last_guard_message = data
+        if not self.is_running:
+            return False
+        self.outbox.put(data)
+        return True
+
+    def _write_loop(self):
+        """Send queued messages to every connected display until stopped"""
+        while True:
+            data = self.outbox.get()
+            if data is None:
+                break
+            with self._lock:
+                clients = list(self.clients)
+            failed = []
+            for client in clients:
+                try:
+                    client.sendall(data)
+                except OSError:
+                    client.close()
+                    failed.append(client)
+            if failed:
+                with self._lock:
+                    self.clients = [client for client in self.clients if client not in failed]
+
+    def stop(self):
+        """Close every connection and remove the socket file"""
+        self.is_running = False
+        if self._writer is not None:
+            # Let the writer send what is already queued, then close the sockets under it
+            self.outbox.put(None)
+            self._writer.join(timeout=2.0)
+            self._writer = None
+        with self._lock:
+            for client in self.clients:
+                client.close()
+            self.clients = []
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+
+class DisplayBusClient:
+    """Display side of the display bus: receives console messages into a queue
+
+    A background thread connects (retrying until the console is up),
+    reads messages and puts them on a queue. The Qt thread drains it with
+    get_messages() from a timer, so no widget is touched off the UI thread.
+    """
+    def __init__(self, socket_path=None, retry_interval=1.0):
+        """Initialize the client (call start() to connect)"""
+        self.socket_path = socket_path or default_socket_path()
+        self.retry_interval = retry_interval
+        self.messages = queue.Queue()
+        self.is_connected = False
+        self.is_running = False
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        """Start connecting and reading in the background"""
+        if not hasattr(socket, 'AF_UNIX'):
+            return False
+        self.is_running = True
+        self._thread = threading.Thread(target=self._read_loop, name="DisplayBusClient", daemon=True)
+        self._thread.start()
+        return True
+
+    def _read_loop(self):
+        """Connect, read messages until the console goes away, and reconnect"""
+        while self.is_running:
+            try:
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._sock.connect(self.socket_path)
+            except OSError:
+                self._sock.close()
+                time.sleep(self.retry_interval)
+                continue
+
+            self.is_connected = True
+            try:
+                while self.is_running:
+                    message = read_message(self._sock)
+                    if message is None:
+                        break
+                    self.messages.put(message)
+            except (OSError, ValueError) as e:
+                if self.is_running:
+                    print(f"Display bus connection lost: {e}")
+            self.is_connected = False
+            self._sock.close()
+
+    def get_messages(self):
+        """All messages received since the last call (never blocks)"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def stop(self):
+        """Stop reading and close the connection"""
+        self.is_running = False
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
@@ -0,0 +1,262 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource:
+    """Where camera frames come from: a device, a recording, still images or a generator
+
+    Sources follow the cv2.VideoCapture read()/isOpened()/release() calls
+    the capture code already uses. read(out) decodes into a caller-supplied
+    buffer when the shapes match. With realtime pacing, read() waits so frames
+    arrive at fps like a camera would; with realtime=False they come as
+    fast as they can be produced (for benchmarks and tests).
+    """
+    def __init__(self, fps=30, realtime=True):
+        """Initialize pacing"""
+        self.fps = fps
+        self.realtime = realtime
+        self.is_opened = False
+        self.width = None
+        self.height = None
+        self._next_frame_at = None
+
+    def open(self, width=640, height=480, fps=None):
+        """Open the source for the requested frame size (None keeps the native size); returns True on success"""
+        self.width, self.height = width, height
+        if fps:
+            self.fps = fps
+        self.is_opened = self._open()
+        self._next_frame_at = None
+        return self.is_opened
+
+    def _open(self):
+        return True
+
+    def read(self, out=None):
+        """Next frame as (ret, frame); frame is out when out was filled in place"""
+        if not self.is_opened:
+            return False, None
+        self._pace()
+        return self._read(out)
+
+    def _read(self, out):
+        raise NotImplementedError
+
+    def _pace(self):
+        """In realtime mode, sleep until the next frame is due"""
+        if not self.realtime or not self.fps:
+            return
+        now = time.monotonic()
+        if self._next_frame_at is None or now - self._next_frame_at > 1.0:
+            # First frame, or we fell far behind - restart the clock instead of bursting
+            self._next_frame_at = now
+        elif self._next_frame_at > now:
+            time.sleep(self._next_frame_at - now)
+        self._next_frame_at += 1.0 / self.fps
+
+    def _fit(self, frame, out):
+        """Resize a frame to the opened size and copy it into out when possible"""
+        if self.width and self.height and (frame.shape[1], frame.shape[0]) != (self.width, self.height):
+            frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        if out is not None and out.shape == frame.shape:
+            out[...] = frame
+            return True, out
+        return True, frame
+
+    def isOpened(self):
+        """cv2.VideoCapture-compatible open check"""
+        return self.is_opened
+
+    def release(self):
+        """Close the source"""
+        self.is_opened = False
+
+    def describe(self):
+        return self.__class__.__name__
+
+
+class LiveCameraSource(FrameSource):
+    """A camera device through cv2.VideoCapture (the device paces itself)"""
+    def __init__(self, camera_id=0, fps=30):
+        """Remember the device index"""
+        super().__init__(fps, realtime=False)
+        self.camera_id = camera_id
+        self.cap = None
+
+    def _open(self):
+        """Open and configure the camera device"""
+        self.cap = cv2.VideoCapture(self.camera_id)
+        if not self.cap.isOpened():
+            print(f"Error: Could not open camera {self.camera_id}")
+            return False
+
+        # Set camera properties
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        return True
+
+    def _read(self, out):
+        if out is not None:
+            return self.cap.read(out)
+        return self.cap.read()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self.is_opened = False
+
+    def describe(self):
+        return f"camera {self.camera_id}"
+
+
+class VideoFileSource(FrameSource):
+    """A recorded video, optionally looped, paced at the file's own frame rate"""
+    def __init__(self, path, loop=True, realtime=True):
+        """Remember the video path"""
+        super().__init__(30, realtime)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            print(f"Error: Could not open video {self.path}")
+            return False
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        if file_fps and file_fps > 0:
+            self.fps = file_fps
+        return True
+
+    def _read(self, out):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            # Rewind and keep going
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        return self._fit(frame, out)
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self.is_opened = False
+
+    def describe(self):
+        return f"video {self.path}"
+
+
+class ImageDirectorySource(FrameSource):
+    """Still images from a directory in name order, optionally looped"""
+    def __init__(self, path, fps=30, loop=True, realtime=True):
+        """Remember the directory"""
+        super().__init__(fps, realtime)
+        self.path = path
+        self.loop = loop
+        self.images = []
+        self.index = 0
+
+    def _open(self):
+        if not os.path.isdir(self.path):
+            print(f"Error: {self.path} is not a directory")
+            return False
+        self.images = sorted(os.path.join(self.path, f) for f in os.listdir(self.path)
+                             if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = 0
+        if not self.images:
+            print(f"Error: No images found in {self.path}")
+            return False
+        return True
+
+    def _read(self, out):
+        if self.index >= len(self.images):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.images[self.index])
+        self.index += 1
+        if frame is None:
+            return False, None
+        return self._fit(frame, out)
+
+    def describe(self):
+        return f"images {self.path}"
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generated frames: a figure walks in, stands still, and walks out
+
+    The cycle exercises the presence gate and the region detector the same
+    way a real visitor would. Frame n is always identical for the same
+    settings, so runs are reproducible.
+    """
+    def __init__(self, fps=30, realtime=True, cycle_frames=150, noise=4, seed=0):
+        """Initialize the generator"""
+        super().__init__(fps, realtime)
+        self.cycle_frames = cycle_frames
+        self.noise = noise
+        self.seed = seed
+        self.frame_number = 0
+        self._background = None
+
+    def _open(self):
+        # Generated frames need a size even when the caller asked for the native one
+        self.width, self.height = self.width or 640, self.height or 480
+
+        # Fixed background with mild sensor-like noise, generated once
+        rng = np.random.default_rng(self.seed)
+        gradient = np.linspace(80, 140, self.width, dtype=np.float32)[None, :, None]
+        background = np.broadcast_to(gradient, (self.height, self.width, 3)).astype(np.float32)
+        background = background + rng.normal(0, self.noise, background.shape)
+        self._background = np.clip(background, 0, 255).astype(np.uint8)
+        self.frame_number = 0
+        return True
+
+    def _read(self, out):
+        frame = out if out is not None and out.shape == self._background.shape else self._background.copy()
+        if frame is out:
+            frame[...] = self._background
+
+        # Walk in over the first quarter, stand for half, walk out over the last quarter
+        phase = (self.frame_number % self.cycle_frames) / self.cycle_frames
+        if phase < 0.25:
+            center = phase / 0.25 * 0.5
+        elif phase < 0.75:
+            center = 0.5
+        else:
+            center = 0.5 + (phase - 0.75) / 0.25 * 0.6
+        figure_w, figure_h = self.width // 5, int(self.height * 0.8)
+        x1 = int(center * self.width) - figure_w // 2
+        y1 = self.height - figure_h
+        cv2.rectangle(frame, (x1, y1 + figure_h // 2), (x1 + figure_w, self.height), (40, 40, 40), -1)
+        cv2.rectangle(frame, (x1, y1 + figure_h // 6), (x1 + figure_w, y1 + figure_h // 2), (230, 230, 230), -1)
+        cv2.circle(frame, (x1 + figure_w // 2, y1 + figure_h // 12), figure_h // 12, (150, 170, 200), -1)
+
+        self.frame_number += 1
+        return True, frame
+
+    def describe(self):
+        return "synthetic"
+
+
+def create_frame_source(spec=0, realtime=True):
+    """Build a frame source from a spec: a device index, 'synthetic', an image directory or a video file
+
+    realtime controls pacing for every source except a live device.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return LiveCameraSource(int(spec))
+    if str(spec).lower() == 'synthetic':
+        return SyntheticSource(realtime=realtime)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime)
+    return VideoFileSource(spec, realtime=realtime)
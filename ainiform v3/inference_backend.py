@@ -0,0 +1,367 @@
+import os
+import ast
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from detection_result import DetectionResult, NO_BOXES, NO_CONFIDENCES, NO_CLASS_IDS
+
+BACKENDS = ('torch', 'onnx', 'openvino')
+DEFAULT_IMGSZ = 640
+DEFAULT_IOU = 0.7  # Same NMS threshold as ultralytics predict()
+MAX_DETECTIONS = 300
+MODEL_STRIDE = 32
+
+
+class InferenceBackend:
+    """Common interface for the uniform detector's inference engines
+
+    predict_arrays() takes a BGR frame and returns columnar detections
+    (int32 boxes, float32 confidences, int32 class IDs) with one host
+    transfer per frame. predict() returns the same list of detection dicts
+    the torch path always produced ({'bbox', 'confidence', 'class_id',
+    'class_name'}), so callers don't care which engine is loaded. The
+    per-stage times of the last call are kept in self.timings (ms).
+    """
+    name = None
+
+    def __init__(self, weights_path, num_threads=None):
+        """Remember the weights file; nothing is loaded until load()"""
+        self.weights_path = weights_path
+        self.num_threads = num_threads
+        self.names = {}
+        self.timings = {}
+
+    def load(self):
+        """Load the model; returns True on success"""
+        raise NotImplementedError
+
+    def predict_arrays(self, frame, conf=0.5, imgsz=None, classes=None):
+        """Run detection on a BGR frame; returns (boxes, confidences, class_ids) arrays
+
+        imgsz overrides the inference size for this call (if the model allows
+        it) and classes restricts the result to a list of class IDs.
+        """
+        raise NotImplementedError
+
+    def predict(self, frame, conf=0.5, imgsz=None):
+        """Run detection on a BGR frame and return a list of detection dicts"""
+        boxes, confidences, class_ids = self.predict_arrays(frame, conf, imgsz)
+        return DetectionResult(0, boxes, confidences, class_ids, self.names).detections
+
+    def __call__(self, frame, conf=0.5):
+        return self.predict(frame, conf)
+
+
+class TorchBackend(InferenceBackend):
+    """Full PyTorch model through ultralytics.YOLO (the original path)"""
+    name = 'torch'
+
+    def load(self):
+        """Import ultralytics (and torch) and load best.pt"""
+        from ultralytics import YOLO
+
+        if self.num_threads:
+            import torch
+            torch.set_num_threads(self.num_threads)
+
+        self.model = YOLO(self.weights_path)
+        self.names = self.model.names
+        return True
+
+    def predict_arrays(self, frame, conf=0.5, imgsz=None, classes=None):
+        """Run YOLO detection on a frame"""
+        inference_start = time.perf_counter()
+        options = {'conf': conf, 'verbose': False}
+        if imgsz:
+            options['imgsz'] = imgsz
+        if classes is not None:
+            options['classes'] = list(classes)
+        results = self.model(frame, **options)
+        postprocess_start = time.perf_counter()
+
+        boxes = results[0].boxes if results else None
+        if boxes is None or len(boxes) == 0:
+            data = np.zeros((0, 6), dtype=np.float32)
+        else:
+            # One device-to-host copy of the (N, 6) x1, y1, x2, y2, conf, cls tensor
+            data = boxes.data.cpu().numpy()
+
+        self.timings = {
+            'inference_ms': (postprocess_start - inference_start) * 1000,
+            'postprocess_ms': (time.perf_counter() - postprocess_start) * 1000,
+        }
+        return data[:, :4].astype(np.int32), data[:, 4].astype(np.float32), data[:, 5].astype(np.int32)
+
+
+class ExportedYOLOBackend(InferenceBackend):
+    """Shared pre/post-processing for YOLOv8 graphs exported by ultralytics
+
+    Reproduces ultralytics' letterbox, confidence filter, class-aware NMS and
+    box rescaling in NumPy/OpenCV, so no torch import is needed. Graphs
+    exported with dynamic input shapes accept any stride-aligned size, so
+    they are fed minimally padded rectangles (like ultralytics' rect
+    inference) and honour a per-call imgsz; static graphs always get their
+    fixed square input.
+    """
+    def __init__(self, weights_path, num_threads=None, iou_threshold=DEFAULT_IOU):
+        """Remember the exported model and the NMS threshold"""
+        super().__init__(weights_path, num_threads)
+        self.iou_threshold = iou_threshold
+        self.imgsz = (DEFAULT_IMGSZ, DEFAULT_IMGSZ)
+        self.dynamic = True
+
+    def _run(self, blob):
+        """Run the graph on a (1, 3, H, W) float32 blob and return its first output"""
+        raise NotImplementedError
+
+    def preprocess(self, frame, imgsz=None):
+        """Letterbox a BGR frame into a normalized RGB blob; returns (blob, gain, (pad_x, pad_y))"""
+        height, width = frame.shape[:2]
+        target_h, target_w = (imgsz, imgsz) if imgsz and self.dynamic else self.imgsz
+        gain = min(target_h / height, target_w / width)
+        new_w, new_h = int(round(width * gain)), int(round(height * gain))
+
+        if (new_w, new_h) != (width, height):
+            frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+        if self.dynamic:
+            # Only pad up to the model stride instead of to a full square
+            target_w = -(-new_w // MODEL_STRIDE) * MODEL_STRIDE
+            target_h = -(-new_h // MODEL_STRIDE) * MODEL_STRIDE
+        pad_w, pad_h = (target_w - new_w) / 2, (target_h - new_h) / 2
+        top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+        left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+        frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+        blob = cv2.dnn.blobFromImage(frame, scalefactor=1 / 255.0, swapRB=True)
+        return blob, gain, (left, top)
+
+    def postprocess(self, output, conf, gain, pad, frame_shape, classes=None):
+        """Decode a (1, 4 + classes, anchors) output into (boxes, confidences, class_ids)"""
+        predictions = output[0].T
+        class_scores = predictions[:, 4:]
+        if classes is not None:
+            # Same as ultralytics' classes= filter: only the requested columns compete
+            class_columns = np.asarray(classes, dtype=np.int64)
+            best_columns = class_scores[:, class_columns].argmax(axis=1)
+            class_ids = class_columns[best_columns]
+        else:
+            class_ids = class_scores.argmax(axis=1)
+        confidences = class_scores[np.arange(len(class_ids)), class_ids]
+
+        keep = confidences > conf
+        if not keep.any():
+            return NO_BOXES, NO_CONFIDENCES, NO_CLASS_IDS
+        boxes_xywh = predictions[keep, :4]
+        class_ids = class_ids[keep]
+        confidences = confidences[keep]
+
+        # xywh -> xyxy in letterbox space
+        boxes = np.empty_like(boxes_xywh)
+        boxes[:, 0] = boxes_xywh[:, 0] - boxes_xywh[:, 2] / 2
+        boxes[:, 1] = boxes_xywh[:, 1] - boxes_xywh[:, 3] / 2
+        boxes[:, 2] = boxes_xywh[:, 0] + boxes_xywh[:, 2] / 2
+        boxes[:, 3] = boxes_xywh[:, 1] + boxes_xywh[:, 3] / 2
+
+        order = non_max_suppression(boxes, confidences, class_ids, self.iou_threshold)[:MAX_DETECTIONS]
+
+        # Undo the letterbox and clip to the frame
+        boxes = boxes[order]
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / gain
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / gain
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, frame_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, frame_shape[0])
+
+        return boxes.astype(np.int32), confidences[order].astype(np.float32), class_ids[order].astype(np.int32)
+
+    def predict_arrays(self, frame, conf=0.5, imgsz=None, classes=None):
+        """Run detection on a BGR frame"""
+        preprocess_start = time.perf_counter()
+        blob, gain, pad = self.preprocess(frame, imgsz)
+        inference_start = time.perf_counter()
+        output = self._run(blob)
+        postprocess_start = time.perf_counter()
+        arrays = self.postprocess(output, conf, gain, pad, frame.shape, classes)
+
+        self.timings = {
+            'preprocess_ms': (inference_start - preprocess_start) * 1000,
+            'inference_ms': (postprocess_start - inference_start) * 1000,
+            'postprocess_ms': (time.perf_counter() - postprocess_start) * 1000,
+        }
+        return arrays
+
+
+class ONNXRuntimeBackend(ExportedYOLOBackend):
+    """best.onnx on the ONNX Runtime CPU execution provider"""
+    name = 'onnx'
+
+    def load(self):
+        """Create the inference session and read the class names from the model metadata"""
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        self.session = ort.InferenceSession(self.weights_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+        # Static exports carry their input size; dynamic ones use the default
+        input_shape = self.session.get_inputs()[0].shape
+        if isinstance(input_shape[2], int) and isinstance(input_shape[3], int):
+            self.imgsz = (input_shape[2], input_shape[3])
+            self.dynamic = False
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if 'names' in metadata:
+            self.names = ast.literal_eval(metadata['names'])
+        return True
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVINOBackend(ExportedYOLOBackend):
+    """best_openvino_model/ compiled for the OpenVINO CPU plugin"""
+    name = 'openvino'
+
+    def load(self):
+        """Compile the IR for CPU and read the class names from metadata.yaml"""
+        import openvino as ov
+        import yaml
+
+        model_dir = self.weights_path
+        xml_files = [f for f in os.listdir(model_dir) if f.endswith('.xml')]
+        if not xml_files:
+            print(f"No OpenVINO model found in {model_dir}")
+            return False
+
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if self.num_threads:
+            config["INFERENCE_NUM_THREADS"] = self.num_threads
+        core = ov.Core()
+        model = core.read_model(os.path.join(model_dir, xml_files[0]))
+        self.compiled_model = core.compile_model(model, "CPU", config)
+        self.output_port = self.compiled_model.output(0)
+
+        input_shape = model.input(0).get_partial_shape()
+        if input_shape.is_static:
+            self.imgsz = (input_shape[2].get_length(), input_shape[3].get_length())
+            self.dynamic = False
+
+        metadata_file = os.path.join(model_dir, 'metadata.yaml')
+        if os.path.exists(metadata_file):
+            with open(metadata_file, 'r') as f:
+                self.names = yaml.safe_load(f).get('names', {})
+        return True
+
+    def _run(self, blob):
+        return self.compiled_model([blob])[self.output_port]
+
+
+def non_max_suppression(boxes, scores, class_ids, iou_threshold):
+    """Class-aware NMS; returns kept indices sorted by descending score"""
+    # Offset boxes per class so boxes of different classes never overlap
+    offsets = class_ids.astype(boxes.dtype)[:, None] * 7680
+    shifted = boxes + offsets
+    areas = (shifted[:, 2] - shifted[:, 0]) * (shifted[:, 3] - shifted[:, 1])
+
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+
+        x1 = np.maximum(shifted[best, 0], shifted[rest, 0])
+        y1 = np.maximum(shifted[best, 1], shifted[rest, 1])
+        x2 = np.minimum(shifted[best, 2], shifted[rest, 2])
+        y2 = np.minimum(shifted[best, 3], shifted[rest, 3])
+        intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def exported_model_path(model_path, backend):
+    """Where ultralytics puts the export of model_path for a backend"""
+    base = os.path.splitext(model_path)[0]
+    if backend == 'onnx':
+        return base + '.onnx'
+    if backend == 'openvino':
+        return base + '_openvino_model'
+    return model_path
+
+
+def export_model(model_path='best.pt', backend='onnx', imgsz=DEFAULT_IMGSZ, dynamic=True):
+    """Export best.pt for a backend with ultralytics; returns the exported path or None
+
+    Dynamic input shapes let the backend run smaller crops at smaller sizes.
+    """
+    try:
+        from ultralytics import YOLO
+
+        print(f"Exporting {model_path} to {backend}...")
+        export_format = 'onnx' if backend == 'onnx' else 'openvino'
+        exported = YOLO(model_path).export(format=export_format, imgsz=imgsz, dynamic=dynamic)
+        print(f"Exported model written to {exported}")
+        return exported
+    except Exception as e:
+        print(f"Error exporting model: {e}")
+        return None
+
+
+def get_backend_name(backend=None):
+    """Backend from the argument or AINIFORM_BACKEND (torch, onnx or openvino)"""
+    backend = (backend or os.environ.get("AINIFORM_BACKEND", "torch")).lower()
+    if backend not in BACKENDS:
+        print(f"Unknown inference backend '{backend}', using torch")
+        backend = 'torch'
+    return backend
+
+
+def create_backend(model_path='best.pt', backend=None, num_threads=None):
+    """Build (but don't load) the configured backend for best.pt
+
+    For onnx/openvino the exported model next to best.pt is used, and it is
+    exported on first use, or again when best.pt is newer than the export.
+    """
+    backend = get_backend_name(backend)
+    if num_threads is None and os.environ.get("AINIFORM_THREADS"):
+        num_threads = int(os.environ["AINIFORM_THREADS"])
+
+    if backend == 'torch':
+        return TorchBackend(model_path, num_threads)
+
+    weights_path = exported_model_path(model_path, backend)
+    if os.path.exists(model_path) and (not os.path.exists(weights_path)
+                                       or os.path.getmtime(model_path) > os.path.getmtime(weights_path)):
+        # Missing, or older than best.pt - export again
+        export_model(model_path, backend)
+
+    if backend == 'onnx':
+        return ONNXRuntimeBackend(weights_path, num_threads)
+    return OpenVINOBackend(weights_path, num_threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export best.pt for the ONNX Runtime or OpenVINO backend')
+    parser.add_argument('--model', type=str, default='best.pt',
+                       help='Path to YOLO model file (default: best.pt)')
+    parser.add_argument('--backend', type=str, default='onnx', choices=['onnx', 'openvino'],
+                       help='Backend to export for (default: onnx)')
+    parser.add_argument('--imgsz', type=int, default=DEFAULT_IMGSZ,
+                       help=f'Input size of the exported model (default: {DEFAULT_IMGSZ})')
+    parser.add_argument('--static', action='store_true',
+                       help='Export a fixed input shape instead of dynamic shapes')
+
+    args = parser.parse_args()
+    export_model(args.model, args.backend, args.imgsz, dynamic=not args.static)
+
+if __name__ == "__main__":
+    main()
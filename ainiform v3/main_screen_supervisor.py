@@ -0,0 +1,238 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+
+# Lines the main screen process writes to stdout to talk to the supervisor
+SUPERVISOR_PREFIX = "@supervisor"
+# Exit code of a main screen that was closed with ESC to return to the guard console
+RETURN_TO_LOGIN_EXIT_CODE = 3
+
+
+class ScreenProcess:
+    """One testmainscreen.py process started in standby mode"""
+    def __init__(self, script_path, python=sys.executable):
+        """Start the process; it imports PyQt5 and builds the hidden main screen"""
+        self.spawned_at = time.perf_counter()
+        self.ready_ms = None
+        self.show_requested_at = None
+        self.shown_ms = None
+        self.ready_event = threading.Event()
+        self.shown_event = threading.Event()
+        self.process = subprocess.Popen([python, script_path, '--standby'], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, text=True, bufsize=1,
+                                        cwd=os.path.dirname(script_path))
+        self._reader = threading.Thread(target=self._read_output, name="ScreenProcessOutput", daemon=True)
+        self._reader.start()
+
+    def _read_output(self):
+        """Handle supervisor messages and pass everything else through to our stdout"""
+        for line in self.process.stdout:
+            if not line.startswith(SUPERVISOR_PREFIX):
+                sys.stdout.write(line)
+                continue
+            message = line[len(SUPERVISOR_PREFIX):].strip()
+            now = time.perf_counter()
+            if message == 'ready':
+                self.ready_ms = (now - self.spawned_at) * 1000
+                self.ready_event.set()
+            elif message == 'shown':
+                if self.show_requested_at is not None:
+                    self.shown_ms = (now - self.show_requested_at) * 1000
+                self.shown_event.set()
+
+    def show(self):
+        """Ask the process to show its window; returns False if it is gone"""
+        self.show_requested_at = time.perf_counter()
+        try:
+            self.process.stdin.write("show\n")
+            self.process.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError):
+            return False
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def terminate(self, timeout=2.0):
+        """Stop the process (closing stdin makes a standby quit on its own)"""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        if self.is_alive():
+            self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class MainScreenSupervisor:
+    """Keeps the public main screen running with a warm standby process ready
+
+    A standby testmainscreen.py process has already imported PyQt5 and
+    built its window; it only waits for "show" on stdin. activate() swaps
+    the standby in and immediately starts warming the next one. When the
+    active screen crashes, the monitor thread swaps the standby in the same
+    way, so the display is back in milliseconds instead of a full Python
+    and Qt start. A screen closed with ESC exits with
+    RETURN_TO_LOGIN_EXIT_CODE and is not restarted. stats() reports restart
+    counts and the cold start / warm swap timings.
+    """
+    def __init__(self, script_path=None, python=sys.executable, ready_timeout=30.0, poll_interval=0.2):
+        """Initialize the supervisor (no process is started until start())"""
+        self.script_path = script_path or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                       "testmainscreen.py")
+        self.python = python
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.active = None
+        self.standby = None
+        # Screen that activate() is waiting on to become ready (outside the lock)
+        self.activating = None
+        self.restart_count = 0
+        self.crash_count = 0
+        self.return_to_login_count = 0
+        self.cold_start_ms = []
+        self.warm_swap_ms = []
+        self.standby_warmup_ms = []
+        self.is_running = False
+        self._lock = threading.RLock()
+        self._monitor = None
+
+    def start(self):
+        """Warm the first standby and start watching the processes"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.is_running = True
+            self._spawn_standby()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="MainScreenSupervisor", daemon=True)
+        self._monitor.start()
+
+    def _spawn_standby(self):
+        """Start warming a new standby process"""
+        try:
+            self.standby = ScreenProcess(self.script_path, self.python)
+        except Exception as e:
+            print(f"Error starting standby main screen: {e}")
+            self.standby = None
+
+    def activate(self):
+        """Show the main screen, swapping in the warm standby when there is one"""
+        with self._lock:
+            if not self.is_running:
+                self.start()
+            if (self.active is not None and self.active.is_alive()) or self.activating is not None:
+                return True
+
+            screen = self.standby
+            self.standby = None
+            warm = screen is not None and screen.is_alive() and screen.ready_event.is_set()
+            if screen is None or not screen.is_alive():
+                # No standby to swap in - start one cold and show it as soon as it is ready
+                self._spawn_standby()
+                screen, self.standby = self.standby, None
+                if screen is None:
+                    return False
+
+            started_at = screen.spawned_at
+            self.activating = screen
+
+        # A cold screen can take seconds to get ready; wait without the lock so deactivate()
+        # on the Tk thread and the monitor loop are never held up by it
+        deadline = time.monotonic() + self.ready_timeout
+        ready = screen.ready_event.wait(0)
+        while not ready and screen.is_alive() and time.monotonic() < deadline:
+            ready = screen.ready_event.wait(self.poll_interval)
+
+        with self._lock:
+            if self.activating is not screen:
+                # deactivate() or stop() cancelled this activation and already terminated the screen
+                return False
+            self.activating = None
+            if not ready or not screen.show():
+                print("Error: main screen process did not become ready")
+                screen.terminate()
+                if self.standby is None:
+                    self._spawn_standby()
+                return False
+            self.active = screen
+            self.standby_warmup_ms.append(round(screen.ready_ms, 1))
+
+            # Warm the next standby while this one is on screen (the monitor may have started one already)
+            if self.standby is None or not self.standby.is_alive():
+                self._spawn_standby()
+
+        screen.shown_event.wait(self.ready_timeout)
+        if warm:
+            self.warm_swap_ms.append(round(screen.shown_ms or 0.0, 1))
+            print(f"Main screen swapped in from standby in {screen.shown_ms or 0.0:.1f} ms")
+        else:
+            elapsed = (time.perf_counter() - started_at) * 1000
+            self.cold_start_ms.append(round(elapsed, 1))
+            print(f"Main screen cold start took {elapsed:.0f} ms")
+        return True
+
+    def deactivate(self):
+        """Close the visible main screen (or cancel one still starting); the standby stays warm"""
+        with self._lock:
+            screens = [self.active, self.activating]
+            self.active = self.activating = None
+        for screen in screens:
+            if screen is not None:
+                screen.terminate()
+
+    def _monitor_loop(self):
+        """Swap the standby in when the active screen dies, and keep a standby warm"""
+        while self.is_running:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self.is_running:
+                    break
+                restart = False
+                if self.active is not None and not self.active.is_alive():
+                    exit_code = self.active.process.returncode
+                    self.active = None
+                    if exit_code == RETURN_TO_LOGIN_EXIT_CODE:
+                        self.return_to_login_count += 1
+                        print("Main screen closed - returned to the guard console")
+                    else:
+                        if exit_code != 0:
+                            self.crash_count += 1
+                        self.restart_count += 1
+                        print(f"Main screen exited with code {exit_code} - restarting from standby")
+                        restart = True
+                if self.standby is None or not self.standby.is_alive():
+                    self._spawn_standby()
+            if restart:
+                self.activate()
+
+    def stats(self):
+        """Restart counts and start-up timings (ms)"""
+        with self._lock:
+            return {
+                'active': self.active is not None and self.active.is_alive(),
+                'standby_ready': self.standby is not None and self.standby.ready_event.is_set(),
+                'restart_count': self.restart_count,
+                'crash_count': self.crash_count,
+                'return_to_login_count': self.return_to_login_count,
+                'cold_start_ms': list(self.cold_start_ms),
+                'warm_swap_ms': list(self.warm_swap_ms),
+                'standby_warmup_ms': list(self.standby_warmup_ms)
+            }
+
+    def stop(self):
+        """Stop supervising and close every main screen process"""
+        with self._lock:
+            self.is_running = False
+            screens = [self.active, self.activating, self.standby]
+            self.active = self.activating = self.standby = None
+        for screen in screens:
+            if screen is not None:
+                screen.terminate()
+        if self._monitor is not None:
+            self._monitor.join(timeout=2.0)
+            self._monitor = None
@@ -0,0 +1,159 @@
+import os
+import argparse
+
+from sqlite_database_manager import connect_database
+from violation_ledger import ViolationLedger
+from check_journal import CheckEventJournal
+from database_manager import apply_check_projection
+
+
+def _data_lines(path):
+    """Yield split, non-comment lines of a comma-separated text database"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#') or not line:
+                continue
+            yield line.split(',')
+
+
+def import_people(connection, db_file):
+    """Import database.txt rows (file order is kept in row_order)"""
+    rows = []
+    for parts in _data_lines(db_file):
+        if len(parts) < 3:
+            continue
+        status = parts[3] if len(parts) > 3 else "ACTIVE"
+        image_path = parts[4] if len(parts) > 4 else ""
+        try:
+            violation_count = int(parts[5]) if len(parts) > 5 and parts[5] else 0
+        except ValueError:
+            violation_count = 0
+        rows.append((parts[0], parts[1], parts[2], status, image_path, violation_count))
+
+    connection.executemany(
+        "INSERT INTO people (id, role, name, status, image_path, violation_count) VALUES (?, ?, ?, ?, ?, ?)",
+        rows)
+    return len(rows)
+
+
+def import_visitors(connection, visitors_file):
+    """Import visitors.txt rows; missing check-in/out columns become NULL"""
+    rows = []
+    for parts in _data_lines(visitors_file):
+        if len(parts) < 10:
+            continue
+        check_in_time = parts[10] if len(parts) > 10 else None
+        check_out_time = parts[11] if len(parts) > 11 else None
+        rows.append(tuple(parts[:10]) + (check_in_time, check_out_time))
+
+    connection.executemany(
+        "INSERT INTO visitors (name, contact, visiting_as, purpose, visiting, id_type, special_pass, "
+        "created_at, expires_at, status, check_in_time, check_out_time) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows)
+    return len(rows)
+
+
+def import_violations(connection, violations_file, violations_log_file):
+    """Import violation counters (snapshot plus log) and the logged violation history"""
+    ledger = ViolationLedger(violations_file, violations_log_file)
+    connection.executemany(
+        "INSERT INTO violations (person_id, count) VALUES (?, ?) "
+        "ON CONFLICT(person_id) DO UPDATE SET count = excluded.count",
+        list(ledger.counts.items()))
+
+    events = []
+    for parts in _data_lines(violations_log_file):
+        if len(parts) >= 2:
+            events.append((parts[0], parts[1]))
+    connection.executemany("INSERT INTO violation_events (timestamp, person_id) VALUES (?, ?)", events)
+    return len(ledger.counts)
+
+
+def import_access_log(connection, access_log_file):
+    """Import access_log.txt (older lines carry extra role/name columns before the status)"""
+    rows = []
+    for parts in _data_lines(access_log_file):
+        if len(parts) < 4:
+            continue
+        rows.append((parts[0], parts[1], parts[2], parts[-1]))
+
+    connection.executemany("INSERT INTO access_log (timestamp, id, action, status) VALUES (?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def fold_check_journal(source_dir):
+    """Compact journaled Special Pass check-ins/outs into visitors.txt; returns the event count"""
+    journal_file = os.path.join(source_dir, "special_pass_checks.journal")
+    visitors_file = os.path.join(source_dir, "visitors.txt")
+    if not os.path.exists(journal_file) or not os.path.exists(visitors_file):
+        return 0
+    journal = CheckEventJournal(journal_file)
+    try:
+        return journal.compact(lambda projection: apply_check_projection(visitors_file, projection))
+    finally:
+        journal.close()
+
+
+def remove_database(db_path):
+    """Delete a SQLite database together with its -wal/-shm files"""
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def migrate(source_dir=".", db_path="ainiform.db", force=False):
+    """Import the text databases in source_dir into a new SQLite database"""
+    if os.path.exists(db_path):
+        if not force:
+            print(f"{db_path} already exists - use --force to replace it")
+            return False
+        remove_database(db_path)
+
+    connection = None
+    try:
+        # Check-ins/outs not compacted yet would otherwise be missing from the visitors table
+        checks = fold_check_journal(source_dir)
+        if checks:
+            print(f"Compacted {checks} Special Pass check event(s) into visitors.txt")
+
+        connection = connect_database(db_path)
+        # One transaction for the whole import, so a failure leaves no half-migrated database
+        with connection:
+            people = import_people(connection, os.path.join(source_dir, "database.txt"))
+            visitors = import_visitors(connection, os.path.join(source_dir, "visitors.txt"))
+            violations = import_violations(connection, os.path.join(source_dir, "violations.txt"),
+                                           os.path.join(source_dir, "violations.log"))
+            access_log = import_access_log(connection, os.path.join(source_dir, "access_log.txt"))
+        print(f"Imported {people} people, {visitors} visitors, {violations} violation counters "
+              f"and {access_log} access log entries into {db_path}")
+        return True
+    except Exception as e:
+        print(f"Error migrating to SQLite: {e}")
+        if connection is not None:
+            connection.close()
+            connection = None
+        remove_database(db_path)
+        return False
+    finally:
+        if connection is not None:
+            connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import the AI-niform text databases into SQLite')
+    parser.add_argument('--source', type=str, default='.',
+                       help='Directory containing database.txt, visitors.txt, violations.txt and access_log.txt')
+    parser.add_argument('--db', type=str, default='ainiform.db',
+                       help='SQLite database file to create (default: ainiform.db)')
+    parser.add_argument('--force', action='store_true',
+                       help='Replace an existing SQLite database')
+
+    args = parser.parse_args()
+    migrate(args.source, args.db, args.force)
+
+if __name__ == "__main__":
+    main()
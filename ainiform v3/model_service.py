@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from inference_backend import create_backend, get_backend_name
+
+
+class YOLOModelService:
+    """Process-wide YOLO model shared by every splash screen
+
+    The model is an InferenceBackend (torch, onnx or openvino, chosen by
+    AINIFORM_BACKEND), so only the selected engine is imported.
+    """
+    def __init__(self, model_path='best.pt', warmup_shape=(480, 640, 3), backend=None):
+        """Initialize the model service (the model is not loaded yet)"""
+        self.model_path = model_path
+        self.backend_name = get_backend_name(backend)
+        self.weights_path = None
+        self.warmup_shape = warmup_shape
+        self.model = None
+        self.model_mtime = None
+        # File mtimes at the last load attempt, successful or not
+        self.checked_mtimes = None
+        self.load_time = 0.0
+        self.warmup_time = 0.0
+        self.is_loading = False
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._ready_event = threading.Event()
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
+
+    def start(self, background=True):
+        """Load and warm up the model, by default without blocking the caller"""
+        with self._lock:
+            if self.model is not None or self.is_loading:
+                return
+            self.is_loading = True
+
+        if background:
+            thread = threading.Thread(target=self._load_and_warmup, name="YOLOModelLoader", daemon=True)
+            thread.start()
+        else:
+            self._load_and_warmup()
+
+    def _load_and_warmup(self):
+        """Load the model from disk and run a dummy frame through it"""
+        try:
+            with self._reload_lock:
+                model = self._build_model()
+                self.checked_mtimes = self._file_mtimes()
+            if model is not None:
+                self._warmup(model)
+                with self._lock:
+                    self.model = model
+        finally:
+            with self._lock:
+                self.is_loading = False
+            self._ready_event.set()
+
+    def _build_model(self):
+        """Read the weights file and build the configured inference backend"""
+        try:
+            start_time = time.perf_counter()
+            model = create_backend(self.model_path, self.backend_name)
+            self.weights_path = model.weights_path
+            print(f"Loading YOLO model from {self.weights_path} ({self.backend_name} backend)...")
+            if not os.path.exists(self.weights_path):
+                print(f"Model file {self.weights_path} not found. Using placeholder detection.")
+                return None
+
+            mtime = os.path.getmtime(self.weights_path)
+            if not model.load():
+                return None
+            self.load_time = time.perf_counter() - start_time
+            self.model_mtime = mtime
+            print(f"Model loaded successfully in {self.load_time:.2f}s!")
+            return model
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            return None
+
+    def _warmup(self, model):
+        """Run one dummy frame so the first real scan does not pay graph setup costs"""
+        try:
+            start_time = time.perf_counter()
+            dummy_frame = np.zeros(self.warmup_shape, dtype=np.uint8)
+            model.predict(dummy_frame)
+            self.warmup_time = time.perf_counter() - start_time
+            print(f"Model warm-up completed in {self.warmup_time:.2f}s")
+        except Exception as e:
+            print(f"Error warming up model: {e}")
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the initial load has finished; returns True if a model is available"""
+        if not self._ready_event.is_set() and not self.is_loading and self.model is None:
+            # Nobody started the service yet - load it now
+            self.start(background=False)
+        self._ready_event.wait(timeout)
+        return self.model is not None
+
+    def get_model(self, timeout=None):
+        """Get the shared model handle (None if unavailable)"""
+        self.wait_until_ready(timeout)
+        return self.model
+
+    def _file_mtimes(self):
+        """mtimes of best.pt and of the file the backend loads (the export, for onnx/openvino)"""
+        paths = [self.model_path]
+        if self.weights_path and self.weights_path != self.model_path:
+            paths.append(self.weights_path)
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+
+    def reload_if_changed(self):
+        """Reload the model if best.pt or its export changed on disk; returns True on reload"""
+        try:
+            mtimes = self._file_mtimes()
+            if all(mtime is None for mtime in mtimes) or mtimes == self.checked_mtimes:
+                return False
+        except Exception as e:
+            print(f"Error checking model file: {e}")
+            return False
+
+        print(f"Model file {self.model_path} changed - reloading")
+        return self.reload()
+
+    def reload(self):
+        """Build and warm up a fresh model, then swap it in"""
+        # One load at a time, whether it comes from the file watcher or a manual reload
+        with self._reload_lock:
+            model = self._build_model()
+            # A failed load is only retried once the files change again
+            self.checked_mtimes = self._file_mtimes()
+            if model is None:
+                return False
+            self._warmup(model)
+            # Detectors holding the old handle keep working until their next scan
+            with self._lock:
+                self.model = model
+        self._ready_event.set()
+        return True
+
+    def start_file_watch(self, interval=5.0):
+        """Poll the weights file and reload automatically when it changes"""
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, args=(interval,),
+                                              name="YOLOModelWatcher", daemon=True)
+        self._watch_thread.start()
+
+    def _watch_loop(self, interval):
+        """Background loop for start_file_watch"""
+        while not self._watch_stop.wait(interval):
+            if self._ready_event.is_set():
+                self.reload_if_changed()
+
+    def stop(self):
+        """Stop watching the weights file"""
+        self._watch_stop.set()
+
+
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+
+def get_model_service(model_path='best.pt'):
+    """Get the process-wide model service, creating it on first use"""
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = YOLOModelService(model_path)
+        return _shared_service
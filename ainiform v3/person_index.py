@@ -0,0 +1,162 @@
+import os
+import datetime
+import threading
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_timestamp(value):
+    """Parse a database timestamp, returning None if it is empty or malformed"""
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+class PersonIndex:
+    """In-memory index over database.txt and visitors.txt
+
+    Both files are parsed once into dicts keyed by card ID, Special Pass ID
+    and student number, with timestamps already parsed. Every lookup checks
+    the files' mtime/size (one stat call each) and reloads only what changed.
+    """
+    def __init__(self, db_file, visitors_file):
+        """Initialize an empty index for the given files"""
+        self.db_file = db_file
+        self.visitors_file = visitors_file
+        self.people_by_id = {}
+        self.student_numbers = {}
+        self.student_number_by_rfid = {}
+        self.visitors_by_pass = {}
+        self._db_signature = None
+        self._visitors_signature = None
+        self._lock = threading.RLock()
+
+    def _signature(self, path):
+        """File identity used for invalidation: (mtime_ns, size) or None if missing"""
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def invalidate(self):
+        """Force a reload on the next lookup (call after writing either file)"""
+        with self._lock:
+            self._db_signature = None
+            self._visitors_signature = None
+
+    def refresh(self):
+        """Reload any file whose mtime or size changed since it was indexed"""
+        with self._lock:
+            db_signature = self._signature(self.db_file)
+            if db_signature is None or db_signature != self._db_signature:
+                self._load_database()
+                self._db_signature = db_signature
+
+            visitors_signature = self._signature(self.visitors_file)
+            if visitors_signature is None or visitors_signature != self._visitors_signature:
+                self._load_visitors()
+                self._visitors_signature = visitors_signature
+
+    def _load_database(self):
+        """Parse database.txt into the card ID, student number and RFID maps"""
+        people_by_id = {}
+        student_numbers = {}
+        student_number_by_rfid = {}
+        try:
+            with open(self.db_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('#') or not line:
+                        continue
+
+                    parts = line.split(',')
+                    if len(parts) < 3:
+                        continue
+
+                    db_id = parts[0]
+                    role = parts[1]
+                    name = parts[2]
+                    status = parts[3] if len(parts) > 3 else "ACTIVE"
+
+                    # First ACTIVE row for an ID wins, as in a top-to-bottom scan
+                    if status == "ACTIVE" and db_id not in people_by_id:
+                        people_by_id[db_id] = {
+                            'id': db_id,
+                            'role': role,
+                            'name': name,
+                            'status': status
+                        }
+
+                    if role == 'STUDENT_NUMBER' and status == "ACTIVE":
+                        student_numbers[db_id] = name
+                    elif role == 'STUDENT_RFID' and db_id not in student_number_by_rfid:
+                        # The student number is in the third column
+                        student_number_by_rfid[db_id] = parts[2]
+        except Exception as e:
+            print(f"Error reading database: {e}")
+
+        self.people_by_id = people_by_id
+        self.student_numbers = student_numbers
+        self.student_number_by_rfid = student_number_by_rfid
+
+    def _load_visitors(self):
+        """Parse visitors.txt into per-Special-Pass record lists (file order preserved)"""
+        visitors_by_pass = {}
+        try:
+            with open(self.visitors_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('#') or not line:
+                        continue
+
+                    parts = line.split(',')
+                    if len(parts) < 10:
+                        continue
+
+                    check_in_time = parts[10] if len(parts) > 10 else ""
+                    check_out_time = parts[11] if len(parts) > 11 else ""
+                    record = {
+                        'name': parts[0],
+                        'special_pass': parts[6],
+                        'created_at_str': parts[7],
+                        'expires_at_str': parts[8],
+                        'created_at': parse_timestamp(parts[7]),
+                        'expires_at': parse_timestamp(parts[8]),
+                        'status': parts[9],
+                        'check_in_time': check_in_time,
+                        'check_out_time': check_out_time,
+                        'check_in_at': parse_timestamp(check_in_time),
+                        'field_count': len(parts)
+                    }
+                    visitors_by_pass.setdefault(parts[6], []).append(record)
+        except Exception as e:
+            print(f"Error reading visitors file: {e}")
+
+        self.visitors_by_pass = visitors_by_pass
+
+    def get_person(self, card_id):
+        """Active database.txt entry for a card ID, or None"""
+        self.refresh()
+        return self.people_by_id.get(card_id)
+
+    def is_student_number_active(self, student_number):
+        """True if the student number has an ACTIVE STUDENT_NUMBER row"""
+        self.refresh()
+        return student_number in self.student_numbers
+
+    def get_student_number(self, rfid_id):
+        """Student number mapped to an RFID card, or None"""
+        self.refresh()
+        return self.student_number_by_rfid.get(rfid_id)
+
+    def get_visitor_records(self, special_pass_id, active_only=False):
+        """All visitors.txt records for a Special Pass ID, in file order"""
+        self.refresh()
+        records = self.visitors_by_pass.get(special_pass_id, [])
+        if active_only:
+            return [record for record in records if record['status'] == "ACTIVE"]
+        return records
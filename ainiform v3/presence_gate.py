@@ -0,0 +1,90 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class PresenceGate:
+    """Cheap change detector that decides whether a frame is worth running YOLO on
+
+    Each frame is shrunk to a small blurred grayscale thumbnail and compared
+    with a running-average background. When more than motion_ratio of the
+    pixels differ by more than pixel_threshold, the scene counts as changed
+    and the gate stays open for hold_ms. Detections reported back through
+    note_detections() keep it open too, so someone standing still in front
+    of the camera keeps being scanned. The background adapts quickly while
+    the gate is closed and slowly while it is open, so a person is not
+    absorbed into it in the middle of a scan.
+
+    The gate starts open for hold_ms after reset(), because the student who
+    just tapped their card is usually already in view.
+    """
+    def __init__(self, thumbnail_width=160, pixel_threshold=25, motion_ratio=0.01,
+                 idle_alpha=0.05, active_alpha=0.005, hold_ms=1500):
+        """Initialize the gate thresholds"""
+        self.thumbnail_width = thumbnail_width
+        self.pixel_threshold = pixel_threshold
+        self.motion_ratio = motion_ratio
+        self.idle_alpha = idle_alpha
+        self.active_alpha = active_alpha
+        self.hold_ms = hold_ms
+        self.background = None
+        self.last_change_ratio = 0.0
+        self.passed_count = 0
+        self.skipped_count = 0
+        self.reset()
+
+    def reset(self, now=None):
+        """Forget the background and open the gate for hold_ms"""
+        now = now if now is not None else time.monotonic()
+        self.background = None
+        self.last_motion_at = now
+        self.last_detection_at = None
+
+    def _thumbnail(self, frame):
+        """Small blurred grayscale copy of a BGR frame"""
+        height, width = frame.shape[:2]
+        size = (self.thumbnail_width, max(1, int(height * self.thumbnail_width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def update(self, frame, now=None):
+        """Feed one frame; returns True if the detector should run on it"""
+        now = now if now is not None else time.monotonic()
+        thumbnail = self._thumbnail(frame)
+
+        if self.background is None:
+            self.background = thumbnail.astype(np.float32)
+            self.last_change_ratio = 0.0
+        else:
+            difference = cv2.absdiff(thumbnail, cv2.convertScaleAbs(self.background))
+            self.last_change_ratio = np.count_nonzero(difference > self.pixel_threshold) / difference.size
+            if self.last_change_ratio >= self.motion_ratio:
+                self.last_motion_at = now
+
+        active = self.is_active(now)
+        cv2.accumulateWeighted(thumbnail, self.background, self.active_alpha if active else self.idle_alpha)
+
+        if active:
+            self.passed_count += 1
+        else:
+            self.skipped_count += 1
+        return active
+
+    def note_detections(self, found, now=None):
+        """Tell the gate whether the detector found anything (keeps it open while it does)"""
+        if found:
+            self.last_detection_at = now if now is not None else time.monotonic()
+
+    def is_active(self, now=None):
+        """True while there was motion or a detection within the last hold_ms"""
+        now = now if now is not None else time.monotonic()
+        last_activity = max(self.last_motion_at, self.last_detection_at or self.last_motion_at)
+        return (now - last_activity) * 1000 < self.hold_ms
+
+    def idle_ms(self, now=None):
+        """How long the scene has been still with nothing detected"""
+        now = now if now is not None else time.monotonic()
+        last_activity = max(self.last_motion_at, self.last_detection_at or self.last_motion_at)
+        return max(0.0, (now - last_activity) * 1000)
@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class PreviewRenderer:
+    """Draws camera frames into one reused Tk PhotoImage for a preview label
+
+    The capture thread already converts frames to RGB (see
+    SharedCameraCapture.enable_rgb), so a preview frame costs one copy of
+    the newest RGB frame into a preallocated buffer; detections are drawn on
+    that buffer. Frames that already have the preview size are not resized,
+    and the PhotoImage is created once and updated with paste() afterwards.
+    """
+    def __init__(self, size=(640, 480)):
+        """Initialize the renderer for a preview size (width, height)"""
+        self.size = size
+        self.frame_buffer = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self.preview_buffer = None
+        self.photo = None
+
+    def render(self, camera, label, result=None, drawer=None):
+        """Show the newest frame (with result's boxes) on label; returns False if no frame was ready"""
+        ret, frame = camera.read_rgb(self.frame_buffer)
+        if not ret:
+            return False
+        self.frame_buffer = frame
+
+        # Overlay the detections (green boxes and black text read the same in RGB)
+        if drawer is not None and result is not None:
+            drawer.draw_detections(frame, result)
+
+        # Only resize when the camera doesn't deliver the preview size already
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            if self.preview_buffer is None:
+                self.preview_buffer = np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+            cv2.resize(frame, self.size, dst=self.preview_buffer, interpolation=cv2.INTER_AREA)
+            frame = self.preview_buffer
+
+        image = Image.frombuffer('RGB', self.size, frame, 'raw', 'RGB', 0, 1)
+        if self.photo is None:
+            # First frame: create the PhotoImage and attach it to the label
+            self.photo = ImageTk.PhotoImage(image)
+            label.configure(image=self.photo, text="")
+        else:
+            self.photo.paste(image)
+        return True
+
+    def reset(self):
+        """Drop the PhotoImage (call when the label it was attached to is destroyed)"""
+        self.photo = None
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+INT8 post-training quantization of the uniform detector
+
+Exports best.pt to ONNX, calibrates ONNX Runtime static quantization on the
+labeled dataset (ainiform2/yolo/data.zip, whose images live in
+ainiform2/yolo/house_shirt) and writes the INT8 models next to best.onnx.
+Every model is then evaluated on the same images and a report compares
+per-class precision/recall and per-frame latency against FP32, marking the
+fastest model that stays within the accuracy bar.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import zipfile
+import argparse
+
+import cv2
+import numpy as np
+
+from inference_backend import ONNXRuntimeBackend, export_model, exported_model_path
+from check_backend_parity import match_detections, IMAGE_EXTENSIONS
+from detection_result import REQUIRED_UNIFORM_CLASSES
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ainiform2", "yolo")
+DEFAULT_DATASET = os.path.join(DATA_DIR, "data.zip")
+DEFAULT_IMAGE_DIR = os.path.join(DATA_DIR, "house_shirt")
+# Label Studio prefixes exported label files with an 8-digit hex task hash
+LABEL_PREFIX = re.compile(r'^[0-9a-f]{8}-')
+
+
+class LabeledDataset:
+    """YOLO-format dataset: images plus optional ground-truth boxes"""
+    def __init__(self, dataset_zip, image_dir):
+        """Read classes and labels from the zip and pair them with images"""
+        self.class_names = []
+        self.labels = {}  # image name (without extension) -> [(class_name, cx, cy, w, h)]
+        self.images = {}  # image name (without extension) -> BGR frame
+
+        with zipfile.ZipFile(dataset_zip) as archive:
+            names = archive.namelist()
+            if 'classes.txt' in names:
+                self.class_names = [line.strip() for line in archive.read('classes.txt').decode().splitlines()
+                                    if line.strip()]
+
+            for name in names:
+                if name.startswith('labels/') and name.endswith('.txt'):
+                    stem = LABEL_PREFIX.sub('', os.path.splitext(os.path.basename(name))[0])
+                    self.labels[stem] = self._parse_label_file(archive.read(name).decode())
+                elif name.startswith('images/') and name.lower().endswith(IMAGE_EXTENSIONS):
+                    stem = LABEL_PREFIX.sub('', os.path.splitext(os.path.basename(name))[0])
+                    data = np.frombuffer(archive.read(name), dtype=np.uint8)
+                    self.images[stem] = cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+        # Images exported without their pictures are looked up in image_dir
+        if image_dir and os.path.isdir(image_dir):
+            for image_name in sorted(os.listdir(image_dir)):
+                stem = os.path.splitext(image_name)[0]
+                if image_name.lower().endswith(IMAGE_EXTENSIONS) and stem not in self.images:
+                    frame = cv2.imread(os.path.join(image_dir, image_name))
+                    if frame is not None:
+                        self.images[stem] = frame
+
+    def _parse_label_file(self, text):
+        """Parse 'class cx cy w h' lines (normalized coordinates)"""
+        boxes = []
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) != 5:
+                continue
+            class_id = int(parts[0])
+            class_name = self.class_names[class_id] if class_id < len(self.class_names) else str(class_id)
+            boxes.append((class_name,) + tuple(float(value) for value in parts[1:]))
+        return boxes
+
+    def ground_truth(self, stem):
+        """Labels of one image as detection dicts in pixel coordinates"""
+        height, width = self.images[stem].shape[:2]
+        detections = []
+        for class_name, cx, cy, w, h in self.labels.get(stem, []):
+            detections.append({
+                'bbox': (int((cx - w / 2) * width), int((cy - h / 2) * height),
+                         int((cx + w / 2) * width), int((cy + h / 2) * height)),
+                'confidence': 1.0,
+                'class_name': class_name
+            })
+        return detections
+
+
+class CalibrationReader:
+    """onnxruntime CalibrationDataReader feeding letterboxed dataset images"""
+    def __init__(self, backend, frames):
+        """Preprocess frames exactly as the runtime backend does"""
+        self.blobs = iter([{backend.input_name: backend.preprocess(frame)[0]} for frame in frames])
+
+    def get_next(self):
+        return next(self.blobs, None)
+
+
+def head_node_names(model_path):
+    """Nodes of the last ultralytics module (the Detect head), left in FP32 for accuracy"""
+    import onnx
+
+    model = onnx.load(model_path)
+    module_pattern = re.compile(r'/model\.(\d+)/')
+    indexes = [int(match.group(1)) for node in model.graph.node
+               for match in [module_pattern.search(node.name)] if match]
+    if not indexes:
+        return []
+    head = f"/model.{max(indexes)}/"
+    return [node.name for node in model.graph.node if head in node.name]
+
+
+def quantize(fp32_path, output_path, frames, per_channel=True, keep_head_fp32=True):
+    """Statically quantize an ONNX model to INT8 (QDQ) using frames for calibration"""
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType, CalibrationMethod
+
+    backend = ONNXRuntimeBackend(fp32_path)
+    backend.load()
+
+    print(f"Calibrating {os.path.basename(output_path)} on {len(frames)} images "
+          f"({'per-channel' if per_channel else 'per-tensor'} weights)...")
+    start_time = time.perf_counter()
+    quantize_static(
+        fp32_path, output_path, CalibrationReader(backend, frames),
+        quant_format=QuantFormat.QDQ,
+        per_channel=per_channel,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=head_node_names(fp32_path) if keep_head_fp32 else [])
+    print(f"Wrote {output_path} in {time.perf_counter() - start_time:.1f}s")
+    return output_path
+
+
+def evaluate(model_path, dataset, references, conf, min_iou, repeats, num_threads):
+    """Per-class precision/recall and per-frame latency of one ONNX model"""
+    backend = ONNXRuntimeBackend(model_path, num_threads)
+    backend.load()
+
+    # The four uniform classes are always reported, even without examples
+    stats = {class_name: [0, 0, 0] for class_name in REQUIRED_UNIFORM_CLASSES}
+    latencies = []
+    for stem, frame in dataset.images.items():
+        # First call per image warms caches; only the repeats are timed
+        detections = backend.predict(frame, conf)
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            backend.predict(frame, conf)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+
+        if stem not in references:
+            continue
+        matched, missed, extra = match_detections(references[stem], detections, min_iou, conf_tolerance=1.0)
+        for _, detection, _ in matched:
+            stats.setdefault(detection['class_name'], [0, 0, 0])[0] += 1
+        for detection in missed:
+            stats.setdefault(detection['class_name'], [0, 0, 0])[1] += 1
+        for detection in extra:
+            stats.setdefault(detection['class_name'], [0, 0, 0])[2] += 1
+
+    per_class = {}
+    for class_name, (true_positives, false_negatives, false_positives) in sorted(stats.items()):
+        predicted = true_positives + false_positives
+        actual = true_positives + false_negatives
+        per_class[class_name] = {
+            'precision': true_positives / predicted if predicted else 1.0,
+            'recall': true_positives / actual if actual else 1.0,
+            'support': actual
+        }
+
+    latencies = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        'model': model_path,
+        'size_mb': os.path.getsize(model_path) / (1024 * 1024),
+        'latency_ms': {
+            'mean': float(latencies.mean()),
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95))
+        },
+        'per_class': per_class
+    }
+
+
+def meets_bar(candidate, baseline, max_drop):
+    """True if no class loses more than max_drop precision or recall versus FP32"""
+    for class_name, metrics in baseline['per_class'].items():
+        other = candidate['per_class'].get(class_name, {'precision': 0.0, 'recall': 0.0})
+        if metrics['precision'] - other['precision'] > max_drop or metrics['recall'] - other['recall'] > max_drop:
+            return False
+    return True
+
+
+def print_report(report):
+    """Print the comparison table"""
+    print("\n" + "="*70)
+    print(f"QUANTIZATION REPORT (reference: {report['reference']})")
+    print("="*70)
+    for entry in report['models']:
+        latency = entry['latency_ms']
+        print(f"\n{entry['name']}: {entry['size_mb']:.1f} MB, mean {latency['mean']:.1f} ms, "
+              f"p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms"
+              f"{'' if entry['meets_bar'] else '  (below accuracy bar)'}")
+        for class_name, metrics in entry['per_class'].items():
+            print(f"  {class_name:<16} precision = {metrics['precision']:.3f}  recall = {metrics['recall']:.3f}  "
+                  f"(n = {metrics['support']})")
+    print(f"\nRECOMMENDED MODEL = {report['recommended']}")
+    print("="*70)
+
+
+def run(model_path, dataset_zip, image_dir, output_dir, conf, min_iou, max_drop, repeats, num_threads, report_file):
+    """Export, quantize, evaluate and report; returns the report dict"""
+    fp32_path = exported_model_path(model_path, 'onnx')
+    if not os.path.exists(fp32_path) and export_model(model_path, 'onnx') is None:
+        return None
+
+    dataset = LabeledDataset(dataset_zip, image_dir)
+    if not dataset.images:
+        print(f"No calibration images found for {dataset_zip}")
+        return None
+    frames = list(dataset.images.values())
+
+    output_dir = output_dir or os.path.dirname(os.path.abspath(fp32_path))
+    base = os.path.splitext(os.path.basename(fp32_path))[0]
+    variants = [
+        ('int8_per_channel', quantize(fp32_path, os.path.join(output_dir, f"{base}_int8.onnx"), frames, True)),
+        ('int8_per_tensor', quantize(fp32_path, os.path.join(output_dir, f"{base}_int8_per_tensor.onnx"), frames, False)),
+    ]
+
+    # Score against the labels if they use the model's classes, otherwise against FP32 itself
+    fp32_backend = ONNXRuntimeBackend(fp32_path)
+    fp32_backend.load()
+    model_classes = set(fp32_backend.names.values())
+    if model_classes & set(dataset.class_names):
+        reference_name = 'labels'
+        references = {stem: dataset.ground_truth(stem) for stem in dataset.labels if stem in dataset.images}
+    else:
+        print(f"Dataset classes {dataset.class_names} don't match the model's {sorted(model_classes)}; "
+              f"scoring INT8 against FP32 predictions instead")
+        reference_name = 'fp32 predictions'
+        references = {stem: fp32_backend.predict(frame, conf) for stem, frame in dataset.images.items()}
+
+    print("Evaluating fp32...")
+    baseline = evaluate(fp32_path, dataset, references, conf, min_iou, repeats, num_threads)
+    baseline.update(name='fp32', meets_bar=True)
+    entries = [baseline]
+    for name, path in variants:
+        print(f"Evaluating {name}...")
+        entry = evaluate(path, dataset, references, conf, min_iou, repeats, num_threads)
+        entry.update(name=name, meets_bar=meets_bar(entry, baseline, max_drop))
+        entries.append(entry)
+
+    eligible = [entry for entry in entries if entry['meets_bar']]
+    recommended = min(eligible, key=lambda entry: entry['latency_ms']['mean'])
+    report = {
+        'reference': reference_name,
+        'max_drop': max_drop,
+        'images': len(frames),
+        'models': entries,
+        'recommended': recommended['model']
+    }
+
+    print_report(report)
+    if report_file:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {report_file}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='INT8 post-training quantization of the uniform detector')
+    parser.add_argument('--model', type=str, default='best.pt',
+                       help='Path to YOLO model file (default: best.pt)')
+    parser.add_argument('--dataset', type=str, default=DEFAULT_DATASET,
+                       help='YOLO-format dataset zip (default: ainiform2/yolo/data.zip)')
+    parser.add_argument('--images', type=str, default=DEFAULT_IMAGE_DIR,
+                       help='Directory with the dataset images (default: ainiform2/yolo/house_shirt)')
+    parser.add_argument('--output-dir', type=str, default=None,
+                       help='Where to write the INT8 models (default: next to best.onnx)')
+    parser.add_argument('--conf', type=float, default=0.5,
+                       help='Confidence threshold (default: 0.5)')
+    parser.add_argument('--min-iou', type=float, default=0.5,
+                       help='IoU for a prediction to count as a true positive (default: 0.5)')
+    parser.add_argument('--max-drop', type=float, default=0.02,
+                       help='Largest per-class precision/recall drop allowed versus FP32 (default: 0.02)')
+    parser.add_argument('--repeats', type=int, default=5,
+                       help='Timed runs per image (default: 5)')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='ONNX Runtime intra-op threads (default: runtime default)')
+    parser.add_argument('--report', type=str, default='quantization_report.json',
+                       help='JSON report file (default: quantization_report.json)')
+
+    args = parser.parse_args()
+    report = run(args.model, args.dataset, args.images, args.output_dir, args.conf, args.min_iou,
+                 args.max_drop, args.repeats, args.threads, args.report)
+    if report is None:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
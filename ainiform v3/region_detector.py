@@ -0,0 +1,189 @@
+import os
+import time
+
+import numpy as np
+
+from detection_result import NO_BOXES, NO_CONFIDENCES, NO_CLASS_IDS
+
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+MODEL_STRIDE = 32
+
+
+def parse_roi(value):
+    """Parse 'x1,y1,x2,y2' (fractions of the frame) into a tuple, or None if invalid"""
+    try:
+        roi = tuple(float(part) for part in value.split(','))
+        if len(roi) == 4 and 0.0 <= roi[0] < roi[2] <= 1.0 and 0.0 <= roi[1] < roi[3] <= 1.0:
+            return roi
+    except ValueError:
+        pass
+    print(f"Invalid region of interest '{value}' - expected x1,y1,x2,y2 between 0 and 1")
+    return None
+
+
+class HOGPersonDetector:
+    """OpenCV's built-in HOG pedestrian detector, run on a downscaled copy of the region
+
+    Needs no model file. Its 64x128 window finds people who are at least
+    half the height of the downscaled region.
+    """
+    def __init__(self, width=320):
+        """Create the HOG descriptor with OpenCV's default people detector"""
+        import cv2
+        if not hasattr(cv2, 'HOGDescriptor'):
+            raise RuntimeError("this OpenCV build has no HOG detector - set AINIFORM_PERSON_MODEL")
+        self.cv2 = cv2
+        self.width = width
+        self.hog = cv2.HOGDescriptor()
+        self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+
+    def detect(self, region):
+        """Person boxes (int32 x1, y1, x2, y2) in region pixels"""
+        scale = min(1.0, self.width / region.shape[1])
+        small = region
+        if scale < 1.0:
+            small = self.cv2.resize(region, None, fx=scale, fy=scale, interpolation=self.cv2.INTER_AREA)
+        rects, _ = self.hog.detectMultiScale(small, winStride=(8, 8), padding=(8, 8), scale=1.05)
+        if len(rects) == 0:
+            return NO_BOXES
+        rects = np.asarray(rects, dtype=np.float32) / scale
+        return np.column_stack([rects[:, 0], rects[:, 1], rects[:, 0] + rects[:, 2],
+                                rects[:, 1] + rects[:, 3]]).astype(np.int32)
+
+
+class YOLOPersonDetector:
+    """The person class of a COCO-trained model (e.g. yolov8n) on its own backend
+
+    Static ONNX/OpenVINO exports ignore imgsz, so export the person model at
+    imgsz for this pass to actually be cheap.
+    """
+    def __init__(self, backend, imgsz=320, conf=0.3, person_class=0):
+        """Wrap a loaded backend"""
+        self.backend = backend
+        self.imgsz = imgsz
+        self.conf = conf
+        self.person_class = person_class
+
+    def detect(self, region):
+        """Person boxes (int32 x1, y1, x2, y2) in region pixels"""
+        boxes, _, _ = self.backend.predict_arrays(region, self.conf, self.imgsz, classes=[self.person_class])
+        return boxes
+
+
+class RegionDetector:
+    """Runs an inference backend on the turnstile zone only, optionally gated by a person detector
+
+    The frame is first cut down to a fixed region of interest (the area in
+    front of the turnstile). In adaptive mode a person detector then checks
+    whether anyone is there, and idle frames stop after that check. For
+    occupied frames the uniform model only sees a full-height column of the
+    region around the people found, grown by margin, so shoes and pants are
+    never cut off. The inference size adapts to the crop, so a small crop is
+    never upscaled. Adaptive mode is off by default until the person pass
+    is measured to cost less than it saves on the target hardware.
+    Boxes are returned in full-frame coordinates, so callers can use this
+    in place of the backend.
+    """
+    def __init__(self, backend, roi=FULL_FRAME, adaptive=False, person_detector=None,
+                 detect_imgsz=640, margin=0.1):
+        """Wrap a loaded backend (adaptive mode uses a HOG person detector unless one is given)"""
+        self.backend = backend
+        self.roi = roi
+        self.adaptive = adaptive
+        self.person_detector = person_detector
+        if adaptive and person_detector is None:
+            self.person_detector = HOGPersonDetector()
+        self.detect_imgsz = detect_imgsz
+        self.margin = margin
+        self.timings = {}
+        self.last_crop = None  # (x1, y1, x2, y2) of the last full-resolution crop, in frame pixels
+
+    @property
+    def names(self):
+        return self.backend.names
+
+    def roi_bounds(self, frame_shape):
+        """Region of interest in pixels for a frame shape"""
+        height, width = frame_shape[:2]
+        x1, y1, x2, y2 = self.roi
+        return int(x1 * width), int(y1 * height), int(x2 * width), int(y2 * height)
+
+    def subject_box(self, boxes, region_shape):
+        """Full-height column of the region around the person boxes, grown by margin"""
+        x1, x2 = int(boxes[:, 0].min()), int(boxes[:, 2].max())
+        margin_x = int((x2 - x1) * self.margin)
+        height, width = region_shape[:2]
+        return max(0, x1 - margin_x), 0, min(width, x2 + margin_x), height
+
+    def predict_arrays(self, frame, conf=0.5, imgsz=None, classes=None):
+        """Detect in the region of interest; returns (boxes, confidences, class_ids) in frame pixels"""
+        roi_x, roi_y, roi_x2, roi_y2 = self.roi_bounds(frame.shape)
+        # Slicing gives views, so no pixels are copied until the backend resizes them
+        region = frame[roi_y:roi_y2, roi_x:roi_x2]
+
+        if not self.adaptive:
+            boxes, confidences, class_ids = self.backend.predict_arrays(region, conf, imgsz, classes)
+            self.timings = dict(self.backend.timings)
+            self.last_crop = (roi_x, roi_y, roi_x2, roi_y2)
+            return boxes + np.array([roi_x, roi_y, roi_x, roi_y], dtype=np.int32), confidences, class_ids
+
+        # Pass 1: is anyone in the zone?
+        presence_start = time.perf_counter()
+        presence_boxes = self.person_detector.detect(region)
+        presence_ms = (time.perf_counter() - presence_start) * 1000
+
+        if len(presence_boxes) == 0:
+            # Nobody in the zone - skip the full-resolution pass
+            self.last_crop = None
+            self.timings = {'presence_ms': presence_ms, 'inference_ms': 0.0, 'postprocess_ms': 0.0}
+            return NO_BOXES, NO_CONFIDENCES, NO_CLASS_IDS
+
+        # Pass 2: full resolution on the column around the people only
+        crop_x, crop_y, crop_x2, crop_y2 = self.subject_box(presence_boxes, region.shape)
+        crop = region[crop_y:crop_y2, crop_x:crop_x2]
+        longest_side = -(-max(crop.shape[:2]) // MODEL_STRIDE) * MODEL_STRIDE
+        size = min(imgsz or self.detect_imgsz, longest_side)
+        boxes, confidences, class_ids = self.backend.predict_arrays(crop, conf, size, classes)
+
+        offset_x, offset_y = roi_x + crop_x, roi_y + crop_y
+        self.last_crop = (offset_x, offset_y, roi_x + crop_x2, roi_y + crop_y2)
+        self.timings = dict(self.backend.timings, presence_ms=presence_ms)
+        return boxes + np.array([offset_x, offset_y, offset_x, offset_y], dtype=np.int32), confidences, class_ids
+
+
+def create_person_detector(person_model=None):
+    """Person detector for the presence pass: a COCO YOLO model if given, else OpenCV's HOG detector"""
+    if person_model:
+        from inference_backend import create_backend
+        backend = create_backend(person_model)
+        if backend.load():
+            return YOLOPersonDetector(backend)
+        print(f"Could not load person model {person_model} - using the HOG person detector")
+    return HOGPersonDetector()
+
+
+def create_region_detector(backend):
+    """Wrap a backend according to AINIFORM_ROI, AINIFORM_ADAPTIVE and AINIFORM_PERSON_MODEL
+
+    AINIFORM_ROI is 'x1,y1,x2,y2' as fractions of the frame (default: the
+    whole frame); AINIFORM_ADAPTIVE=1 turns on the person presence pass
+    (default: off); AINIFORM_PERSON_MODEL is a COCO-trained model used for
+    that pass instead of the HOG detector.
+    """
+    roi = FULL_FRAME
+    if os.environ.get("AINIFORM_ROI"):
+        roi = parse_roi(os.environ["AINIFORM_ROI"]) or FULL_FRAME
+    adaptive = os.environ.get("AINIFORM_ADAPTIVE", "0") == "1"
+
+    if roi == FULL_FRAME and not adaptive:
+        return backend
+    person_detector = None
+    if adaptive:
+        try:
+            person_detector = create_person_detector(os.environ.get("AINIFORM_PERSON_MODEL"))
+        except Exception as e:
+            print(f"Error creating person detector: {e} - presence pass disabled")
+            adaptive = False
+            if roi == FULL_FRAME:
+                return backend
+    return RegionDetector(backend, roi=roi, adaptive=adaptive, person_detector=person_detector)
@@ -0,0 +1,192 @@
+import os
+import time
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Segment layout:
+#   header: magic, version, state (1 open / 0 closed), slots, height, width, channels, latest sequence number
+#   per slot: sequence number, capture timestamp
+#   frames: slots * height * width * channels bytes
+HEADER = struct.Struct('<4sIIIIIIQ')
+SLOT_HEADER = struct.Struct('<Qd')
+MAGIC = b'AIFR'
+VERSION = 1
+
+# Names of the rings this process created; the resource tracker must keep them registered
+_owned_names = set()
+
+
+def default_ring_name():
+    """Shared memory name from AINIFORM_FRAME_RING"""
+    return os.environ.get("AINIFORM_FRAME_RING", "ainiform_frames")
+
+
+def _attach(name):
+    """Attach to an existing segment without letting this process's resource tracker unlink it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track= and would unlink the owner's segment when a reader exits
+        from multiprocessing import resource_tracker
+        segment = shared_memory.SharedMemory(name=name)
+        if name in _owned_names:
+            # Reading our own ring: the registration belongs to the owner, leave it alone
+            return segment
+        try:
+            resource_tracker.unregister(segment._name, 'shared_memory')
+        except Exception:
+            pass
+        return segment
+
+
+class SharedFrameRing:
+    """Frames published by the capture owner into a shared-memory ring
+
+    The process that owns the camera (SharedCameraCapture) creates the
+    ring and copies each captured frame into the next slot. Every slot
+    carries a sequence number, written as 0 while the frame is being
+    replaced and set to the frame's number afterwards, so readers in other
+    processes (SharedFrameReader) can tell a complete frame from one that
+    was overwritten while they used it.
+    """
+    def __init__(self, shape, slots=4, name=None):
+        """Create (or replace) the shared memory segment for frames of shape (height, width, channels)"""
+        self.name = name or default_ring_name()
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.frame_bytes = int(np.prod(self.shape))
+        self.frames_offset = HEADER.size + SLOT_HEADER.size * slots
+        size = self.frames_offset + self.frame_bytes * slots
+
+        try:
+            # A segment left behind by a crashed owner
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.segment = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        _owned_names.add(self.name)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.segment.buf,
+                                 offset=self.frames_offset)
+        self.sequence = 0
+        self._write_header(state=1)
+
+    def _write_header(self, state):
+        height, width, channels = self.shape
+        HEADER.pack_into(self.segment.buf, 0, MAGIC, VERSION, state, self.slots, height, width, channels,
+                         self.sequence)
+
+    def publish(self, frame, timestamp=None):
+        """Copy a frame into the next slot and make it the latest"""
+        if frame.shape != self.shape:
+            return False
+        sequence = self.sequence + 1
+        slot = sequence % self.slots
+        slot_offset = HEADER.size + SLOT_HEADER.size * slot
+
+        # Mark the slot as being written, copy, then stamp it with its sequence number
+        SLOT_HEADER.pack_into(self.segment.buf, slot_offset, 0, 0.0)
+        self.frames[slot][...] = frame
+        SLOT_HEADER.pack_into(self.segment.buf, slot_offset, sequence,
+                              timestamp if timestamp is not None else time.time())
+        self.sequence = sequence
+        self._write_header(state=1)
+        return True
+
+    def close(self):
+        """Mark the ring closed and remove the segment"""
+        try:
+            self._write_header(state=0)
+            self.frames = None
+            self.segment.close()
+            self.segment.unlink()
+            _owned_names.discard(self.name)
+        except Exception as e:
+            print(f"Error closing frame ring: {e}")
+
+
+class SharedFrameReader:
+    """Maps another process's SharedFrameRing and reads its newest frames
+
+    get_latest() returns a view straight into shared memory (no copy);
+    like SharedCameraCapture.get_latest(), it stays valid until slots - 1
+    newer frames have been published, and is_current() tells whether it
+    still is. read() copies the frame out and retries if it was overwritten
+    during the copy. The reader reattaches by itself when the owner
+    recreates the ring (for example after a camera resolution change).
+    """
+    def __init__(self, name=None):
+        """Initialize the reader (it attaches on first use)"""
+        self.name = name or default_ring_name()
+        self.segment = None
+        self.frames = None
+        self.slots = 0
+        self.shape = None
+        self.last_sequence = 0
+
+    def attach(self):
+        """Map the ring; returns False if no capture owner has created it yet"""
+        self.detach()
+        try:
+            self.segment = _attach(self.name)
+        except FileNotFoundError:
+            return False
+        magic, version, state, slots, height, width, channels, _ = HEADER.unpack_from(self.segment.buf, 0)
+        if magic != MAGIC or version != VERSION or state != 1:
+            self.detach()
+            return False
+        self.slots = slots
+        self.shape = (height, width, channels)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.segment.buf,
+                                 offset=HEADER.size + SLOT_HEADER.size * slots)
+        return True
+
+    def detach(self):
+        """Unmap the ring"""
+        self.frames = None
+        if self.segment is not None:
+            try:
+                self.segment.close()
+            except Exception:
+                pass
+            self.segment = None
+
+    def _slot_sequence(self, slot):
+        return SLOT_HEADER.unpack_from(self.segment.buf, HEADER.size + SLOT_HEADER.size * slot)[0]
+
+    def get_latest(self):
+        """(sequence, view) of the newest frame, or (None, None) if there is none"""
+        if self.segment is None and not self.attach():
+            return None, None
+        _, _, state, _, _, _, _, sequence = HEADER.unpack_from(self.segment.buf, 0)
+        if state != 1:
+            # The owner closed or is recreating the ring - try again on the next call
+            self.detach()
+            return None, None
+        if sequence == 0:
+            return None, None
+        slot = sequence % self.slots
+        if self._slot_sequence(slot) != sequence:
+            return None, None
+        self.last_sequence = sequence
+        return sequence, self.frames[slot]
+
+    def is_current(self, sequence):
+        """True if the frame returned with this sequence number has not been overwritten"""
+        return self.segment is not None and self._slot_sequence(sequence % self.slots) == sequence
+
+    def read(self, out=None):
+        """Copy the newest frame out; returns (ret, frame)"""
+        for _ in range(3):
+            sequence, view = self.get_latest()
+            if view is None:
+                return False, None
+            if out is None or out.shape != view.shape:
+                out = np.empty_like(view)
+            out[...] = view
+            if self.is_current(sequence):
+                return True, out
+        return False, None
@@ -0,0 +1,398 @@
+import datetime
+import sqlite3
+import threading
+
+from violation_ledger import week_start, semester_start
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS people (
+    row_order INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'ACTIVE',
+    image_path TEXT NOT NULL DEFAULT '',
+    violation_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_people_id_status ON people(id, status);
+
+CREATE TABLE IF NOT EXISTS visitors (
+    row_order INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    contact TEXT,
+    visiting_as TEXT,
+    purpose TEXT,
+    visiting TEXT,
+    id_type TEXT,
+    special_pass TEXT NOT NULL,
+    created_at TEXT,
+    expires_at TEXT,
+    status TEXT NOT NULL,
+    check_in_time TEXT,
+    check_out_time TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_visitors_pass_status ON visitors(special_pass, status);
+CREATE INDEX IF NOT EXISTS idx_visitors_status_expires ON visitors(status, expires_at);
+
+CREATE TABLE IF NOT EXISTS access_log (
+    timestamp TEXT NOT NULL,
+    id TEXT NOT NULL,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_access_log_id ON access_log(id);
+
+CREATE TABLE IF NOT EXISTS violations (
+    person_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS violation_events (
+    timestamp TEXT NOT NULL,
+    person_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_violation_events_person ON violation_events(person_id, timestamp);
+"""
+
+
+def connect_database(db_path):
+    """Open a SQLite database in WAL mode and make sure the schema exists"""
+    connection = sqlite3.connect(db_path, check_same_thread=False, cached_statements=64)
+    connection.row_factory = sqlite3.Row
+    # WAL lets the display and the console read while a tap is being written
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA busy_timeout=2000")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class SQLiteDatabaseManager:
+    """The DatabaseManager API backed by SQLite instead of the comma-separated text files
+
+    Every tap-path query is an indexed point read and every write touches a
+    single row. Statements are constant, parameterized SQL, so sqlite3's
+    statement cache prepares each of them only once per connection.
+    Nothing is inherited from DatabaseManager, whose methods rely on the
+    text-file state; a method missing here fails with AttributeError.
+    """
+    def __init__(self, db_path="ainiform.db"):
+        """Open (or create) the SQLite database"""
+        self.db_file = db_path
+        self.connection = connect_database(db_path)
+        self._lock = threading.Lock()
+
+    def _now(self):
+        return datetime.datetime.now()
+
+    def _query_one(self, sql, params=()):
+        with self._lock:
+            return self.connection.execute(sql, params).fetchone()
+
+    def _query_all(self, sql, params=()):
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self.connection:
+            return self.connection.execute(sql, params).rowcount
+
+    def find_person(self, card_id):
+        """Find a person by their card ID"""
+        try:
+            # First check visitors for Special Pass IDs (prioritize fresh registrations)
+            now = self._now().strftime(TIMESTAMP_FORMAT)
+            row = self._query_one(
+                "SELECT special_pass, name, status FROM visitors "
+                "WHERE special_pass = ? AND status = 'ACTIVE' AND expires_at > ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (card_id, now))
+            if row:
+                return {
+                    'id': row['special_pass'],
+                    'role': 'SPECIAL',
+                    'name': row['name'],
+                    'status': row['status']
+                }
+
+            # If not found in visitors, check the main database
+            row = self._query_one(
+                "SELECT id, role, name, status FROM people "
+                "WHERE id = ? AND status = 'ACTIVE' ORDER BY row_order LIMIT 1",
+                (card_id,))
+            if row:
+                return {
+                    'id': row['id'],
+                    'role': row['role'],
+                    'name': row['name'],
+                    'status': row['status']
+                }
+        except Exception as e:
+            print(f"Error reading database: {e}")
+
+        return None
+
+    def is_special_pass_in_use(self, special_pass_id):
+        """Check if a special pass ID is currently in use"""
+        try:
+            now = self._now().strftime(TIMESTAMP_FORMAT)
+            row = self._query_one(
+                "SELECT name, expires_at FROM visitors "
+                "WHERE special_pass = ? AND status = 'ACTIVE' AND expires_at > ? "
+                "ORDER BY row_order LIMIT 1",
+                (special_pass_id, now))
+            if row:
+                return True, {
+                    'name': row['name'],
+                    'expires_at': row['expires_at']
+                }
+        except Exception as e:
+            print(f"Error checking special pass: {e}")
+
+        return False, None
+
+    def add_visitor(self, visitor_data):
+        """Add a new visitor to the database"""
+        try:
+            with self._lock, self.connection:
+                # First, deactivate any existing entries for the same special pass ID
+                self.connection.execute(
+                    "UPDATE visitors SET status = 'INACTIVE' WHERE special_pass = ? AND status = 'ACTIVE'",
+                    (visitor_data['special_pass'],))
+                self.connection.execute(
+                    "INSERT INTO visitors (name, contact, visiting_as, purpose, visiting, id_type, "
+                    "special_pass, created_at, expires_at, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (visitor_data['name'], visitor_data['contact'], visitor_data['visiting_as'],
+                     visitor_data['purpose'], visitor_data['visiting'], visitor_data['id_type'],
+                     visitor_data['special_pass'], visitor_data['created_at'],
+                     visitor_data['expires_at'], visitor_data['status']))
+            return True
+        except Exception as e:
+            print(f"Error adding visitor: {e}")
+            return False
+
+    def log_access(self, id_number, action, status="SUCCESS"):
+        """Log an access attempt"""
+        try:
+            timestamp = self._now().strftime(TIMESTAMP_FORMAT)
+            self._execute("INSERT INTO access_log (timestamp, id, action, status) VALUES (?, ?, ?, ?)",
+                          (timestamp, id_number, action, status))
+        except Exception as e:
+            print(f"Error logging access: {e}")
+
+    def get_violation_count(self, person_id):
+        """Get violation count for a person"""
+        try:
+            row = self._query_one("SELECT count FROM violations WHERE person_id = ?", (person_id,))
+            return row['count'] if row else 0
+        except Exception as e:
+            print(f"Error getting violation count: {e}")
+            return 0
+
+    def add_violation(self, person_id):
+        """Add a violation for a person"""
+        try:
+            timestamp = self._now().strftime(TIMESTAMP_FORMAT)
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "INSERT INTO violations (person_id, count) VALUES (?, 1) "
+                    "ON CONFLICT(person_id) DO UPDATE SET count = count + 1",
+                    (person_id,))
+                self.connection.execute("INSERT INTO violation_events (timestamp, person_id) VALUES (?, ?)",
+                                        (timestamp, person_id))
+            print(f"Added violation for {person_id}. New count: {self.get_violation_count(person_id)}")
+        except Exception as e:
+            print(f"Error adding violation: {e}")
+
+    def _count_violations_since(self, person_id, start):
+        """Violation events for a person at or after start"""
+        row = self._query_one(
+            "SELECT COUNT(*) AS count FROM violation_events WHERE person_id = ? AND timestamp >= ?",
+            (person_id, start.strftime(TIMESTAMP_FORMAT)))
+        return row['count']
+
+    def get_violation_count_this_week(self, person_id):
+        """Violations recorded for a person since Monday"""
+        try:
+            return self._count_violations_since(person_id, week_start())
+        except Exception as e:
+            print(f"Error getting weekly violation count: {e}")
+            return 0
+
+    def get_violation_count_this_semester(self, person_id):
+        """Violations recorded for a person since the start of the current term"""
+        try:
+            return self._count_violations_since(person_id, semester_start())
+        except Exception as e:
+            print(f"Error getting semester violation count: {e}")
+            return 0
+
+    def get_guard_name(self, guard_id):
+        """Get guard name by ID"""
+        person = self.find_person(guard_id)
+        if person and person['role'] == 'GUARD':
+            return person['name']
+        return "Unknown Guard"
+
+    def is_student_number_valid(self, student_number):
+        """Check if a student number is valid"""
+        try:
+            row = self._query_one(
+                "SELECT 1 FROM people WHERE id = ? AND role = 'STUDENT_NUMBER' AND status = 'ACTIVE' LIMIT 1",
+                (student_number,))
+            return row is not None
+        except Exception as e:
+            print(f"Error checking student number: {e}")
+            return False
+
+    def get_student_number_from_rfid(self, rfid_id):
+        """Get student number from RFID ID"""
+        try:
+            row = self._query_one(
+                "SELECT name FROM people WHERE id = ? AND role = 'STUDENT_RFID' ORDER BY row_order LIMIT 1",
+                (rfid_id,))
+            if row:
+                print(f"Found student number {row['name']} for RFID {rfid_id}")
+                return row['name']
+        except Exception as e:
+            print(f"Error getting student number: {e}")
+
+        print(f"No student number found for RFID: {rfid_id}")
+        return None
+
+    def is_special_pass_expired(self, special_pass_id):
+        """Check if a special pass has expired"""
+        try:
+            now = self._now().strftime(TIMESTAMP_FORMAT)
+            row = self._query_one(
+                "SELECT 1 FROM visitors WHERE special_pass = ? AND status = 'ACTIVE' AND expires_at < ? LIMIT 1",
+                (special_pass_id, now))
+            return row is not None
+        except Exception as e:
+            print(f"Error checking special pass expiration: {e}")
+            return False
+
+    def get_special_pass_check_status(self, special_pass_id):
+        """Get the current check-in/check-out status of a special pass"""
+        try:
+            row = self._query_one(
+                "SELECT check_in_time, check_out_time FROM visitors "
+                "WHERE special_pass = ? AND status = 'ACTIVE' ORDER BY row_order LIMIT 1",
+                (special_pass_id,))
+            if row and row['check_in_time']:
+                # Has check-in but no check-out, next should be check-out
+                return "CHECKED_OUT" if row['check_out_time'] else "CHECKED_IN"
+        except Exception as e:
+            print(f"Error getting check status: {e}")
+
+        return "CHECKED_OUT"  # Default to checked out
+
+    def record_special_pass_check(self, special_pass_id, check_type):
+        """Record a check-in or check-out for a special pass"""
+        try:
+            current_time = self._now().strftime(TIMESTAMP_FORMAT)
+            if check_type == "CHECK_IN":
+                self._execute(
+                    "UPDATE visitors SET check_in_time = ?, check_out_time = '' WHERE special_pass = ?",
+                    (current_time, special_pass_id))
+            elif check_type == "CHECK_OUT":
+                self._execute(
+                    "UPDATE visitors SET check_in_time = COALESCE(check_in_time, ''), check_out_time = ? "
+                    "WHERE special_pass = ?",
+                    (current_time, special_pass_id))
+            return True
+        except Exception as e:
+            print(f"Error recording check: {e}")
+            return False
+
+    def compact_check_journal(self):
+        """Nothing to compact - check times are written straight to the visitors table"""
+        return 0
+
+    def get_special_pass_check_times(self, special_pass_id):
+        """Get the check-in and check-out times for a special pass"""
+        try:
+            row = self._query_one(
+                "SELECT check_in_time, check_out_time FROM visitors "
+                "WHERE special_pass = ? AND check_out_time IS NOT NULL ORDER BY row_order LIMIT 1",
+                (special_pass_id,))
+            if row:
+                return row['check_in_time'] or "", row['check_out_time'] or ""
+        except Exception as e:
+            print(f"Error getting check times: {e}")
+
+        return "", ""
+
+    def is_special_pass_in_grace_period(self, special_pass_id):
+        """Check if a special pass is in grace period (can check-out but not check-in)"""
+        try:
+            rows = self._query_all(
+                "SELECT expires_at, check_in_time FROM visitors "
+                "WHERE special_pass = ? AND status = 'ACTIVE' AND check_in_time != ''",
+                (special_pass_id,))
+            current_time = self._now()
+            for row in rows:
+                try:
+                    expires_at = datetime.datetime.strptime(row['expires_at'], TIMESTAMP_FORMAT)
+                    check_in_dt = datetime.datetime.strptime(row['check_in_time'], TIMESTAMP_FORMAT)
+                except (TypeError, ValueError) as e:
+                    print(f"Error parsing dates for grace period: {e}")
+                    continue
+
+                # If 10 minutes or less remaining at check-in, and now past expiration
+                minutes_remaining_at_checkin = (expires_at - check_in_dt).total_seconds() / 60
+                if minutes_remaining_at_checkin <= 10 and current_time > expires_at:
+                    return True  # In grace period
+        except Exception as e:
+            print(f"Error checking grace period: {e}")
+
+        return False
+
+    def is_special_pass_expired_for_checkin(self, special_pass_id):
+        """Check if a special pass has expired for check-in (considers grace period)"""
+        # For check-in, always check against expiration (no grace period)
+        return self.is_special_pass_expired(special_pass_id)
+
+    def cleanup_expired_special_passes(self):
+        """Remove expired Special Passes to allow reuse"""
+        try:
+            # Add 1 hour grace period for cleanup
+            cutoff = (self._now() - datetime.timedelta(hours=1)).strftime(TIMESTAMP_FORMAT)
+            removed_count = self._execute(
+                "DELETE FROM visitors WHERE status = 'ACTIVE' AND expires_at < ?", (cutoff,))
+            if removed_count > 0:
+                print(f"Cleanup completed: {removed_count} expired Special Pass(es) removed")
+            return removed_count
+        except Exception as e:
+            print(f"Error during cleanup: {e}")
+            return 0
+
+    def _deactivate_existing_special_pass(self, special_pass_id):
+        """Deactivate any existing entries for a special pass ID"""
+        try:
+            deactivated_count = self._execute(
+                "UPDATE visitors SET status = 'INACTIVE' WHERE special_pass = ? AND status = 'ACTIVE'",
+                (special_pass_id,))
+            if deactivated_count > 0:
+                print(f"Deactivated {deactivated_count} existing Special Pass entry(ies) for ID: {special_pass_id}")
+            return deactivated_count
+        except Exception as e:
+            print(f"Error deactivating existing special pass: {e}")
+            return 0
+
+    def is_special_pass_available_for_registration(self, special_pass_id):
+        """Check if a Special Pass ID is available for new registration"""
+        # First, clean up any expired Special Passes
+        self.cleanup_expired_special_passes()
+
+        # Then check if the ID is currently in use
+        is_in_use, existing_visitor = self.is_special_pass_in_use(special_pass_id)
+
+        return not is_in_use
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.connection.close()
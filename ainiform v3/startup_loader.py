@@ -0,0 +1,108 @@
+import sys
+import time
+import importlib
+import threading
+
+# Modules the login screen doesn't need to appear: OpenCV, NumPy and everything
+# built on them (camera capture, detection, the inference backends)
+VISION_MODULES = (
+    'numpy',
+    'cv2',
+    'detection_result',
+    'inference_backend',
+    'model_service',
+    'frame_source',
+    'camera_capture',
+    'presence_gate',
+    'region_detector',
+    'cascade_detector',
+    'compliance_voter',
+    'detection_worker',
+    'preview_renderer',
+)
+
+
+class StartupLoader:
+    """Imports heavy modules in a background thread behind a readiness flag
+
+    The Tk login screen is built while this runs. Code that needs a vision
+    module calls wait() (or checks is_ready()) first; importing a module the
+    loader is still working on simply blocks on Python's import lock, so
+    an early card tap is never unsafe, only slower. Callbacks registered
+    with start() run in the loader thread once every module is imported.
+    """
+    def __init__(self, module_names=VISION_MODULES):
+        """Initialize the loader"""
+        self.module_names = module_names
+        self.timings = {}  # module name -> import time in ms
+        self.errors = {}  # module name -> exception
+        self.total_ms = 0.0
+        self._ready = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, on_ready=None):
+        """Start importing in the background; on_ready is called (in that thread) when done"""
+        with self._lock:
+            if on_ready is not None and not self._ready.is_set():
+                self._callbacks.append(on_ready)
+                on_ready = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="StartupLoader", daemon=True)
+                self._thread.start()
+
+        # Already loaded - run the callback right away
+        if on_ready is not None:
+            on_ready()
+
+    def _load(self):
+        """Import every module, recording how long each one took"""
+        start_time = time.perf_counter()
+        for name in self.module_names:
+            module_start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Error importing {name}: {e}")
+                self.errors[name] = e
+            self.timings[name] = (time.perf_counter() - module_start) * 1000
+        self.total_ms = (time.perf_counter() - start_time) * 1000
+        print(f"Vision modules loaded in {self.total_ms:.0f} ms")
+
+        with self._lock:
+            self._ready.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in startup callback: {e}")
+
+    def is_ready(self):
+        """True once every module has been imported (or failed to)"""
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the modules are loaded; returns True if they are"""
+        if self._thread is None:
+            self.start()
+        return self._ready.wait(timeout)
+
+    def module(self, name):
+        """A loaded module, waiting for the loader first"""
+        self.wait()
+        return sys.modules.get(name) or importlib.import_module(name)
+
+
+_vision_loader = None
+_vision_loader_lock = threading.Lock()
+
+
+def get_vision_loader():
+    """Process-wide StartupLoader for VISION_MODULES"""
+    global _vision_loader
+    with _vision_loader_lock:
+        if _vision_loader is None:
+            _vision_loader = StartupLoader()
+    return _vision_loader
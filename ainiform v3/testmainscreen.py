@@ -1,12 +1,17 @@
 import sys
 import os
+import argparse
 import subprocess
 from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QFrame, QGridLayout, QPushButton, QDialog)
-from PyQt5.QtCore import QTimer, Qt, QSize
-from PyQt5.QtGui import QPixmap, QFont, QPainter, QColor, QPen, QBrush, QPainterPath
+from PyQt5.QtCore import QTimer, Qt, QSize, QSocketNotifier
+from PyQt5.QtGui import QPixmap, QFont, QColor, QPen, QBrush, QImage
 from PyQt5.QtSvg import QSvgWidget
+from main_screen_supervisor import SUPERVISOR_PREFIX, RETURN_TO_LOGIN_EXIT_CODE
+from display_bus import DisplayBusClient
+from shared_frame_ring import SharedFrameReader
+from asset_cache import PixmapCache
 
 class DeveloperModeDialog(QDialog):
     def __init__(self, parent=None):
@@ -265,12 +270,23 @@ class DeveloperModeDialog(QDialog):
         self.close()  # Close developer dialog
 
 class STIWelcomeScreen(QMainWindow):
-    def __init__(self):
+    def __init__(self, db_manager=None, host=None, supervised=False):
         super().__init__()
+        # Shared with the guard console when hosted by app_host.py
+        self.db_manager = db_manager
+        self.host = host
+        # Started by MainScreenSupervisor, which owns the guard console side
+        self.supervised = supervised
         self.setWindowTitle("AI-niform - Main Screen")
         self.setGeometry(0, 0, 1920, 1080)
         self.setFixedSize(1920, 1080)  # Lock to 1920x1080 resolution
         
+        # Logo, user image and scan art are decoded and scaled once, not on every screen change
+        self.assets = PixmapCache()
+        self.assets.preload()
+        # Person from the last valid scan, whose photo replaces the generic user image
+        self.current_person = None
+        
         # Set window to fullscreen (optional)
         # self.showFullScreen()
         
@@ -305,6 +321,21 @@ class STIWelcomeScreen(QMainWindow):
         self.scanning_sequence_step = 0
         self.scanning_overlay = None
         
+        # Live camera frames shared by the console's capture thread
+        self.frame_reader = None
+        self.camera_view = None
+        self.camera_view_timer = None
+        self.camera_view_sequence = 0
+        
+        # Scan results and verdicts pushed by the guard console; drained on the Qt thread
+        self.display_bus = None
+        if os.environ.get("AINIFORM_DISPLAY_BUS", "1") == "1":
+            self.display_bus = DisplayBusClient()
+            if self.display_bus.start():
+                self.bus_timer = QTimer()
+                self.bus_timer.timeout.connect(self.process_bus_messages)
+                self.bus_timer.start(50)
+        
         # Enable key events for returning to login and card scanning
         self.setFocusPolicy(Qt.StrongFocus)
         self.setFocus()  # Set focus to receive keyboard events
@@ -366,8 +397,50 @@ class STIWelcomeScreen(QMainWindow):
             # Clear buffer
             self.card_buffer = ""
     
+    def process_bus_messages(self):
+        """Render everything the guard console sent since the last tick"""
+        for message in self.display_bus.get_messages():
+            try:
+                self.handle_bus_message(message)
+            except Exception as e:
+                print(f"Error handling display bus message: {e}")
+    
+    def handle_bus_message(self, message):
+        """Show a console message; the console already validated the card, so nothing is looked up here"""
+        message_type = message.get('type')
+        if message_type == 'scan':
+            card_id = message.get('card_id', '')
+            status = message.get('status')
+            # Only a valid card has a person whose photo the result screens show
+            self.current_person = None
+            if status == 'valid':
+                self.show_regular_card_verification(card_id, message.get('person'))
+            elif status == 'special_pass':
+                # Check-in shows the success screen, check-out the check-out screen
+                self.show_status_message("Valid Special Pass" if message.get('check_type') == "CHECK_IN"
+                                         else "Special Pass")
+            elif status == 'deactivated':
+                self.show_status_message("Deactivated Pass")
+            else:
+                self.show_invalid_card_message(card_id)
+        elif message_type == 'verdict':
+            verdict = message.get('verdict')
+            if verdict == "clean":
+                self.show_success_screen()
+            elif verdict == "manual_verification":
+                self.show_uniform_issue_screen()
+            else:
+                self.show_unable_to_verify_screen()
+        elif message_type == 'guard':
+            print(f"Guard {message.get('state')}: {message.get('name')}")
+    
     def is_valid_card(self, card_id):
         """Check if the card ID is valid (student, teacher, etc.)"""
+        if self.db_manager is not None:
+            # Same lookup the guard console uses
+            person = self.db_manager.find_person(card_id)
+            return person is not None and person.get('role') not in ('GUARD', 'SPECIAL')
+        
         # Add valid card IDs here - you can expand this list
         valid_card_ids = [
             '02000226226',  # Student card
@@ -380,7 +453,12 @@ class STIWelcomeScreen(QMainWindow):
         """Check if the card ID is a special pass"""
         # Check against database or known special pass patterns
         special_pass_ids = ['9876543210', '001', '002', '003']  # Add more as needed
-        return card_id in special_pass_ids
+        if card_id in special_pass_ids:
+            return True
+        if self.db_manager is not None:
+            person = self.db_manager.find_person(card_id)
+            return person is not None and person.get('role') == 'SPECIAL'
+        return False
     
     def show_special_pass_verification(self, card_id):
         """Show special pass verification screen"""
@@ -500,15 +578,28 @@ class STIWelcomeScreen(QMainWindow):
         print("Testing invalid card message...")
         self.show_invalid_card_message("INVALID123")
     
-    def show_regular_card_verification(self, card_id):
+    def show_regular_card_verification(self, card_id, person=None):
         """Show regular card verification screen"""
-        # Update instruction label
+        # The result screens that follow show this person's photo
+        self.current_person = person
+        
+        # Update instruction label (with the name when the console sent the person)
         if hasattr(self, 'instruction_label'):
-            self.instruction_label.setText(f"Card ID: {card_id}\nProcessing...")
+            if person:
+                self.instruction_label.setText(f"{person.get('name')}\nProcessing...")
+            else:
+                self.instruction_label.setText(f"Card ID: {card_id}\nProcessing...")
         
         # Reset after 3 seconds
         self.timer.singleShot(3000, self.reset_to_main_screen)
     
+    def user_photo(self, generic_image_path, size=180, radius=3):
+        """Photo of the person being checked, or the generic user image, scaled and rounded"""
+        photo = self.assets.person_photo(self.current_person, size, size, radius)
+        if photo is None:
+            photo = self.assets.get(generic_image_path, size, size, radius)
+        return photo
+    
     def show_invalid_card_message(self, card_id):
         """Show invalid card message on main screen"""
         print(f"Showing invalid card message for: {card_id}")
@@ -594,6 +685,16 @@ class STIWelcomeScreen(QMainWindow):
     
     def return_to_login(self):
         """Return to the login application"""
+        if self.host is not None:
+            # Same process - just bring the guard console back
+            self.host.show_login()
+            return
+        
+        if self.supervised:
+            # The guard console is still running; tell the supervisor not to restart us
+            QApplication.instance().exit(RETURN_TO_LOGIN_EXIT_CODE)
+            return
+        
         try:
             # Get the current directory and path to ai_niform_login.py
             current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -649,11 +750,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo to a reasonable size for 1920x1080
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -683,28 +783,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display Generic User Image
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image to a reasonable size for 1920x1080
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -945,11 +1027,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo (same as main screen)
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo to a reasonable size for 1920x1080
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -979,28 +1060,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image to a reasonable size
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -1179,11 +1242,10 @@ class STIWelcomeScreen(QMainWindow):
         left_layout.setAlignment(Qt.AlignCenter)
         
         instructions_path = os.path.join("image-elements", "Instructions Scan.png")
-        if os.path.exists(instructions_path):
+        if self.assets.exists(instructions_path):
             instructions_label = QLabel()
-            pixmap = QPixmap(instructions_path)
             # Scale to fit the left panel
-            scaled_pixmap = pixmap.scaled(1344, 900, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(instructions_path, 1344, 900)
             instructions_label.setPixmap(scaled_pixmap)
             instructions_label.setAlignment(Qt.AlignCenter)
             instructions_label.setStyleSheet("background-color: transparent;")
@@ -1212,28 +1274,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -1421,6 +1465,9 @@ class STIWelcomeScreen(QMainWindow):
         
         main_layout.addWidget(content_area)
         
+        # Replace the "Scanning..." text with the live camera once frames arrive
+        self.start_camera_view(scanning_text)
+        
         # Bottom bar
         bottom_bar = QFrame()
         bottom_bar.setFixedHeight(100)
@@ -1477,6 +1524,59 @@ class STIWelcomeScreen(QMainWindow):
         self.status_timer.start(3000)  # 3 seconds
         print(f"Timer started for step {self.scanning_sequence_step} - will call show_scanning_complete in 3 seconds")
     
+    def start_camera_view(self, label):
+        """Show the console's live camera frames on label"""
+        if self.frame_reader is None:
+            if self.host is not None:
+                # Same process as the console - read its capture thread directly
+                from camera_capture import get_shared_camera
+                self.frame_reader = get_shared_camera()
+            else:
+                self.frame_reader = SharedFrameReader()
+        self.stop_camera_view()
+        self.camera_view = label
+        self.camera_view_sequence = 0
+        # The overlay is rebuilt between steps; stop updating when the label goes away
+        label.destroyed.connect(self.stop_camera_view)
+        self.camera_view_timer = QTimer()
+        self.camera_view_timer.timeout.connect(self.update_camera_view)
+        self.camera_view_timer.start(33)  # ~30 FPS
+    
+    def stop_camera_view(self):
+        """Stop the live camera updates"""
+        if self.camera_view_timer:
+            self.camera_view_timer.stop()
+            self.camera_view_timer = None
+        self.camera_view = None
+    
+    def update_camera_view(self):
+        """Draw the newest camera frame on the camera view label"""
+        try:
+            sequence, frame = self.frame_reader.get_latest()
+            if frame is None or sequence == self.camera_view_sequence or self.camera_view is None:
+                return
+            
+            # Wrap the frame without copying; QPixmap.fromImage() makes the only copy
+            height, width, _ = frame.shape
+            if hasattr(QImage, 'Format_BGR888'):
+                image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_BGR888)
+            else:
+                image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_RGB888).rgbSwapped()
+            pixmap = QPixmap.fromImage(image)
+            
+            # Skip the frame if the capture thread overwrote it while we were converting
+            if not self.frame_reader.is_current(sequence):
+                return
+            self.camera_view_sequence = sequence
+            # Fit the black content area (the label itself is only as big as its contents)
+            area = self.camera_view.parentWidget().size() * 0.9
+            self.camera_view.setPixmap(pixmap.scaled(area, Qt.KeepAspectRatio))
+        except RuntimeError:
+            # The label was deleted with the overlay
+            self.stop_camera_view()
+        except Exception as e:
+            print(f"Error updating camera view: {e}")
+    
     def show_scanning_complete(self):
         """Show scanning complete screen"""
         self.scanning_sequence_step = 4
@@ -1528,11 +1628,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load scan-ok image
         scan_ok_path = os.path.join("image-elements", "scan-ok.png")
-        if os.path.exists(scan_ok_path):
+        if self.assets.exists(scan_ok_path):
             scan_ok_label = QLabel()
-            pixmap = QPixmap(scan_ok_path)
             # Scale the scan-ok image (70% bigger than before: 300 * 1.7 = 510)
-            scaled_pixmap = pixmap.scaled(1024, 1024, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(scan_ok_path, 1024, 1024)
             scan_ok_label.setPixmap(scaled_pixmap)
             scan_ok_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(scan_ok_label)
@@ -1547,28 +1646,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -1886,11 +1967,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -1920,28 +2000,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -2075,6 +2137,7 @@ class STIWelcomeScreen(QMainWindow):
     def return_to_main_screen(self):
         """Return to main screen after success screen"""
         print("Returning to main screen")
+        self.current_person = None
         
         # Stop timer
         if hasattr(self, 'status_timer') and self.status_timer:
@@ -2133,11 +2196,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -2167,28 +2229,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -2363,11 +2407,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -2397,28 +2440,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -2593,11 +2618,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -2627,28 +2651,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -2823,11 +2829,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -2857,28 +2862,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -3191,11 +3178,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # Load and display STI Logo
         logo_path = os.path.join("image-elements", "STI Balagtas Logo.png")
-        if os.path.exists(logo_path):
+        if self.assets.exists(logo_path):
             logo_label = QLabel()
-            pixmap = QPixmap(logo_path)
             # Scale the logo
-            scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled_pixmap = self.assets.get(logo_path, 400, 400)
             logo_label.setPixmap(scaled_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             left_layout.addWidget(logo_label)
@@ -3225,28 +3211,10 @@ class STIWelcomeScreen(QMainWindow):
         
         # User icon - Load Generic User Image with rounded corners
         user_image_path = os.path.join("image-elements", "Generic User Image.jpg")
-        if os.path.exists(user_image_path):
+        if self.assets.exists(user_image_path):
             user_icon = QLabel()
-            pixmap = QPixmap(user_image_path)
-            # Scale the user image
-            scaled_pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Create rounded corners on the image itself
-            rounded_pixmap = QPixmap(scaled_pixmap.size())
-            rounded_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(rounded_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            
-            # Create rounded rectangle path
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, scaled_pixmap.width(), scaled_pixmap.height(), 3, 3)
-            painter.setClipPath(path)
-            
-            # Draw the image
-            painter.drawPixmap(0, 0, scaled_pixmap)
-            painter.end()
+            # Scaled and rounded once, then reused from the asset cache
+            rounded_pixmap = self.user_photo(user_image_path)
             
             user_icon.setPixmap(rounded_pixmap)
             user_icon.setAlignment(Qt.AlignCenter)
@@ -3377,14 +3345,46 @@ class STIWelcomeScreen(QMainWindow):
         self.status_timer.start(5000)  # 5 seconds
         print("Uniform issue screen shown - will return to main screen in 5 seconds")
 
+def report_to_supervisor(message):
+    """Send a status line to MainScreenSupervisor over stdout"""
+    print(f"{SUPERVISOR_PREFIX} {message}", flush=True)
+
+def wait_for_show_command(app, window):
+    """Show the prebuilt window when the supervisor writes 'show' to stdin"""
+    def on_command():
+        data = os.read(sys.stdin.fileno(), 1024)
+        if not data:
+            # Supervisor closed the pipe - nothing will ever be shown
+            app.quit()
+            return
+        if b'show' in data.split():
+            window.show()
+            window.raise_()
+            window.activateWindow()
+            report_to_supervisor("shown")
+    
+    notifier = QSocketNotifier(sys.stdin.fileno(), QSocketNotifier.Read)
+    notifier.activated.connect(on_command)
+    return notifier
+
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description='AI-niform main screen')
+    parser.add_argument('--standby', action='store_true',
+                       help='Build the window hidden and wait for "show" from MainScreenSupervisor')
+    args, qt_args = parser.parse_known_args()
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     
     # Set application style for better macOS appearance
     app.setStyle('Fusion')
     
-    window = STIWelcomeScreen()
-    window.show()
+    window = STIWelcomeScreen(supervised=args.standby)
+    if args.standby:
+        # Fully initialized but hidden until the supervisor swaps us in
+        window.command_notifier = wait_for_show_command(app, window)
+        report_to_supervisor("ready")
+    else:
+        window.show()
     
     sys.exit(app.exec_())
 
@@ -0,0 +1,163 @@
+import os
+import datetime
+import threading
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+SNAPSHOT_HEADER = ("# Person ID, Violation Count\n"
+                   "# This file tracks uniform violations for students and teachers\n"
+                   "# Format: RFID_ID,Violation_Count\n")
+# Terms start in January (2nd semester), June (summer) and August (1st semester)
+SEMESTER_START_MONTHS = (1, 6, 8)
+
+
+def week_start(today=None):
+    """Midnight on Monday of the current week"""
+    today = today or datetime.date.today()
+    return datetime.datetime.combine(today - datetime.timedelta(days=today.weekday()), datetime.time())
+
+
+def semester_start(today=None, start_months=SEMESTER_START_MONTHS):
+    """Midnight on the first day of the current term"""
+    today = today or datetime.date.today()
+    start_month = max((month for month in start_months if month <= today.month), default=min(start_months))
+    return datetime.datetime(today.year, start_month, 1)
+
+
+class ViolationLedger:
+    """Violation counters backed by an append-only increment log and periodic snapshots
+
+    violations.txt keeps its original "ID,count" format and acts as the
+    snapshot, plus a "# Log offset:" line saying how much of the log it
+    already includes. violations.log records every violation with its
+    timestamp and is never rewritten, so the history survives and can be
+    queried per period. Counts are an in-memory dict, so reads and
+    increments are O(1).
+    """
+    def __init__(self, snapshot_file="violations.txt", log_file="violations.log",
+                 snapshot_every=100, semester_start_months=SEMESTER_START_MONTHS):
+        """Load the snapshot and replay the log written after it"""
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file
+        self.snapshot_every = snapshot_every
+        self.semester_start_months = semester_start_months
+        self.counts = {}
+        self.history = None  # person_id -> [datetime], loaded on the first period query
+        self.events_since_snapshot = 0
+        self._lock = threading.Lock()
+
+        snapshot_offset = self._load_snapshot()
+        self._replay_log(snapshot_offset)
+
+    def _load_snapshot(self):
+        """Read counts from violations.txt; returns the log offset it covers"""
+        offset = 0
+        if not os.path.exists(self.snapshot_file):
+            return offset
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('# Log offset:'):
+                        offset = int(line.split(':', 1)[1])
+                        continue
+                    if line.startswith('#') or not line:
+                        continue
+
+                    parts = line.split(',')
+                    if len(parts) >= 2:
+                        self.counts[parts[0]] = int(parts[1])
+        except Exception as e:
+            print(f"Error reading violations snapshot: {e}")
+        return offset
+
+    def _replay_log(self, offset):
+        """Apply log entries written after the snapshot"""
+        if not os.path.exists(self.log_file):
+            return
+        try:
+            with open(self.log_file, 'r') as f:
+                f.seek(offset)
+                for line in f:
+                    parts = line.strip().split(',')
+                    if len(parts) >= 2 and not parts[0].startswith('#'):
+                        self.counts[parts[1]] = self.counts.get(parts[1], 0) + 1
+                        self.events_since_snapshot += 1
+        except Exception as e:
+            print(f"Error replaying violations log: {e}")
+
+    def _load_history(self):
+        """Index every logged violation timestamp by person (for period queries)"""
+        history = {}
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'r') as f:
+                for line in f:
+                    parts = line.strip().split(',')
+                    if len(parts) >= 2 and not parts[0].startswith('#'):
+                        try:
+                            timestamp = datetime.datetime.strptime(parts[0], TIMESTAMP_FORMAT)
+                        except ValueError:
+                            continue
+                        history.setdefault(parts[1], []).append(timestamp)
+        self.history = history
+
+    def get_count(self, person_id):
+        """Total violations for a person (including counts from before the log existed)"""
+        with self._lock:
+            return self.counts.get(person_id, 0)
+
+    def add(self, person_id, timestamp=None):
+        """Record one violation; returns the new total"""
+        timestamp = timestamp or datetime.datetime.now()
+        line = f"{timestamp.strftime(TIMESTAMP_FORMAT)},{person_id},1\n".encode()
+        with self._lock:
+            # Single O_APPEND write, safe against concurrent writers
+            fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+            count = self.counts.get(person_id, 0) + 1
+            self.counts[person_id] = count
+            if self.history is not None:
+                self.history.setdefault(person_id, []).append(timestamp.replace(microsecond=0))
+            self.events_since_snapshot += 1
+
+            if self.events_since_snapshot >= self.snapshot_every:
+                self._write_snapshot()
+        return count
+
+    def snapshot(self):
+        """Write the current counters to violations.txt"""
+        with self._lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        """Atomically replace violations.txt with the current counters (lock held)"""
+        offset = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        temp_file = self.snapshot_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            f.write(SNAPSHOT_HEADER)
+            f.write(f"# Log offset: {offset}\n")
+            for person_id, count in self.counts.items():
+                f.write(f"{person_id},{count}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.snapshot_file)
+        self.events_since_snapshot = 0
+
+    def count_between(self, person_id, start, end=None):
+        """Logged violations for a person with start <= timestamp < end"""
+        with self._lock:
+            if self.history is None:
+                self._load_history()
+            timestamps = self.history.get(person_id, [])
+            return sum(1 for ts in timestamps if ts >= start and (end is None or ts < end))
+
+    def count_this_week(self, person_id, today=None):
+        """Violations since Monday of the current week"""
+        return self.count_between(person_id, week_start(today))
+
+    def count_this_semester(self, person_id, today=None):
+        """Violations since the start of the current term"""
+        return self.count_between(person_id, semester_start(today, self.semester_start_months))